@@ -1,3 +1,28 @@
-from abs2 import models
-from abs2.abs2_api import ABS2API
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from abs2.exceptions import ABS2Exception
+
+# Loaded on first access, so scripts only using e.g. the models do not import requests
+_LAZY = {"models": "abs2.models", "ABS2API": "abs2.abs2_api"}
+
+if TYPE_CHECKING:
+    from abs2 import models
+    from abs2.abs2_api import ABS2API
+
+__all__ = ["ABS2API", "ABS2Exception", "models"]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = import_module(module)
+    if name != "models":
+        value = getattr(value, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
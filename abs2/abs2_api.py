@@ -1,10 +1,93 @@
 import logging
-import string
-from random import choices
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from .compression import (
+    GzipValidator,
+    check_compression,
+    compress_bytes,
+    is_gzip_file,
+    spool_matrix_file,
+)
+from .dedup import UploadIndex, problem_key, problem_key_of_file
+from .exceptions import ABS2Exception
+from .metrics import RequestHook
 from .models import *
-from .rest_adapter import RestAdapter
+from .polling import (
+    Backoff,
+    VerificationStats,
+    queued_interval,
+    running_interval,
+    time_limit_of,
+)
+from .rest_adapter import RestAdapter, Timeout
+from .retry import CircuitBreaker, RetryPolicy
+from .serializers import JSONSerializer
+from .streaming import (
+    FileUploadStream,
+    JSONArrayParser,
+    ProgressCallback,
+    QUBOStreamValidator,
+    SolutionParser,
+)
+
+
+def prepare_pyqubo_matrix(
+    qubo: QUBO, file: Optional[str] = None, index: Optional[VariableIndex] = None
+) -> Tuple[Dict, VariableIndex]:
+    """
+    Convert a QUBO in dict format into the JSON structure expected by the web API.
+    :param qubo: QUBO in dict format as returned by pyqubo's to_qubo()
+    :param file: (optional) file name of the problem on the server, a random name is generated if omitted
+    :param index: (optional) precomputed VariableIndex containing all variables of the QUBO
+    :return: the matrix to upload and the VariableIndex mapping variable names to indices
+    """
+    # Prepare filename
+    if file is None:
+        file = random_file_name()
+    # Prepare problem
+    if index is None:
+        index = VariableIndex.from_qubo(qubo)
+    qubo_matrix = index.encode_qubo(qubo)
+    nbit = max(32, len(index))
+    base = 0
+
+    matrix = {"file": file, "nbit": nbit, "base": base, "qubo": qubo_matrix}
+    return matrix, index
+
+
+def matrix_file_body(
+    filename: str,
+    stream: bool = False,
+    validate: bool = False,
+    chunk_size: int = 1 << 20,
+    progress: Optional[ProgressCallback] = None,
+    compression: Optional[str] = None,
+    compress_level: int = 6,
+) -> Union[bytes, FileUploadStream]:
+    """
+    The request body uploading a QUBO matrix file, see ABS2API.post_qubo_matrix for the parameters.
+    :return: the content of a plain JSON file that is neither streamed nor compressed,
+             otherwise a FileUploadStream sending the file, re-encoded to the requested compression if needed
+    """
+    gzipped = is_gzip_file(filename)
+    if not (stream or compression or gzipped):
+        # The file already is JSON, it is sent as is without being decoded and encoded again
+        with open(filename, "rb") as f:
+            return f.read()
+    validator = QUBOStreamValidator() if validate else None
+    if (gzipped and compression == "gzip") or not (gzipped or compression):
+        # The file already has the requested encoding and is sent as is
+        source = filename
+        if validator is not None and gzipped:
+            validator = GzipValidator(validator)
+    else:
+        source = spool_matrix_file(
+            filename, compression, compress_level, validator, chunk_size
+        )
+        validator = None
+    return FileUploadStream(source, chunk_size, progress, validator)
 
 
 class ABS2API:
@@ -15,8 +98,68 @@ class ABS2API:
         ver: str = "v1",
         ssl_verify: bool = True,
         logger: logging.Logger = None,
+        pool_size: int = 10,
+        timeout: Optional[Timeout] = None,
+        scheme: str = "https",
+        hooks: Optional[Iterable[RequestHook]] = None,
+        upload_index: Optional[UploadIndex] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        serializer: Optional[JSONSerializer] = None,
     ):
-        self._rest_adapter = RestAdapter(hostname, api_key, ver, ssl_verify, logger)
+        """
+        Constructor for ABS2API
+        :param hostname: URL without "https://"
+        :param api_key: (optional) string used for authentication when using POST / DELETE
+        :param ver: version number of the API, standard v1
+        :param ssl_verify: Normally set to true, can be set to false when facing issues with SSL/TLS cert
+        :param logger: (optional) accepts preexisting logger
+        :param pool_size: maximum number of keep-alive connections to the web API
+        :param timeout: (optional) default timeout in seconds for every request, None waits forever
+        :param scheme: (optional) URL scheme, "http" can be used for a local stand-in server
+        :param hooks: (optional) callables receiving a RequestRecord with the measurements of every request,
+                      e.g. a metrics.Metrics to export latency histograms, byte counts and status codes
+        :param upload_index: (optional) UploadIndex consulted before every upload of a QUBO matrix,
+                             a matrix already uploaded with the same content is not uploaded again.
+                             Streamed uploads (post_qubo_matrix with stream=True) bypass it
+        :param retry: (optional) RetryPolicy resending requests that failed with a transient error,
+                      e.g. 503 or 102 PROCESSING. Every failure is raised at once if omitted
+        :param breaker: (optional) CircuitBreaker failing calls fast while the QUBO solver is not available,
+                        it is also opened and closed by the result of get_status
+        :param serializer: (optional) serializers.JSONSerializer for request and response bodies,
+                           defaults to orjson if it is installed and the json module otherwise
+        """
+        self._rest_adapter = RestAdapter(
+            hostname,
+            api_key,
+            ver,
+            ssl_verify,
+            logger,
+            pool_size=pool_size,
+            timeout=timeout,
+            scheme=scheme,
+            hooks=hooks,
+            retry=retry,
+            breaker=breaker,
+            serializer=serializer,
+        )
+        self._logger = logger or logging.getLogger(__name__)
+        self.upload_index = upload_index
+        self.verification_stats = VerificationStats()
+        # Set to False once the web API rejected a compressed upload, later uploads are sent uncompressed
+        self._compression_supported = True
+
+    def close(self) -> None:
+        """
+        Close all connections held open to the web API.
+        """
+        self._rest_adapter.close()
+
+    def __enter__(self) -> "ABS2API":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def get_status(self) -> StatusInformation:
         """
@@ -24,8 +167,17 @@ class ABS2API:
         :return: StatusInformation, return codes: 200 (OK, QUBO solver working),
                                                   503 (SERVICE_UNAVAILABLE, QUBO solver is not working)
         """
-        result = self._rest_adapter.get(endpoint="")
-        return StatusInformation(**result.data)
+        breaker = self._rest_adapter.breaker
+        try:
+            result = self._rest_adapter.get(endpoint="")
+        except ABS2Exception as e:
+            if breaker is not None and e.status_code == 503:
+                breaker.report_status(False)
+            raise
+        status = StatusInformation(**result.data)
+        if breaker is not None:
+            breaker.report_status(status.active)
+        return status
 
     def register_user(self, user: User) -> Result:
         """
@@ -38,7 +190,7 @@ class ABS2API:
                                        400 (BAD_REQUEST, malformed parameters),
                                        409 (CONFLICT, username and/or email already registered
         """
-        return self._rest_adapter.post("signup", data=user.__dict__)
+        return self._rest_adapter.post("signup", data=as_dict(user))
 
     def retrieve_user_information(self, username: str, password: str) -> Result:
         """
@@ -129,7 +281,17 @@ class ABS2API:
             "account", additional_headers={"Authorization": f"Bearer {token}"}
         )
 
-    def post_qubo_matrix(self, token: str, filename: str) -> QUBOMatrixUploadMsg:
+    def post_qubo_matrix(
+        self,
+        token: str,
+        filename: str,
+        stream: bool = False,
+        validate: bool = False,
+        chunk_size: int = 1 << 20,
+        progress: Optional[ProgressCallback] = None,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+    ) -> QUBOMatrixUploadMsg:
         """
         Loads a QUBO Matrix in JSON format from a file to be directly uploaded for processing by the QUBO solver.
         The minimum number for nbit is 32.
@@ -148,24 +310,83 @@ class ABS2API:
         The verification process checks if the uploaded file follows the previously mentioned JSON format
         and converts it to a by the QUBO solver handleable file format.
         Jobs for solving the QUBO problem can be submitted after the verification is completed.
+        With stream=True the file is sent in chunks straight from disk instead of being loaded into memory first,
+        so the memory usage does not depend on the size of the matrix.
+        The file may also be gzip compressed (e.g. a .json.gz file). With compression="gzip" it is then sent
+        as is, otherwise it is decompressed chunk by chunk before the upload.
+        If the web API rejects a compressed upload, the file is uploaded again uncompressed
+        and compression is disabled for all further uploads.
         :param token: The bearer token of the registered user
         :param filename: The file name of the file that is to be uploaded
+        :param stream: (optional) stream the file from disk instead of loading it as a whole
+        :param validate: (optional) when streaming, check the format of the file while it is uploaded
+                         and abort the upload with an ABS2Exception if it is malformed
+        :param chunk_size: (optional) when streaming, the number of bytes read from disk at once
+        :param progress: (optional) when streaming, called with (bytes sent, total bytes, bytes per second)
+        :param compression: (optional) Content-Encoding of the upload, "gzip" or "deflate".
+                            Compressed uploads are always streamed
+        :param compress_level: (optional) compression level from 1 (fastest) to 9 (smallest)
         :return: QUBOMatrixUploadMsg, status codes: 202 (ACCEPTED, QUBO matrix uploaded and verification started),
                                                     400 (BAD_REQUEST, malformed parameters),
                                                     401 (UNAUTHORIZED, wrong access token),
                                                     415 (UNSUPPORTED_MEDIA_TYPE, file is not JSON data format)
+                 With an upload_index, a matrix with the same content as an earlier upload is not sent again
+                 and the message refers to the file name of the earlier upload. Streamed uploads are neither
+                 looked up nor recorded: the content hash needs all entries of the matrix at once.
         """
-        with open(filename, "r") as f:
-            matrix = json.load(f)
-        result = self._rest_adapter.post(
-            "problems",
-            additional_headers={"Authorization": f"Bearer {token}"},
-            data=matrix,
+        check_compression(compression)
+        key = nbit = None
+        if self.upload_index is not None and not stream:
+            key, nbit = problem_key_of_file(filename)
+            uploaded = self._find_upload(token, key)
+            if uploaded is not None:
+                return QUBOMatrixUploadMsg(**uploaded)
+        if not self._compression_supported:
+            compression = None
+        body = matrix_file_body(
+            filename,
+            stream,
+            validate,
+            chunk_size,
+            progress,
+            compression,
+            compress_level,
         )
+        if isinstance(body, bytes):
+            result = self._rest_adapter.post(
+                "problems",
+                additional_headers={"Authorization": f"Bearer {token}"},
+                body=body,
+            )
+            self._record_upload(key, nbit, result)
+            return QUBOMatrixUploadMsg(**result.data)
+
+        headers = {"Authorization": f"Bearer {token}"}
+        if compression is not None:
+            headers["Content-Encoding"] = compression
+        try:
+            with body:
+                result = self._rest_adapter.post(
+                    "problems", additional_headers=headers, body=body
+                )
+        except ABS2Exception as e:
+            if not self._is_compression_rejection(e, compression):
+                raise
+            self._disable_compression()
+            return self.post_qubo_matrix(
+                token, filename, stream, validate, chunk_size, progress
+            )
+        self._record_upload(key, nbit, result)
         return QUBOMatrixUploadMsg(**result.data)
 
     def post_pyqubo_matrix(
-        self, token: str, qubo: QUBO, file: Optional[str] = None
+        self,
+        token: str,
+        qubo: QUBO,
+        file: Optional[str] = None,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+        index: Optional[VariableIndex] = None,
     ) -> PyQUBOMatrixUploadMsg:
         """Loads a QUBO Matrix in dict format from a file to be directly uploaded for processing by the QUBO solver.
 
@@ -177,38 +398,175 @@ class ABS2API:
         The return value can be used to decode the solution once it is solved.
         :param token: The bearer token of the registered user
         :param filename: The file name of the file that is to be uploaded
+        :param compression: (optional) Content-Encoding of the upload, "gzip" or "deflate",
+                            see post_qubo_matrix for the fallback if the web API rejects it
+        :param compress_level: (optional) compression level from 1 (fastest) to 9 (smallest)
+        :param index: (optional) precomputed VariableIndex, e.g. from VariableIndex.from_qubo(),
+                      to reuse the same variable indices for many uploads. Built from the QUBO if omitted
         :return: PyQUBOMatrixUploadMsg, status codes: 202 (ACCEPTED, QUBO matrix uploaded and verification started),
                                                     400 (BAD_REQUEST, malformed parameters),
                                                     401 (UNAUTHORIZED, wrong access token),
-                                                    415 (UNSUPPORTED_MEDIA_TYPE, file is not JSON data format)"""
-        # Prepare filename
-        if file is None:
-            file = "".join(choices(string.ascii_lowercase, k=10)) + ".json"
-        # Prepare problem
-        keys = {k[0] for k in qubo.keys()} | {k[1] for k in qubo.keys()}
-        key_index_mapping: Dict[str, int] = {name: idx for idx, name in enumerate(keys)}
-        qubo_matrix = [
-            [key_index_mapping[n1], key_index_mapping[n2], int(v)]
-            for (n1, n2), v in qubo.items()
-        ]
-        nbit = max(32, len(keys))
-        base = 0
-
-        matrix = {"file": file, "nbit": nbit, "base": base, "qubo": qubo_matrix}
-
-        result = self._rest_adapter.post(
-            "problems",
-            additional_headers={"Authorization": f"Bearer {token}"},
-            data=matrix,
+                                                    415 (UNSUPPORTED_MEDIA_TYPE, file is not JSON data format)
+        """
+        matrix, index = prepare_pyqubo_matrix(qubo, file, index)
+        key = None
+        if self.upload_index is not None:
+            key = problem_key(matrix["nbit"], matrix["base"], matrix["qubo"])
+            uploaded = self._find_upload(token, key)
+            if uploaded is not None:
+                return PyQUBOMatrixUploadMsg(
+                    qubo=qubo,
+                    key_mapping=None,
+                    status_code=200,
+                    index=index,
+                    **uploaded,
+                )
+        result = self._post_json_problem(
+            token,
+            self._rest_adapter.serializer.dumps(matrix),
+            compression,
+            compress_level,
         )
+        self._record_upload(key, matrix["nbit"], result)
 
         return PyQUBOMatrixUploadMsg(
             qubo=qubo,
-            key_mapping={v: k for k, v in key_index_mapping.items()},
+            key_mapping=None,
             status_code=result.status_code,
+            index=index,
             **result.data,
         )
 
+    def post_matrix(
+        self,
+        token: str,
+        matrix: QUBOMatrix,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+    ) -> QUBOMatrixUploadMsg:
+        """
+        Upload a QUBOMatrix, e.g. one built with QUBOMatrix.from_coo / from_scipy / from_dense.
+        Matrices backed by NumPy arrays are serialized without building Python lists of the entries.
+        :param token: The bearer token of the registered user
+        :param matrix: the QUBO matrix, its file attribute is the name of the problem on the server
+        :param compression: (optional) Content-Encoding of the upload, "gzip" or "deflate"
+        :param compress_level: (optional) compression level from 1 (fastest) to 9 (smallest)
+        :return: QUBOMatrixUploadMsg, see post_qubo_matrix for the status codes
+        """
+        key = None
+        if self.upload_index is not None:
+            key = problem_key(matrix.nbit, matrix.base, matrix.qubo)
+            uploaded = self._find_upload(token, key)
+            if uploaded is not None:
+                return QUBOMatrixUploadMsg(**uploaded)
+        result = self._post_json_problem(
+            token,
+            matrix.to_bytes(self._rest_adapter.serializer),
+            compression,
+            compress_level,
+        )
+        self._record_upload(key, matrix.nbit, result)
+        return QUBOMatrixUploadMsg(**result.data)
+
+    def post_sparse_qubo(
+        self,
+        token: str,
+        rows,
+        cols,
+        values,
+        nbit: Optional[int] = None,
+        base: int = 0,
+        file: Optional[str] = None,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+    ) -> QUBOMatrixUploadMsg:
+        """
+        Upload a QUBO matrix given in coordinate format (requires NumPy), see QUBOMatrix.from_coo.
+        (i, j) and (j, i) entries are merged, duplicates summed up and zeros dropped before the upload.
+        :param token: The bearer token of the registered user
+        :param rows: row indices, counted from base
+        :param cols: column indices, counted from base
+        :param values: matrix entries, truncated to integers
+        :param nbit: (optional) number of variables, derived from the largest index if omitted
+        :param base: index of the first variable, 0 or 1
+        :param file: (optional) file name of the problem on the server, a random name is generated if omitted
+        :param compression: (optional) Content-Encoding of the upload, "gzip" or "deflate"
+        :param compress_level: (optional) compression level from 1 (fastest) to 9 (smallest)
+        :return: QUBOMatrixUploadMsg, see post_qubo_matrix for the status codes
+        """
+        matrix = QUBOMatrix.from_coo(rows, cols, values, file, nbit, base)
+        return self.post_matrix(token, matrix, compression, compress_level)
+
+    def _post_json_problem(
+        self,
+        token: str,
+        body: bytes,
+        compression: Optional[str],
+        compress_level: int,
+    ) -> Result:
+        check_compression(compression)
+        headers = {"Authorization": f"Bearer {token}"}
+        if compression is not None and self._compression_supported:
+            try:
+                return self._rest_adapter.post(
+                    "problems",
+                    additional_headers={**headers, "Content-Encoding": compression},
+                    body=compress_bytes(body, compression, compress_level),
+                )
+            except ABS2Exception as e:
+                if not self._is_compression_rejection(e, compression):
+                    raise
+            self._disable_compression()
+        return self._rest_adapter.post(
+            "problems", additional_headers=headers, body=body
+        )
+
+    def _find_upload(self, token: str, key: str) -> Optional[Dict]:
+        if not self.upload_index.reconciled:
+            self.reconcile_upload_index(token)
+        entry = self.upload_index.lookup(key)
+        if entry is None:
+            return None
+        self._logger.debug(msg=f"QUBO matrix already uploaded as {entry['file']}")
+        return {
+            "message": "QUBO matrix already uploaded",
+            "file": entry["file"],
+            "uri_problem": entry["uri_problem"],
+        }
+
+    def _record_upload(self, key: Optional[str], nbit: int, result: Result) -> None:
+        if key is not None and self.upload_index is not None:
+            self.upload_index.add(
+                key, result.data["file"], nbit, result.data["uri_problem"]
+            )
+
+    def reconcile_upload_index(self, token: str) -> int:
+        """
+        Remove the entries of the upload_index whose files were deleted or replaced on the server.
+        Called automatically before the first upload that consults the index.
+        :param token: the bearer token of the user
+        :return: the number of removed entries
+        """
+        return self.upload_index.reconcile(self.get_all_problems(token).data or [])
+
+    @staticmethod
+    def _is_compression_rejection(e: ABS2Exception, compression: Optional[str]) -> bool:
+        # A server that does not decode the body refuses the encoding, other errors are raised as they are
+        if compression is None:
+            return False
+        if e.status_code == 415:
+            return True
+        message = (e.message or "").lower()
+        return e.status_code == 400 and any(
+            word in message for word in ("encoding", "compress", compression)
+        )
+
+    def _disable_compression(self) -> None:
+        self._logger.warning(
+            msg="Compressed upload rejected by the web API, compression is disabled"
+        )
+        self._compression_supported = False
+
     def get_qubo_matrix_information(
         self, token: str, filename: str
     ) -> QUBOMatrixInformation:
@@ -226,7 +584,208 @@ class ABS2API:
             f"problems/{filename}",
             additional_headers={"Authorization": f"Bearer {token}"},
         )
-        return QUBOMatrixInformation(**result.data)
+        information = QUBOMatrixInformation(**result.data)
+        verify = getattr(information, "verify", None)
+        if self.upload_index is not None and verify is not None:
+            self.upload_index.set_verified(filename, verify)
+        return information
+
+    def iter_verified(
+        self,
+        token: str,
+        filenames: Iterable[str],
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[QUBOMatrixInformation]:
+        """
+        Poll uploaded QUBO matrices until their verification finished, yielding each as soon as it is done.
+        Notes:  The first poll of a matrix is spaced by the time its size in bytes takes to verify at the throughput
+                observed so far (verification_stats), later polls back off. Every finished verification updates
+                the observed throughput, so the estimates get tighter over time.
+        :param token: the bearer token of the user
+        :param filenames: the file names of the QUBO matrices
+        :param poll_interval: shortest interval between two polls in seconds
+        :param max_interval: longest interval between two polls in seconds
+        :param timeout: (optional) raise an ABS2Exception if matrices are still being verified after this many seconds
+        :return: iterator of QUBOMatrixInformation in order of completion, check its verify attribute for the result
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        pending = dict.fromkeys(filenames)
+        verified_bytes = 0
+        backoff = Backoff(poll_interval, max_interval)
+        first = True
+        while pending:
+            finished = False
+            for filename in list(pending):
+                information = self.get_qubo_matrix_information(token, filename)
+                verify = getattr(information, "verify", None)
+                if verify is None:
+                    pending[filename] = information.bytes
+                    continue
+                del pending[filename]
+                finished = True
+                if verify:
+                    # Counted from the start of the wait, which covers sequential verification of a batch as well
+                    verified_bytes += information.bytes
+                    self.verification_stats.record(
+                        verified_bytes, time.monotonic() - started
+                    )
+                yield information
+            if not pending:
+                return
+            if finished or first:
+                # Expect the smallest pending matrix next
+                estimate = self.verification_stats.estimate(min(pending.values()))
+                backoff.reset(max(estimate or 0.0, poll_interval))
+                first = False
+            interval = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ABS2Exception(
+                        f"{len(pending)} QUBO matrices not verified within {timeout} seconds"
+                    )
+                interval = min(interval, remaining)
+            time.sleep(interval)
+
+    def wait_until_verified(
+        self,
+        token: str,
+        filename: str,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> QUBOMatrixInformation:
+        """
+        Wait until the verification of an uploaded QUBO matrix finished, see iter_verified.
+        :param token: the bearer token of the user
+        :param filename: the file name of the QUBO matrix
+        :param poll_interval: shortest interval between two polls in seconds
+        :param max_interval: longest interval between two polls in seconds
+        :param timeout: (optional) raise an ABS2Exception if the matrix is still being verified after this many seconds
+        :return: QUBOMatrixInformation, its verify attribute tells if the verification succeeded
+        """
+        return next(
+            self.iter_verified(token, [filename], poll_interval, max_interval, timeout)
+        )
+
+    def wait_until_all_verified(
+        self,
+        token: str,
+        filenames: Iterable[str],
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, QUBOMatrixInformation]:
+        """
+        Wait until the verification of many uploaded QUBO matrices finished, see iter_verified.
+        :return: the QUBOMatrixInformation of every matrix by file name
+        """
+        return {
+            information.file: information
+            for information in self.iter_verified(
+                token, filenames, poll_interval, max_interval, timeout
+            )
+        }
+
+    def submit_when_verified(
+        self,
+        token: str,
+        problems: Iterable[Union[str, QUBOMatrix, QUBO]],
+        time_limit: int,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        max_workers: int = 4,
+    ) -> List[Optional[PostJobSuccessMsg]]:
+        """
+        Upload many problems, and post a job for each of them as soon as its verification succeeded.
+        :param token: the bearer token of the user
+        :param problems: QUBO matrix files (see post_qubo_matrix), QUBOMatrix objects (see post_matrix)
+                         or QUBOs in dict format (see post_pyqubo_matrix)
+        :param time_limit: the time limit of every job
+        :param poll_interval: shortest interval between two polls in seconds
+        :param max_interval: longest interval between two polls in seconds
+        :param timeout: (optional) raise an ABS2Exception if problems are still being verified,
+                        or their jobs cannot be posted yet, after this many seconds
+        :param max_workers: number of uploads running at the same time
+        :return: the PostJobSuccessMsg of every problem in the order of problems,
+                 None for problems whose verification failed
+        :raises ABS2Exception: if a job cannot be posted or the timeout expires. Its jobs attribute holds the jobs
+                               posted so far in the same format as the return value, so they can be tracked or deleted
+        """
+        with ThreadPoolExecutor(max_workers) as executor:
+            uploads = list(
+                executor.map(lambda problem: self._upload(token, problem), problems)
+            )
+        files = [upload.file for upload in uploads]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        jobs: Dict[str, List[PostJobSuccessMsg]] = {}
+        try:
+            for information in self.iter_verified(
+                token, files, poll_interval, max_interval, timeout
+            ):
+                if not information.verify:
+                    self._logger.error(
+                        msg=f"Verification of {information.file} failed: "
+                        f"{getattr(information, 'message', '')}"
+                    )
+                    continue
+                # A problem given more than once, e.g. for repeated runs, gets one job per occurrence
+                posted = jobs.setdefault(information.file, [])
+                for _ in range(files.count(information.file)):
+                    posted.append(
+                        self._post_verified_job(
+                            token, information.file, time_limit, deadline
+                        )
+                    )
+        except ABS2Exception as e:
+            e.jobs = self._jobs_in_order(files, jobs)
+            raise
+        return self._jobs_in_order(files, jobs)
+
+    @staticmethod
+    def _jobs_in_order(
+        files: List[str], jobs: Dict[str, List[PostJobSuccessMsg]]
+    ) -> List[Optional[PostJobSuccessMsg]]:
+        return [jobs[file].pop(0) if jobs.get(file) else None for file in files]
+
+    def _upload(self, token: str, problem) -> QUBOMatrixUploadMsg:
+        if isinstance(problem, str):
+            return self.post_qubo_matrix(token, problem)
+        if isinstance(problem, QUBOMatrix):
+            return self.post_matrix(token, problem)
+        if isinstance(problem, dict):
+            return self.post_pyqubo_matrix(token, problem)
+        raise ABS2Exception(f"Cannot upload a problem of type {type(problem)}")
+
+    def _post_verified_job(
+        self,
+        token: str,
+        problem: str,
+        time_limit: int,
+        deadline: Optional[float] = None,
+    ) -> PostJobSuccessMsg:
+        backoff = Backoff(0.1, 5.0)
+        while True:
+            try:
+                return self.post_job(token, problem, time_limit)
+            except ABS2Exception as e:
+                # 102: the web API has not caught up with the finished verification yet
+                if e.status_code != 102:
+                    raise
+            interval = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ABS2Exception(
+                        f"No job could be posted for {problem} before the timeout",
+                        status_code=102,
+                    )
+                interval = min(interval, remaining)
+            time.sleep(interval)
 
     def get_all_problems(self, token: str) -> Result:
         """
@@ -240,6 +799,22 @@ class ABS2API:
         )
         return result
 
+    def iter_all_problems(self, token: str) -> Iterator[Dict]:
+        """
+        Iterate over the uploaded QUBO matrix files, the entries of get_all_problems,
+        each one as soon as it arrives instead of after the whole list was received and decoded.
+        :param token: The bearer token of the user
+        """
+        return self._iter_list(token, "problems")
+
+    def _iter_list(self, token: str, endpoint: str) -> Iterator[Dict]:
+        parser = JSONArrayParser()
+        for chunk in self._rest_adapter.stream(
+            endpoint, additional_headers={"Authorization": f"Bearer {token}"}
+        ):
+            yield from parser.feed(chunk)
+        yield from parser.close()
+
     def delete_qubo_matrix(self, token: str, name: str) -> Result:
         """
         Delete a QUBO matrix by providing the filename.
@@ -253,6 +828,8 @@ class ABS2API:
         result = self._rest_adapter.delete(
             f"problems/{name}", additional_headers={"Authorization": f"Bearer {token}"}
         )
+        if self.upload_index is not None:
+            self.upload_index.forget([name])
         return result
 
     def delete_all_qubo_matrices(self, token: str) -> Result:
@@ -265,6 +842,8 @@ class ABS2API:
         result = self._rest_adapter.delete(
             "problems", additional_headers={"Authorization": f"Bearer {token}"}
         )
+        if self.upload_index is not None:
+            self.upload_index.forget()
         return result
 
     def post_job(self, token: str, problem: str, time_limit: int) -> PostJobSuccessMsg:
@@ -322,6 +901,13 @@ class ABS2API:
         )
         return result
 
+    def iter_all_jobs(self, token: str) -> Iterator[Dict]:
+        """
+        Iterate over the unexecuted jobs, the entries of get_all_jobs, each one as soon as it arrives.
+        :param token: the bearer token of the user
+        """
+        return self._iter_list(token, "jobs")
+
     def delete_job(self, token: str, job_name: str) -> Result:
         """
         Deletes a job by filename.
@@ -360,22 +946,58 @@ class ABS2API:
         )
         return result
 
-    def get_solution(self, token: str, solution_name: str) -> SolutionInformation:
+    def iter_all_solutions(self, token: str) -> Iterator[Dict]:
+        """
+        Iterate over the solution files, the entries of get_all_solutions, each one as soon as it arrives.
+        :param token: the bearer token of the user
+        """
+        return self._iter_list(token, "solutions")
+
+    def get_solution(
+        self,
+        token: str,
+        solution_name: str,
+        verify: bool = False,
+        problem=None,
+        stream: bool = False,
+    ) -> SolutionInformation:
         """
         Retrieve a solution by its solution file name.
         Notes:  The value of key "terminated" is true if the QUBO solver is terminated.
                 The value of key "success" is false if the QUBO solver is abnormally terminated
+        With verify=True the energy of the solution vector is evaluated locally (requires NumPy)
+        and an ABS2Exception is raised if it differs from the reported energy.
         :param token: the bearer token of the user
         :param solution_name: the file name of the solution file
+        :param verify: (optional) check the reported energy against the QUBO matrix of the problem
+        :param problem: the QUBO matrix to verify against, a QUBOEvaluator (cheapest for repeated checks),
+                        QUBOMatrix, PyQUBOMatrixUploadMsg, QUBO dict or the name of the matrix file
+        :param stream: (optional) parse the response while it arrives and decode the solution vector directly
+                       into a NumPy array (requires NumPy), for large solutions
         :return: SolutionInformation, status codes: 200 (OK, the solution vector, etc. obtained correctly),
                                                     401 (UNAUTHORIZED, wrong access token),
                                                     404 (NOT_FOUND, file not found)
         """
-        result = self._rest_adapter.get(
-            f"solutions/{solution_name}",
-            additional_headers={"Authorization": f"Bearer {token}"},
-        )
-        return SolutionInformation(**result.data)
+        if verify and problem is None:
+            raise ABS2Exception("verify=True requires the QUBO matrix of the problem")
+        headers = {"Authorization": f"Bearer {token}"}
+        if stream:
+            parser = SolutionParser()
+            for chunk in self._rest_adapter.stream(
+                f"solutions/{solution_name}", additional_headers=headers
+            ):
+                parser.feed(chunk)
+            solution = SolutionInformation(**parser.close())
+        else:
+            result = self._rest_adapter.get(
+                f"solutions/{solution_name}", additional_headers=headers
+            )
+            solution = SolutionInformation(**result.data)
+        if verify:
+            from .evaluate import QUBOEvaluator
+
+            QUBOEvaluator.of(problem).verify(solution)
+        return solution
 
     def delete_solution(self, token: str, solution_name: str) -> Result:
         """
@@ -405,3 +1027,93 @@ class ABS2API:
             "solutions", additional_headers={"Authorization": f"Bearer {token}"}
         )
         return result
+
+    def iter_solutions(
+        self,
+        token: str,
+        job: str,
+        time_limit: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[SolutionInformation]:
+        """
+        Poll the solution file of a job and yield every improved intermediate solution.
+        The last solution yielded is the final one, with terminated set to True.
+        Notes:  While the job waits in the queue (the solution file does not exist yet), polls are spaced by
+                the time limits of the jobs ahead of it. While it runs, polls are spaced by its own time limit.
+                The interval backs off while the solution does not improve and is reset when it does.
+        :param token: the bearer token of the user
+        :param job: the name of the job, equal to the file name of its solution file
+        :param time_limit: (optional) time limit of the job in seconds, taken from the solution if omitted
+        :param poll_interval: shortest interval between two polls in seconds
+        :param max_interval: longest interval between two polls in seconds
+        :param timeout: (optional) raise an ABS2Exception if the job has not terminated after this many seconds
+        :return: iterator of SolutionInformation with strictly decreasing energy
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        backoff = Backoff(poll_interval, max_interval)
+        best = None
+        while True:
+            try:
+                solution = self.get_solution(token, job)
+            except ABS2Exception as e:
+                if e.status_code != 404:
+                    raise
+                interval = queued_interval(
+                    self.get_status(), poll_interval, max_interval
+                )
+            else:
+                if solution.terminated or best is None or solution.energy < best:
+                    best = solution.energy
+                    yield solution
+                    if solution.terminated:
+                        return
+                    if time_limit is None:
+                        time_limit = time_limit_of(solution)
+                    backoff.reset(
+                        running_interval(time_limit, poll_interval, max_interval)
+                    )
+                interval = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ABS2Exception(
+                        f"Job {job} has not terminated within {timeout} seconds"
+                    )
+                interval = min(interval, remaining)
+            time.sleep(interval)
+
+    def wait_for_solution(
+        self,
+        token: str,
+        job: str,
+        target_energy: Optional[int] = None,
+        delete_on_target: bool = False,
+        time_limit: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> SolutionInformation:
+        """
+        Wait until a job terminates, or until its solution reaches a target energy, see iter_solutions.
+        :param token: the bearer token of the user
+        :param job: the name of the job, equal to the file name of its solution file
+        :param target_energy: (optional) stop waiting once the energy of the solution is at most this value
+        :param delete_on_target: delete the solution file of the running job once the target energy is reached,
+                                 to free the QUBO solver for the next job
+        :param time_limit: (optional) time limit of the job in seconds, taken from the solution if omitted
+        :param poll_interval: shortest interval between two polls in seconds
+        :param max_interval: longest interval between two polls in seconds
+        :param timeout: (optional) raise an ABS2Exception if the job has not terminated after this many seconds
+        :return: SolutionInformation, the final solution or the first one reaching the target energy
+        """
+        for solution in self.iter_solutions(
+            token, job, time_limit, poll_interval, max_interval, timeout
+        ):
+            if target_energy is None or solution.energy > target_energy:
+                continue
+            if delete_on_target and not solution.terminated:
+                self.delete_solution(token, job)
+            break
+        return solution
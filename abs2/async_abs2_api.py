@@ -0,0 +1,823 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+
+from .abs2_api import ABS2API, matrix_file_body, prepare_pyqubo_matrix
+from .async_rest_adapter import AsyncRestAdapter
+from .compression import check_compression, compress_bytes
+from .dedup import UploadIndex, problem_key, problem_key_of_file
+from .exceptions import ABS2Exception
+from .metrics import RequestHook
+from .models import *
+from .polling import (
+    Backoff,
+    VerificationStats,
+    queued_interval,
+    running_interval,
+    time_limit_of,
+)
+from .retry import CircuitBreaker, RetryPolicy
+from .serializers import JSONSerializer
+from .streaming import (
+    FileUploadStream,
+    JSONArrayParser,
+    ProgressCallback,
+    SolutionParser,
+)
+
+
+async def _chunks(body: FileUploadStream) -> AsyncIterator[bytes]:
+    # Reads from disk (and validation) run in a worker thread so the event loop is not blocked
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, body.read, -1)
+        if not chunk:
+            return
+        yield chunk
+
+
+class AsyncABS2API:
+    """
+    asyncio counterpart of ABS2API. Every endpoint is a coroutine returning the same models as ABS2API,
+    see the corresponding ABS2API method for the parameters and return codes of each endpoint.
+    The iter_* methods are async generators. Reading, encoding and compressing matrices run in worker threads,
+    so the event loop is not blocked by large uploads.
+    All calls share one connection pool, and at most `concurrency` requests are in flight at any time.
+    """
+
+    def __init__(
+        self,
+        hostname: str = "qubosolver.cs.hiroshima-u.ac.jp",
+        api_key: str = "",
+        ver: str = "v1",
+        ssl_verify: bool = True,
+        logger: logging.Logger = None,
+        pool_size: int = 100,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        scheme: str = "https",
+        hooks: Optional[Iterable[RequestHook]] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        upload_index: Optional[UploadIndex] = None,
+        serializer: Optional[JSONSerializer] = None,
+    ):
+        """
+        Constructor for AsyncABS2API
+        :param hostname: URL without "https://"
+        :param api_key: (optional) string used for authentication when using POST / DELETE
+        :param ver: version number of the API, standard v1
+        :param ssl_verify: Normally set to true, can be set to false when facing issues with SSL/TLS cert
+        :param logger: (optional) accepts preexisting logger
+        :param pool_size: maximum number of simultaneously open connections to the web API
+        :param concurrency: (optional) maximum number of requests in flight, defaults to pool_size
+        :param timeout: (optional) default total timeout in seconds for every request, None waits forever
+        :param scheme: (optional) URL scheme, "http" can be used for a local stand-in server
+        :param hooks: (optional) callables receiving a RequestRecord with the measurements of every request,
+                      e.g. a metrics.Metrics to export latency histograms, byte counts and status codes
+        :param retry: (optional) RetryPolicy resending requests that failed with a transient error
+        :param breaker: (optional) CircuitBreaker failing calls fast while the QUBO solver is not available
+        :param upload_index: (optional) UploadIndex consulted before every upload of a QUBO matrix, see ABS2API
+        :param serializer: (optional) serializers.JSONSerializer for request and response bodies
+        """
+        self._logger = logger or logging.getLogger(__name__)
+        self._rest_adapter = AsyncRestAdapter(
+            hostname,
+            api_key,
+            ver,
+            ssl_verify,
+            logger,
+            pool_size=pool_size,
+            concurrency=concurrency,
+            timeout=timeout,
+            scheme=scheme,
+            hooks=hooks,
+            retry=retry,
+            breaker=breaker,
+            serializer=serializer,
+        )
+        self.upload_index = upload_index
+        self.verification_stats = VerificationStats()
+        # Set to False once the web API rejected a compressed upload
+        self._compression_supported = True
+
+    async def close(self) -> None:
+        """
+        Close all connections held open to the web API.
+        """
+        await self._rest_adapter.close()
+
+    async def __aenter__(self) -> "AsyncABS2API":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def get_status(self) -> StatusInformation:
+        """
+        Check if the QUBO solver is working, see ABS2API.get_status
+        """
+        breaker = self._rest_adapter.breaker
+        try:
+            result = await self._rest_adapter.get(endpoint="")
+        except ABS2Exception as e:
+            if breaker is not None and e.status_code == 503:
+                breaker.report_status(False)
+            raise
+        status = StatusInformation(**result.data)
+        if breaker is not None:
+            breaker.report_status(status.active)
+        return status
+
+    async def register_user(self, user: User) -> Result:
+        """
+        Register a user with the QUBO solver, see ABS2API.register_user
+        """
+        return await self._rest_adapter.post("signup", data=as_dict(user))
+
+    async def retrieve_user_information(self, username: str, password: str) -> Result:
+        """
+        Retrieve information about a registered user, see ABS2API.retrieve_user_information
+        """
+        return await self._rest_adapter.post(
+            "account", data={"username": username, "password": password}
+        )
+
+    async def retrieve_access_token(self, username: str, password: str) -> TokenMessage:
+        """
+        Retrieve an access token, see ABS2API.retrieve_access_token
+        """
+        result = await self._rest_adapter.post(
+            "token", data={"username": username, "password": password}
+        )
+        return TokenMessage(**result.data)
+
+    async def retrieve_new_password(self, username: str, email: str) -> Result:
+        """
+        Retrieve a new password, see ABS2API.retrieve_new_password
+        """
+        return await self._rest_adapter.post(
+            "account", data={"username": username, "email": email}
+        )
+
+    async def retrieve_new_username(self, email: str) -> Result:
+        """
+        Retrieve a new username, see ABS2API.retrieve_new_username
+        """
+        return await self._rest_adapter.post("account", data={"email": email})
+
+    async def change_password(
+        self, username: str, password: str, new_password: str
+    ) -> Result:
+        """
+        Update the password of a user, see ABS2API.change_password
+        """
+        return await self._rest_adapter.put(
+            "account",
+            data={
+                "username": username,
+                "password": password,
+                "newpassword": new_password,
+            },
+        )
+
+    async def delete_user_account(self, token: str) -> Result:
+        """
+        Delete the user account, see ABS2API.delete_user_account
+        """
+        return await self._rest_adapter.delete(
+            "account", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    async def post_qubo_matrix(
+        self,
+        token: str,
+        filename: str,
+        stream: bool = False,
+        validate: bool = False,
+        chunk_size: int = 1 << 20,
+        progress: Optional[ProgressCallback] = None,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+    ) -> QUBOMatrixUploadMsg:
+        """
+        Upload a QUBO matrix in JSON format from a file, see ABS2API.post_qubo_matrix for the parameters.
+        With stream=True or compression the file is sent in chunks without being loaded into memory.
+        """
+        check_compression(compression)
+        loop = asyncio.get_running_loop()
+        key = nbit = None
+        if self.upload_index is not None and not stream:
+            key, nbit = await loop.run_in_executor(None, problem_key_of_file, filename)
+            uploaded = await self._find_upload(token, key)
+            if uploaded is not None:
+                return QUBOMatrixUploadMsg(**uploaded)
+        if not self._compression_supported:
+            compression = None
+        body = await loop.run_in_executor(
+            None,
+            matrix_file_body,
+            filename,
+            stream,
+            validate,
+            chunk_size,
+            progress,
+            compression,
+            compress_level,
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        if isinstance(body, bytes):
+            result = await self._rest_adapter.post(
+                "problems", additional_headers=headers, body=body
+            )
+            self._record_upload(key, nbit, result)
+            return QUBOMatrixUploadMsg(**result.data)
+
+        headers["Content-Length"] = str(len(body))
+        if compression is not None:
+            headers["Content-Encoding"] = compression
+        try:
+            with body:
+                result = await self._rest_adapter.post(
+                    "problems", additional_headers=headers, body=_chunks(body)
+                )
+        except ABS2Exception as e:
+            if not ABS2API._is_compression_rejection(e, compression):
+                raise
+            self._disable_compression()
+            return await self.post_qubo_matrix(
+                token, filename, stream, validate, chunk_size, progress
+            )
+        self._record_upload(key, nbit, result)
+        return QUBOMatrixUploadMsg(**result.data)
+
+    async def post_pyqubo_matrix(
+        self,
+        token: str,
+        qubo: QUBO,
+        file: Optional[str] = None,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+        index: Optional[VariableIndex] = None,
+    ) -> PyQUBOMatrixUploadMsg:
+        """
+        Upload a QUBO matrix in dict format, see ABS2API.post_pyqubo_matrix
+        """
+        loop = asyncio.get_running_loop()
+        matrix, index = await loop.run_in_executor(
+            None, prepare_pyqubo_matrix, qubo, file, index
+        )
+        key = None
+        if self.upload_index is not None:
+            key = problem_key(matrix["nbit"], matrix["base"], matrix["qubo"])
+            uploaded = await self._find_upload(token, key)
+            if uploaded is not None:
+                return PyQUBOMatrixUploadMsg(
+                    qubo=qubo,
+                    key_mapping=None,
+                    status_code=200,
+                    index=index,
+                    **uploaded,
+                )
+        body = await loop.run_in_executor(
+            None, self._rest_adapter.serializer.dumps, matrix
+        )
+        result = await self._post_json_problem(token, body, compression, compress_level)
+        self._record_upload(key, matrix["nbit"], result)
+        return PyQUBOMatrixUploadMsg(
+            qubo=qubo,
+            key_mapping=None,
+            status_code=result.status_code,
+            index=index,
+            **result.data,
+        )
+
+    async def post_matrix(
+        self,
+        token: str,
+        matrix: QUBOMatrix,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+    ) -> QUBOMatrixUploadMsg:
+        """
+        Upload a QUBOMatrix, see ABS2API.post_matrix
+        """
+        key = None
+        if self.upload_index is not None:
+            key = problem_key(matrix.nbit, matrix.base, matrix.qubo)
+            uploaded = await self._find_upload(token, key)
+            if uploaded is not None:
+                return QUBOMatrixUploadMsg(**uploaded)
+        body = await asyncio.get_running_loop().run_in_executor(
+            None, matrix.to_bytes, self._rest_adapter.serializer
+        )
+        result = await self._post_json_problem(token, body, compression, compress_level)
+        self._record_upload(key, matrix.nbit, result)
+        return QUBOMatrixUploadMsg(**result.data)
+
+    async def post_sparse_qubo(
+        self,
+        token: str,
+        rows,
+        cols,
+        values,
+        nbit: Optional[int] = None,
+        base: int = 0,
+        file: Optional[str] = None,
+        compression: Optional[str] = None,
+        compress_level: int = 6,
+    ) -> QUBOMatrixUploadMsg:
+        """
+        Upload a QUBO matrix given in coordinate format (requires NumPy), see ABS2API.post_sparse_qubo
+        """
+        matrix = QUBOMatrix.from_coo(rows, cols, values, file, nbit, base)
+        return await self.post_matrix(token, matrix, compression, compress_level)
+
+    async def _post_json_problem(
+        self,
+        token: str,
+        body: bytes,
+        compression: Optional[str],
+        compress_level: int,
+    ) -> Result:
+        check_compression(compression)
+        headers = {"Authorization": f"Bearer {token}"}
+        if compression is not None and self._compression_supported:
+            compressed = await asyncio.get_running_loop().run_in_executor(
+                None, compress_bytes, body, compression, compress_level
+            )
+            try:
+                return await self._rest_adapter.post(
+                    "problems",
+                    additional_headers={**headers, "Content-Encoding": compression},
+                    body=compressed,
+                )
+            except ABS2Exception as e:
+                if not ABS2API._is_compression_rejection(e, compression):
+                    raise
+            self._disable_compression()
+        return await self._rest_adapter.post(
+            "problems", additional_headers=headers, body=body
+        )
+
+    async def _find_upload(self, token: str, key: str) -> Optional[Dict]:
+        if not self.upload_index.reconciled:
+            await self.reconcile_upload_index(token)
+        entry = self.upload_index.lookup(key)
+        if entry is None:
+            return None
+        self._logger.debug(msg=f"QUBO matrix already uploaded as {entry['file']}")
+        return {
+            "message": "QUBO matrix already uploaded",
+            "file": entry["file"],
+            "uri_problem": entry["uri_problem"],
+        }
+
+    def _record_upload(self, key: Optional[str], nbit: int, result: Result) -> None:
+        if key is not None and self.upload_index is not None:
+            self.upload_index.add(
+                key, result.data["file"], nbit, result.data["uri_problem"]
+            )
+
+    async def reconcile_upload_index(self, token: str) -> int:
+        """
+        Remove the entries of the upload_index whose files were deleted or replaced on the server,
+        see ABS2API.reconcile_upload_index
+        """
+        problems = (await self.get_all_problems(token)).data or []
+        return self.upload_index.reconcile(problems)
+
+    def _disable_compression(self) -> None:
+        self._logger.warning(
+            msg="Compressed upload rejected by the web API, compression is disabled"
+        )
+        self._compression_supported = False
+
+    async def get_qubo_matrix_information(
+        self, token: str, filename: str
+    ) -> QUBOMatrixInformation:
+        """
+        Get information on an uploaded matrix file, see ABS2API.get_qubo_matrix_information
+        """
+        result = await self._rest_adapter.get(
+            f"problems/{filename}",
+            additional_headers={"Authorization": f"Bearer {token}"},
+        )
+        information = QUBOMatrixInformation(**result.data)
+        verify = getattr(information, "verify", None)
+        if self.upload_index is not None and verify is not None:
+            self.upload_index.set_verified(filename, verify)
+        return information
+
+    async def iter_verified(
+        self,
+        token: str,
+        filenames: Iterable[str],
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[QUBOMatrixInformation]:
+        """
+        Poll uploaded QUBO matrices until their verification finished, yielding each as soon as it is done,
+        see ABS2API.iter_verified. The pending matrices of a round are polled concurrently.
+        """
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        pending = dict.fromkeys(filenames)
+        verified_bytes = 0
+        backoff = Backoff(poll_interval, max_interval)
+        first = True
+        while pending:
+            finished = False
+            polled = await asyncio.gather(
+                *(
+                    self.get_qubo_matrix_information(token, filename)
+                    for filename in pending
+                )
+            )
+            for filename, information in zip(list(pending), polled):
+                verify = getattr(information, "verify", None)
+                if verify is None:
+                    pending[filename] = information.bytes
+                    continue
+                del pending[filename]
+                finished = True
+                if verify:
+                    # Counted from the start of the wait, which covers sequential verification of a batch as well
+                    verified_bytes += information.bytes
+                    self.verification_stats.record(
+                        verified_bytes, time.monotonic() - started
+                    )
+                yield information
+            if not pending:
+                return
+            if finished or first:
+                # Expect the smallest pending matrix next
+                estimate = self.verification_stats.estimate(min(pending.values()))
+                backoff.reset(max(estimate or 0.0, poll_interval))
+                first = False
+            interval = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ABS2Exception(
+                        f"{len(pending)} QUBO matrices not verified within {timeout} seconds"
+                    )
+                interval = min(interval, remaining)
+            await asyncio.sleep(interval)
+
+    async def wait_until_verified(
+        self,
+        token: str,
+        filename: str,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> QUBOMatrixInformation:
+        """
+        Wait until the verification of an uploaded QUBO matrix finished, see ABS2API.wait_until_verified
+        """
+        verified = self.iter_verified(
+            token, [filename], poll_interval, max_interval, timeout
+        )
+        try:
+            return await verified.__anext__()
+        finally:
+            await verified.aclose()
+
+    async def wait_until_all_verified(
+        self,
+        token: str,
+        filenames: Iterable[str],
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, QUBOMatrixInformation]:
+        """
+        Wait until the verification of many uploaded QUBO matrices finished, see ABS2API.wait_until_all_verified
+        """
+        return {
+            information.file: information
+            async for information in self.iter_verified(
+                token, filenames, poll_interval, max_interval, timeout
+            )
+        }
+
+    async def submit_when_verified(
+        self,
+        token: str,
+        problems: Iterable[Union[str, QUBOMatrix, QUBO]],
+        time_limit: int,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        max_workers: int = 4,
+    ) -> List[Optional[PostJobSuccessMsg]]:
+        """
+        Upload many problems, and post a job for each of them as soon as its verification succeeded,
+        see ABS2API.submit_when_verified. Failures and timeouts raise an ABS2Exception whose jobs attribute
+        holds the jobs posted so far.
+        """
+        uploading = asyncio.Semaphore(max_workers)
+
+        async def upload(problem) -> QUBOMatrixUploadMsg:
+            async with uploading:
+                return await self._upload(token, problem)
+
+        uploads = await asyncio.gather(*(upload(problem) for problem in problems))
+        files = [upload.file for upload in uploads]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        jobs: Dict[str, List[PostJobSuccessMsg]] = {}
+        try:
+            async for information in self.iter_verified(
+                token, files, poll_interval, max_interval, timeout
+            ):
+                if not information.verify:
+                    self._logger.error(
+                        msg=f"Verification of {information.file} failed: "
+                        f"{getattr(information, 'message', '')}"
+                    )
+                    continue
+                # A problem given more than once, e.g. for repeated runs, gets one job per occurrence
+                posted = jobs.setdefault(information.file, [])
+                for _ in range(files.count(information.file)):
+                    posted.append(
+                        await self._post_verified_job(
+                            token, information.file, time_limit, deadline
+                        )
+                    )
+        except ABS2Exception as e:
+            e.jobs = ABS2API._jobs_in_order(files, jobs)
+            raise
+        return ABS2API._jobs_in_order(files, jobs)
+
+    async def _upload(self, token: str, problem) -> QUBOMatrixUploadMsg:
+        if isinstance(problem, str):
+            return await self.post_qubo_matrix(token, problem)
+        if isinstance(problem, QUBOMatrix):
+            return await self.post_matrix(token, problem)
+        if isinstance(problem, dict):
+            return await self.post_pyqubo_matrix(token, problem)
+        raise ABS2Exception(f"Cannot upload a problem of type {type(problem)}")
+
+    async def _post_verified_job(
+        self,
+        token: str,
+        problem: str,
+        time_limit: int,
+        deadline: Optional[float] = None,
+    ) -> PostJobSuccessMsg:
+        backoff = Backoff(0.1, 5.0)
+        while True:
+            try:
+                return await self.post_job(token, problem, time_limit)
+            except ABS2Exception as e:
+                # 102: the web API has not caught up with the finished verification yet
+                if e.status_code != 102:
+                    raise
+            interval = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ABS2Exception(
+                        f"No job could be posted for {problem} before the timeout",
+                        status_code=102,
+                    )
+                interval = min(interval, remaining)
+            await asyncio.sleep(interval)
+
+    async def get_all_problems(self, token: str) -> Result:
+        """
+        Get a full list of uploaded QUBO matrix files, see ABS2API.get_all_problems
+        """
+        return await self._rest_adapter.get(
+            "problems", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    def iter_all_problems(self, token: str) -> AsyncIterator[Dict]:
+        """
+        Iterate over the uploaded QUBO matrix files as they arrive, see ABS2API.iter_all_problems
+        """
+        return self._iter_list(token, "problems")
+
+    async def _iter_list(self, token: str, endpoint: str) -> AsyncIterator[Dict]:
+        parser = JSONArrayParser()
+        async for chunk in self._rest_adapter.stream(
+            endpoint, additional_headers={"Authorization": f"Bearer {token}"}
+        ):
+            for entry in parser.feed(chunk):
+                yield entry
+        for entry in parser.close():
+            yield entry
+
+    async def delete_qubo_matrix(self, token: str, name: str) -> Result:
+        """
+        Delete a QUBO matrix by its filename, see ABS2API.delete_qubo_matrix
+        """
+        result = await self._rest_adapter.delete(
+            f"problems/{name}", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+        if self.upload_index is not None:
+            self.upload_index.forget([name])
+        return result
+
+    async def delete_all_qubo_matrices(self, token: str) -> Result:
+        """
+        Delete all QUBO matrices, see ABS2API.delete_all_qubo_matrices
+        """
+        result = await self._rest_adapter.delete(
+            "problems", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+        if self.upload_index is not None:
+            self.upload_index.forget()
+        return result
+
+    async def post_job(
+        self, token: str, problem: str, time_limit: int
+    ) -> PostJobSuccessMsg:
+        """
+        Post a job for a verified problem, see ABS2API.post_job
+        """
+        result = await self._rest_adapter.post(
+            "jobs",
+            additional_headers={"Authorization": f"Bearer {token}"},
+            data={"problem": problem, "time_limit": time_limit},
+        )
+        return PostJobSuccessMsg(**result.data)
+
+    async def get_job_information(self, token: str, job_name: str) -> JobInformation:
+        """
+        Get information about an unexecuted job, see ABS2API.get_job_information
+        """
+        result = await self._rest_adapter.get(
+            f"jobs/{job_name}", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+        return JobInformation(**result.data)
+
+    async def get_all_jobs(self, token: str) -> Result:
+        """
+        Get a list of all unexecuted jobs, see ABS2API.get_all_jobs
+        """
+        return await self._rest_adapter.get(
+            "jobs", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    def iter_all_jobs(self, token: str) -> AsyncIterator[Dict]:
+        """
+        Iterate over the unexecuted jobs as they arrive, see ABS2API.iter_all_jobs
+        """
+        return self._iter_list(token, "jobs")
+
+    async def delete_job(self, token: str, job_name: str) -> Result:
+        """
+        Delete a job by filename, see ABS2API.delete_job
+        """
+        return await self._rest_adapter.delete(
+            f"jobs/{job_name}", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    async def delete_all_unexecuted_jobs(self, token: str) -> Result:
+        """
+        Delete all unexecuted jobs, see ABS2API.delete_all_unexecuted_jobs
+        """
+        return await self._rest_adapter.delete(
+            "jobs", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    async def get_all_solutions(self, token: str) -> Result:
+        """
+        Get a list of all solution files, see ABS2API.get_all_solutions
+        """
+        return await self._rest_adapter.get(
+            "solutions", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    def iter_all_solutions(self, token: str) -> AsyncIterator[Dict]:
+        """
+        Iterate over the solution files as they arrive, see ABS2API.iter_all_solutions
+        """
+        return self._iter_list(token, "solutions")
+
+    async def get_solution(
+        self,
+        token: str,
+        solution_name: str,
+        verify: bool = False,
+        problem=None,
+        stream: bool = False,
+    ) -> SolutionInformation:
+        """
+        Retrieve a solution by its solution file name, see ABS2API.get_solution for verify and stream.
+        The local evaluation of verify=True runs in a worker thread.
+        """
+        if verify and problem is None:
+            raise ABS2Exception("verify=True requires the QUBO matrix of the problem")
+        headers = {"Authorization": f"Bearer {token}"}
+        if stream:
+            parser = SolutionParser()
+            async for chunk in self._rest_adapter.stream(
+                f"solutions/{solution_name}", additional_headers=headers
+            ):
+                parser.feed(chunk)
+            solution = SolutionInformation(**parser.close())
+        else:
+            result = await self._rest_adapter.get(
+                f"solutions/{solution_name}", additional_headers=headers
+            )
+            solution = SolutionInformation(**result.data)
+        if verify:
+            from .evaluate import QUBOEvaluator
+
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: QUBOEvaluator.of(problem).verify(solution)
+            )
+        return solution
+
+    async def delete_solution(self, token: str, solution_name: str) -> Result:
+        """
+        Delete a solution file by its solution file name, see ABS2API.delete_solution
+        """
+        return await self._rest_adapter.delete(
+            f"solutions/{solution_name}",
+            additional_headers={"Authorization": f"Bearer {token}"},
+        )
+
+    async def delete_all_solutions(self, token: str) -> Result:
+        """
+        Delete all solution files, see ABS2API.delete_all_solutions
+        """
+        return await self._rest_adapter.delete(
+            "solutions", additional_headers={"Authorization": f"Bearer {token}"}
+        )
+
+    async def iter_solutions(
+        self,
+        token: str,
+        job: str,
+        time_limit: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[SolutionInformation]:
+        """
+        Poll the solution file of a job and yield every improved intermediate solution,
+        see ABS2API.iter_solutions
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        backoff = Backoff(poll_interval, max_interval)
+        best = None
+        while True:
+            try:
+                solution = await self.get_solution(token, job)
+            except ABS2Exception as e:
+                if e.status_code != 404:
+                    raise
+                status = await self.get_status()
+                interval = queued_interval(status, poll_interval, max_interval)
+            else:
+                if solution.terminated or best is None or solution.energy < best:
+                    best = solution.energy
+                    yield solution
+                    if solution.terminated:
+                        return
+                    if time_limit is None:
+                        time_limit = time_limit_of(solution)
+                    backoff.reset(
+                        running_interval(time_limit, poll_interval, max_interval)
+                    )
+                interval = backoff.next()
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise ABS2Exception(
+                        f"Job {job} has not terminated within {timeout} seconds"
+                    )
+                interval = min(interval, remaining)
+            await asyncio.sleep(interval)
+
+    async def wait_for_solution(
+        self,
+        token: str,
+        job: str,
+        target_energy: Optional[int] = None,
+        delete_on_target: bool = False,
+        time_limit: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> SolutionInformation:
+        """
+        Wait until a job terminates, or until its solution reaches a target energy,
+        see ABS2API.wait_for_solution
+        """
+        async for solution in self.iter_solutions(
+            token, job, time_limit, poll_interval, max_interval, timeout
+        ):
+            if target_energy is None or solution.energy > target_energy:
+                continue
+            if delete_on_target and not solution.terminated:
+                await self.delete_solution(token, job)
+            break
+        return solution
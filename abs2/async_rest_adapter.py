@@ -0,0 +1,523 @@
+import asyncio
+import logging
+import time
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+import aiohttp
+
+from .exceptions import ABS2Exception
+from .metrics import RequestHook, RequestRecord, endpoint_label
+from .models import Result
+from .rest_adapter import _BodyAborted, _error_message
+from .retry import CircuitBreaker, RetryPolicy
+from .serializers import JSONSerializer, default_serializer
+
+# Result of a request, or the response of a streamed request
+Response = TypeVar("Response")
+
+
+def _body_size(body) -> int:
+    return len(body) if isinstance(body, bytes) else 0
+
+
+def _body_error(error: Optional[BaseException]) -> Optional[ABS2Exception]:
+    # aiohttp wraps an exception raised by a streamed body while it is written, e.g. by its validation
+    while error is not None:
+        if isinstance(error, ABS2Exception):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class AsyncRestAdapter:
+    def __init__(
+        self,
+        hostname: str = "qubosolver.cs.hiroshima-u.ac.jp",
+        api_key: str = "",
+        ver: str = "v1",
+        ssl_verify: bool = True,
+        logger: logging.Logger = None,
+        pool_size: int = 100,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        scheme: str = "https",
+        hooks: Optional[Iterable[RequestHook]] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        serializer: Optional[JSONSerializer] = None,
+    ):
+        """
+        Constructor for AsyncRestAdapter, the asyncio counterpart of RestAdapter
+        All coroutines share one aiohttp session, whose connection pool is created on first use
+        inside the running event loop.
+        :param hostname: URL without "https://"
+        :param api_key: (optional) string used for authentication when using POST / DELETE
+        :param ver: version number of the API, standard v1
+        :param ssl_verify: Normally set to true, can be set to false when facing issues with SSL/TLS cert
+        :param logger: (optional) accepts preexisting logger
+        :param pool_size: maximum number of simultaneously open connections
+        :param concurrency: (optional) maximum number of requests in flight, defaults to pool_size
+        :param timeout: (optional) default total timeout in seconds for every request, None waits forever
+        :param scheme: (optional) URL scheme, "http" can be used for a local stand-in server
+        :param hooks: (optional) callables receiving a RequestRecord of every request, see RestAdapter
+        :param retry: (optional) RetryPolicy for failed requests, see RestAdapter
+        :param breaker: (optional) CircuitBreaker failing requests fast while the web API is not available
+        :param serializer: (optional) JSONSerializer of request and response bodies, see RestAdapter
+        """
+        self._logger = logger or logging.getLogger(__name__)
+        self.url = "{}://{}/{}/".format(scheme, hostname, ver)
+        self._api_key = api_key
+        self._ssl_verify = ssl_verify
+        self._pool_size = pool_size
+        self._concurrency = concurrency or pool_size
+        self._timeout = timeout
+        self.hooks: List[RequestHook] = list(hooks or ())
+        self.retry = retry
+        self.breaker = breaker
+        self.serializer = serializer or default_serializer()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_size, ssl=None if self._ssl_verify else False
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the underlying session and all pooled connections
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncRestAdapter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _do(
+        self,
+        http_method: str,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Dict = None,
+        additional_headers=None,
+        timeout: Optional[float] = None,
+        body: Union[bytes, AsyncIterable[bytes]] = None,
+    ) -> Result:
+        """
+        Generic coroutine to send requests to the API
+        :param http_method: POST / GET / DELETE
+        :param endpoint: Endpoint of the API on which the http_method should be executed
+        :param ep_params: (optional) Dictionary, list of tuples or bytes to send
+        in the query string
+        :param data: (optional) A JSON serializable Python object to send in the body
+        :param timeout: (optional) timeout for this request, overrides the default timeout of the adapter
+        :param body: (optional) raw JSON body as bytes or async iterable of chunks, sent as is instead of data.
+                     Chunks are streamed without being loaded into memory, and never retried
+        :return:
+        """
+        started = time.perf_counter()
+        if body is None and data is not None:
+            # Encoded once for all attempts and sent as is
+            body = self.serializer.dumps(data)
+        encode_seconds = time.perf_counter() - started
+        # A streamed body is consumed by the first attempt and cannot be sent again
+        return await self._attempts(
+            http_method,
+            endpoint,
+            isinstance(body, (bytes, type(None))),
+            lambda attempt: self._send(
+                http_method,
+                endpoint,
+                ep_params,
+                additional_headers,
+                timeout,
+                body,
+                encode_seconds if attempt == 1 else 0.0,
+                attempt,
+            ),
+        )
+
+    async def _attempts(
+        self,
+        http_method: str,
+        endpoint: str,
+        retriable: bool,
+        send: Callable[[int], Awaitable[Response]],
+    ) -> Response:
+        # Awaits send with the number of the attempt until it succeeds, or the retry policy gives up
+        # The status endpoint is never short-circuited, it tells whether the solver is available again
+        breaker = self.breaker if endpoint else None
+        retry = self.retry if retriable else None
+        attempt = 1
+        while True:
+            if breaker is not None:
+                breaker.before()
+            try:
+                result = await send(attempt)
+            except _BodyAborted as e:
+                aborted = e.error
+            except ABS2Exception as e:
+                if breaker is not None:
+                    breaker.record(e.status_code)
+                # Only a failed connection attempt guarantees the request never reached the web API
+                sent = not isinstance(e.__cause__, aiohttp.ClientConnectorError)
+                if retry is None or not retry.should_retry(
+                    http_method, attempt, e.status_code, sent
+                ):
+                    raise
+                delay = retry.delay(attempt, e.retry_after)
+                self._logger.warning(
+                    msg=f"method={http_method}, url={self.url + endpoint}, "
+                    f"attempt={attempt} failed ({e}), retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            else:
+                if breaker is not None:
+                    breaker.record(
+                        result.status
+                        if isinstance(result, aiohttp.ClientResponse)
+                        else result.status_code
+                    )
+                return result
+            # Raised outside of the except clause, so the error is not chained to _BodyAborted
+            if breaker is not None:
+                breaker.release()
+            raise aborted
+
+    async def _send(
+        self,
+        http_method: str,
+        endpoint: str,
+        ep_params: Optional[Dict],
+        additional_headers: Optional[Dict],
+        timeout: Optional[float],
+        body: Union[bytes, AsyncIterable[bytes], None],
+        encode_seconds: float,
+        attempt: int,
+    ) -> Result:
+        # One attempt of _do, encode_seconds is the time it took to encode the body
+        if additional_headers is None:
+            additional_headers = {}
+        full_url = self.url + endpoint
+        headers = {"x-api-key": self._api_key, "Content-Type": "application/json"}
+        headers = {**headers, **additional_headers}
+        log_line_pre = f"method={http_method}, url={full_url}, params={ep_params}"
+        log_line_post = ", ".join(
+            (log_line_pre, "success={}, status_code={}, message={}")
+        )
+        session = self._get_session()
+        request_timeout = (
+            aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+        )
+        instrumented = bool(self.hooks)
+        encoded = time.perf_counter()
+        started = encoded - encode_seconds
+        status_code = None
+        # Log HTTP params and perform an HTTP request, catching and re-raising any exceptions
+        async with self._semaphore:
+            try:
+                self._logger.debug(msg=log_line_pre)
+                async with session.request(
+                    method=http_method,
+                    url=full_url,
+                    headers=headers,
+                    params=ep_params,
+                    data=body,
+                    timeout=request_timeout,
+                ) as response:
+                    status_code, reason = response.status, response.reason
+                    retry_after = response.headers.get("Retry-After")
+                    is_success = 299 >= status_code >= 200  # OK
+                    received = time.perf_counter()
+                    content = await response.read()
+                    read = time.perf_counter()
+                    data_out = None
+                    try:
+                        data_out = self.serializer.loads(content)
+                    except ValueError as e:
+                        # Error responses without a JSON body are reported by their status code below
+                        if is_success:
+                            self._logger.error(msg=log_line_post.format(False, None, e))
+                            raise ABS2Exception(
+                                "Bad JSON in response", status_code=status_code
+                            ) from e
+                    finally:
+                        if instrumented:
+                            finished = time.perf_counter()
+                            self._notify(
+                                RequestRecord(
+                                    http_method,
+                                    endpoint_label(endpoint),
+                                    status_code,
+                                    finished - started,
+                                    response_seconds=received - encoded,
+                                    request_bytes=_body_size(body),
+                                    response_bytes=len(content),
+                                    encode_seconds=encoded - started,
+                                    decode_seconds=finished - read,
+                                    attempt=attempt,
+                                )
+                            )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # The request was aborted by its own body, which failed while it was sent
+                error = _body_error(e)
+                self._logger.error(
+                    msg=(
+                        (str(e))
+                        if error is None
+                        else log_line_post.format(False, None, error)
+                    )
+                )
+                if instrumented and status_code is None:
+                    self._notify(
+                        RequestRecord(
+                            http_method,
+                            endpoint_label(endpoint),
+                            None,
+                            time.perf_counter() - started,
+                            request_bytes=_body_size(body),
+                            encode_seconds=encoded - started,
+                            attempt=attempt,
+                        )
+                    )
+                if error is not None:
+                    raise _BodyAborted(error) from None
+                raise ABS2Exception("Request failed") from e
+        log_line = log_line_post.format(is_success, status_code, reason)
+        if is_success:
+            self._logger.debug(msg=log_line)
+            return Result(status_code, message=reason, data=data_out)
+        self._logger.error(msg=log_line)
+        raise ABS2Exception(
+            f"{status_code}: {reason}",
+            status_code=status_code,
+            retry_after=retry_after,
+            message=_error_message(data_out),
+        )
+
+    def _notify(self, record: RequestRecord) -> None:
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                self._logger.exception(msg="Request hook failed")
+
+    async def stream(
+        self,
+        endpoint: str,
+        additional_headers: Dict = None,
+        timeout: Optional[float] = None,
+        chunk_size: int = 1 << 16,
+    ) -> AsyncIterator[bytes]:
+        """
+        GET an endpoint and yield the (decompressed) response body in chunks as they arrive, see RestAdapter.stream
+        :param endpoint: Endpoint of the API on which the GET should be executed
+        :param additional_headers: additional headers for e.g. a bearer token
+        :param timeout: (optional) total timeout for this request in seconds, including reading the whole body
+        :param chunk_size: maximum number of bytes per chunk
+        """
+        started = time.perf_counter()
+        attempt = 0
+
+        def open_response(number: int) -> Awaitable[aiohttp.ClientResponse]:
+            nonlocal attempt
+            attempt = number
+            return self._open(endpoint, additional_headers, timeout, number)
+
+        self._get_session()
+        # The connection is held until the whole body was read
+        async with self._semaphore:
+            response = await self._attempts("GET", endpoint, True, open_response)
+            opened = time.perf_counter()
+            received = 0
+            try:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    received += len(chunk)
+                    yield chunk
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._logger.error(msg=(str(e)))
+                raise ABS2Exception("Request failed") from e
+            finally:
+                response.release()
+                if self.hooks:
+                    self._notify(
+                        RequestRecord(
+                            "GET",
+                            endpoint_label(endpoint),
+                            response.status,
+                            time.perf_counter() - started,
+                            response_seconds=opened - started,
+                            response_bytes=received,
+                            attempt=attempt,
+                        )
+                    )
+
+    async def _open(
+        self,
+        endpoint: str,
+        additional_headers: Optional[Dict],
+        timeout: Optional[float],
+        attempt: int,
+    ) -> aiohttp.ClientResponse:
+        # One attempt of stream, returns the response once its headers arrived
+        full_url = self.url + endpoint
+        headers = {"x-api-key": self._api_key, **(additional_headers or {})}
+        request_timeout = (
+            aiohttp.ClientTimeout(total=timeout) if timeout is not None else None
+        )
+        started = time.perf_counter()
+        try:
+            self._logger.debug(msg=f"method=GET, url={full_url}, stream=True")
+            response = await self._get_session().get(
+                full_url, headers=headers, timeout=request_timeout
+            )
+            if 299 >= response.status >= 200:
+                return response
+            # Error responses are small, they are read as a whole and the connection is released
+            try:
+                content = await response.read()
+            finally:
+                response.release()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._logger.error(msg=(str(e)))
+            if self.hooks:
+                self._notify(
+                    RequestRecord(
+                        "GET",
+                        endpoint_label(endpoint),
+                        None,
+                        time.perf_counter() - started,
+                        attempt=attempt,
+                    )
+                )
+            raise ABS2Exception("Request failed") from e
+        if self.hooks:
+            self._notify(
+                RequestRecord(
+                    "GET",
+                    endpoint_label(endpoint),
+                    response.status,
+                    time.perf_counter() - started,
+                    response_bytes=len(content),
+                    attempt=attempt,
+                )
+            )
+        self._logger.error(
+            msg=f"method=GET, url={full_url}, success=False, "
+            f"status_code={response.status}, message={response.reason}"
+        )
+        try:
+            data_out = self.serializer.loads(content)
+        except ValueError:
+            data_out = None
+        raise ABS2Exception(
+            f"{response.status}: {response.reason}",
+            status_code=response.status,
+            retry_after=response.headers.get("Retry-After"),
+            message=_error_message(data_out),
+        )
+
+    async def get(
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        additional_headers: Dict = None,
+        timeout: Optional[float] = None,
+    ) -> Result:
+        """
+        Generic GET coroutine for a given Endpoint, see RestAdapter.get
+        """
+        return await self._do(
+            http_method="GET",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            additional_headers=additional_headers,
+            timeout=timeout,
+        )
+
+    async def post(
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Dict = None,
+        additional_headers: Dict = None,
+        timeout: Optional[float] = None,
+        body: Union[bytes, AsyncIterable[bytes]] = None,
+    ) -> Result:
+        """
+        Generic POST coroutine for a given Endpoint, see RestAdapter.post
+        :param body: (optional) raw JSON body as bytes or async iterable of chunks, sent instead of data
+        """
+        return await self._do(
+            http_method="POST",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            additional_headers=additional_headers,
+            timeout=timeout,
+            body=body,
+        )
+
+    async def delete(
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Dict = None,
+        additional_headers: Dict = None,
+        timeout: Optional[float] = None,
+    ) -> Result:
+        """
+        Generic DELETE coroutine for a given Endpoint, see RestAdapter.delete
+        """
+        return await self._do(
+            http_method="DELETE",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            additional_headers=additional_headers,
+            timeout=timeout,
+        )
+
+    async def put(
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Dict = None,
+        additional_headers: Dict = None,
+        timeout: Optional[float] = None,
+    ) -> Result:
+        """
+        Generic PUT coroutine for a given Endpoint, see RestAdapter.put
+        """
+        return await self._do(
+            http_method="PUT",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            additional_headers=additional_headers,
+            timeout=timeout,
+        )
@@ -0,0 +1,102 @@
+import inspect
+import logging
+import threading
+from typing import Dict, Optional
+
+from .abs2_api import ABS2API
+from .exceptions import ABS2Exception
+from .models import UserNP
+
+
+class ABS2Session:
+    """
+    ABS2API bound to a user: the bearer token is retrieved on first use and cached,
+    and every endpoint taking a token is available without it, e.g. session.post_job(problem, 10).
+    When the web API answers 401, the token is refreshed once (even if many threads fail at the same time)
+    and the request is replayed with the new token.
+    Notes:  Iterators (e.g. iter_solutions) are bound to the token that was valid when they were created.
+    """
+
+    def __init__(self, user: UserNP, api: Optional[ABS2API] = None, **kwargs):
+        """
+        Constructor for ABS2Session
+        :param user: username and password used to retrieve access tokens
+        :param api: (optional) ABS2API to send the requests with, one is created from kwargs if omitted
+        :param kwargs: (optional) arguments of the ABS2API constructor
+        """
+        self.user = user
+        self._owns_api = api is None
+        self.api = api if api is not None else ABS2API(**kwargs)
+        self._logger = kwargs.get("logger") or logging.getLogger(__name__)
+        self._token: Optional[str] = None
+        self._lock = threading.Lock()
+        self._bound: Dict[str, object] = {}
+
+    @property
+    def token(self) -> str:
+        """
+        The cached bearer token, retrieved on first access.
+        """
+        token = self._token
+        if token is None:
+            token = self.refresh(None)
+        return token
+
+    def refresh(self, stale: Optional[str]) -> str:
+        """
+        Retrieve a new token, unless another thread already replaced the stale one.
+        :param stale: the token that was rejected, None if no token was retrieved yet
+        :return: the current token
+        """
+        with self._lock:
+            if self._token == stale:
+                self._logger.debug(
+                    msg=f"Retrieving an access token for {self.user.username}"
+                )
+                self._token = self.api.retrieve_access_token(
+                    self.user.username, self.user.password
+                ).access_token
+            return self._token
+
+    def _call(self, method, *args, **kwargs):
+        token = self.token
+        try:
+            return method(token, *args, **kwargs)
+        except ABS2Exception as e:
+            if e.status_code != 401:
+                raise
+        return method(self.refresh(token), *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined on the session itself
+        if name.startswith("_") or name == "api":
+            raise AttributeError(name)
+        method = getattr(self.api, name)
+        if not callable(method):
+            return method
+        bound = self._bound.get(name)
+        if bound is None:
+            parameters = list(inspect.signature(method).parameters)
+            if not parameters or parameters[0] != "token":
+                return method
+
+            def bound(*args, **kwargs):
+                return self._call(method, *args, **kwargs)
+
+            bound.__name__ = name
+            bound.__doc__ = method.__doc__
+            self._bound[name] = bound
+        return bound
+
+    def close(self) -> None:
+        """
+        Close the connections of the ABS2API if it was created by this session.
+        """
+        if self._owns_api:
+            self.api.close()
+
+    def __enter__(self) -> "ABS2Session":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,271 @@
+import copy
+import gzip
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+from .abs2_api import ABS2API
+from .compression import is_gzip_file
+from .exceptions import ABS2Exception
+from .models import (
+    QUBO,
+    PostJobSuccessMsg,
+    PyQUBOMatrixUploadMsg,
+    QUBOMatrix,
+    QUBOMatrixUploadMsg,
+    Result,
+    SolutionInformation,
+    StatusInformation,
+    VariableIndex,
+)
+from .streaming import QUBOStreamValidator
+
+# Prefix of the problem, job and solution names handed out by SolverRouter for the local backend,
+# so they never collide with the names of the web API
+LOCAL_PREFIX = "local:"
+
+
+def _matrix_nbit(filename: str, chunk_size: int = 1 << 16) -> int:
+    # Reads the file only up to "nbit", the "qubo" entries before it are checked chunk by chunk but not kept
+    validator = QUBOStreamValidator()
+    opener = gzip.open if is_gzip_file(filename) else open
+    with opener(filename, "rb") as f:
+        while "nbit" not in validator.members:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                validator.close()
+                break
+            validator.feed(chunk)
+    return validator.members["nbit"]
+
+
+class SolverBackend(ABC):
+    """
+    The calls to submit problems and retrieve their solutions, served by ABS2API (the web API),
+    LocalSolver (in-process) or SolverRouter (either, per problem). ABS2API implements the same methods
+    without deriving from this class and is registered as a virtual subclass.
+    See ABS2API for the documentation of every method.
+    """
+
+    @abstractmethod
+    def get_status(self) -> StatusInformation: ...
+
+    @abstractmethod
+    def post_qubo_matrix(
+        self, token: str, filename: str, **kwargs
+    ) -> QUBOMatrixUploadMsg: ...
+
+    @abstractmethod
+    def post_matrix(
+        self, token: str, matrix: QUBOMatrix, **kwargs
+    ) -> QUBOMatrixUploadMsg: ...
+
+    @abstractmethod
+    def post_pyqubo_matrix(
+        self,
+        token: str,
+        qubo: QUBO,
+        file: Optional[str] = None,
+        index: Optional[VariableIndex] = None,
+        **kwargs,
+    ) -> PyQUBOMatrixUploadMsg: ...
+
+    @abstractmethod
+    def delete_qubo_matrix(self, token: str, name: str) -> Result: ...
+
+    @abstractmethod
+    def post_job(
+        self, token: str, problem: str, time_limit: int
+    ) -> PostJobSuccessMsg: ...
+
+    @abstractmethod
+    def get_solution(
+        self, token: str, solution_name: str, **kwargs
+    ) -> SolutionInformation: ...
+
+    @abstractmethod
+    def wait_for_solution(
+        self, token: str, job: str, **kwargs
+    ) -> SolutionInformation: ...
+
+    @abstractmethod
+    def delete_job(self, token: str, job_name: str) -> Result: ...
+
+    @abstractmethod
+    def delete_solution(self, token: str, solution_name: str) -> Result: ...
+
+    def close(self) -> None:
+        pass
+
+
+class SolverRouter(SolverBackend):
+    """
+    Sends every problem either to the web API or to a local solver: small problems are solved locally,
+    where the upload, verification and queueing latency of the web API would dominate, and so are all problems
+    while the QUBO solver of the web API is not working or its queue is too long.
+    The backend is chosen when a problem is uploaded; its jobs and solutions are served by the same backend.
+    Names of the local backend are handed out with LOCAL_PREFIX, e.g. "local:small.json", so a problem or job
+    of the same name on the web API is never mistaken for it. Pass the names returned by the router back to it.
+    """
+
+    def __init__(
+        self,
+        remote: SolverBackend,
+        local: Optional[SolverBackend] = None,
+        max_local_nbit: int = 256,
+        max_queue: int = 10,
+        status_ttl: float = 30.0,
+        logger: logging.Logger = None,
+    ):
+        """
+        Constructor for SolverRouter
+        :param remote: the ABS2API of the web API
+        :param local: (optional) the local backend, a LocalSolver if omitted
+        :param max_local_nbit: problems with at most this many variables are always solved locally
+        :param max_queue: larger problems are solved locally while at least this many jobs are queued remotely
+        :param status_ttl: seconds the status of the web API is cached between two get_status requests
+        :param logger: (optional) accepts preexisting logger
+        """
+        if local is None:
+            from .local_solver import LocalSolver
+
+            local = LocalSolver()
+        self.remote = remote
+        self.local = local
+        self.max_local_nbit = max_local_nbit
+        self.max_queue = max_queue
+        self.status_ttl = status_ttl
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._status: Optional[Tuple[float, Optional[StatusInformation]]] = None
+
+    def close(self) -> None:
+        self.local.close()
+
+    def __enter__(self) -> "SolverRouter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_status(self) -> StatusInformation:
+        return self.remote.get_status()
+
+    def remote_status(self) -> Optional[StatusInformation]:
+        """
+        The cached status of the web API, None if the web API is not reachable.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._status is not None and now - self._status[0] < self.status_ttl:
+                return self._status[1]
+        try:
+            status = self.remote.get_status()
+        except ABS2Exception as e:
+            self._logger.warning(msg=f"Web API status unavailable: {e}")
+            status = None
+        with self._lock:
+            self._status = (now, status)
+        return status
+
+    def choose(self, nbit: int) -> SolverBackend:
+        """
+        The backend for a problem with nbit variables.
+        """
+        if nbit <= self.max_local_nbit:
+            return self.local
+        status = self.remote_status()
+        if (
+            status is None
+            or not status.active
+            or status.jobs_in_queue >= self.max_queue
+        ):
+            return self.local
+        return self.remote
+
+    def _named(self, backend: SolverBackend, name: str) -> str:
+        # The name handed out for a name of a backend
+        return LOCAL_PREFIX + name if backend is self.local else name
+
+    def _backend(self, name: str) -> Tuple[SolverBackend, str]:
+        # The backend serving a name handed out by the router, and the name on that backend
+        if name.startswith(LOCAL_PREFIX):
+            return self.local, name[len(LOCAL_PREFIX) :]
+        return self.remote, name
+
+    def _solution(
+        self, backend: SolverBackend, solution: SolutionInformation
+    ) -> SolutionInformation:
+        if backend is not self.local:
+            return solution
+        # A copy, the local backend hands out the same solution object more than once
+        solution = copy.copy(solution)
+        solution.problem = LOCAL_PREFIX + solution.problem
+        solution.job = LOCAL_PREFIX + solution.job
+        return solution
+
+    def post_qubo_matrix(
+        self, token: str, filename: str, **kwargs
+    ) -> QUBOMatrixUploadMsg:
+        backend = self.choose(_matrix_nbit(filename))
+        message = backend.post_qubo_matrix(token, filename, **kwargs)
+        message.file = self._named(backend, message.file)
+        return message
+
+    def post_matrix(
+        self, token: str, matrix: QUBOMatrix, **kwargs
+    ) -> QUBOMatrixUploadMsg:
+        backend = self.choose(matrix.nbit)
+        message = backend.post_matrix(token, matrix, **kwargs)
+        message.file = self._named(backend, message.file)
+        return message
+
+    def post_pyqubo_matrix(
+        self,
+        token: str,
+        qubo: QUBO,
+        file: Optional[str] = None,
+        index: Optional[VariableIndex] = None,
+        **kwargs,
+    ) -> PyQUBOMatrixUploadMsg:
+        if index is None:
+            index = VariableIndex.from_qubo(qubo)
+        backend = self.choose(len(index))
+        message = backend.post_pyqubo_matrix(
+            token, qubo, file=file, index=index, **kwargs
+        )
+        message.file = self._named(backend, message.file)
+        return message
+
+    def delete_qubo_matrix(self, token: str, name: str) -> Result:
+        backend, name = self._backend(name)
+        return backend.delete_qubo_matrix(token, name)
+
+    def post_job(self, token: str, problem: str, time_limit: int) -> PostJobSuccessMsg:
+        backend, problem = self._backend(problem)
+        job = backend.post_job(token, problem, time_limit)
+        job.job = self._named(backend, job.job)
+        return job
+
+    def get_solution(
+        self, token: str, solution_name: str, **kwargs
+    ) -> SolutionInformation:
+        backend, name = self._backend(solution_name)
+        return self._solution(backend, backend.get_solution(token, name, **kwargs))
+
+    def wait_for_solution(self, token: str, job: str, **kwargs) -> SolutionInformation:
+        backend, name = self._backend(job)
+        return self._solution(backend, backend.wait_for_solution(token, name, **kwargs))
+
+    def delete_job(self, token: str, job_name: str) -> Result:
+        backend, name = self._backend(job_name)
+        return backend.delete_job(token, name)
+
+    def delete_solution(self, token: str, solution_name: str) -> Result:
+        backend, name = self._backend(solution_name)
+        return backend.delete_solution(token, name)
+
+
+SolverBackend.register(ABS2API)
@@ -0,0 +1,338 @@
+"""
+Command-line tool for the ABS2 web API: upload directories of QUBO matrix files, submit jobs,
+track them to completion and download the solutions, with a pool of parallel workers sharing one
+session and bearer token.
+
+    abs2 status
+    abs2 upload problems/
+    abs2 run problems/ --time-limit 10 --output solutions/
+    abs2 download flower-k_0001.json --output solutions/
+
+The user is given with --username / --password or the ABS2_USERNAME / ABS2_PASSWORD environment variables.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from .exceptions import ABS2Exception
+from .metrics import RequestRecord
+from .models import SolutionInformation, UserNP
+
+MATRIX_SUFFIXES = (".json", ".json.gz")
+
+
+def collect_files(paths: Sequence[str]) -> List[str]:
+    """
+    QUBO matrix files given directly or found in the given directories (not recursively), in sorted order.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                sorted(
+                    os.path.join(path, name)
+                    for name in os.listdir(path)
+                    if name.endswith(MATRIX_SUFFIXES)
+                )
+            )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise ABS2Exception(f"No such file or directory: {path}")
+    return files
+
+
+def solution_to_json(solution: SolutionInformation) -> Dict:
+    data = {
+        "job": solution.job,
+        "problem": solution.problem,
+        "terminated": solution.terminated,
+        "energy": solution.energy,
+        "tts": solution.tts,
+        "solution": solution.solution,
+    }
+    for optional in ("success", "kernel_time"):
+        if hasattr(solution, optional):
+            data[optional] = getattr(solution, optional)
+    return data
+
+
+class Summary:
+    """
+    Request hook collecting the duration of every request, for the summary printed at the end of a command.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._seconds: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def __call__(self, record: RequestRecord) -> None:
+        with self._lock:
+            self._seconds[f"{record.method} {record.endpoint}"].append(record.seconds)
+            if record.status_code is None or record.status_code >= 400:
+                self.errors += 1
+            self.request_bytes += record.request_bytes
+            self.response_bytes += record.response_bytes
+
+    def report(self, done: int, unit: str) -> None:
+        """
+        Print the throughput of the command and the latency per endpoint.
+        :param done: number of completed items, e.g. jobs
+        :param unit: name of the items
+        """
+        elapsed = time.monotonic() - self.started
+        requests = sum(len(seconds) for seconds in self._seconds.values())
+        print(
+            f"{done} {unit} in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} {unit}/s), "
+            f"{requests} requests ({self.errors} failed), "
+            f"{self.request_bytes / 2**20:.1f} MB sent, "
+            f"{self.response_bytes / 2**20:.1f} MB received",
+        )
+        print(f"{'requests':>9} {'p50 ms':>9} {'p99 ms':>9}  endpoint")
+        for endpoint, seconds in sorted(self._seconds.items()):
+            seconds = sorted(seconds)
+            p99 = seconds[min(len(seconds) - 1, int(len(seconds) * 0.99))]
+            print(
+                f"{len(seconds):>9} {statistics.median(seconds) * 1000:>9.1f} "
+                f"{p99 * 1000:>9.1f}  {endpoint}"
+            )
+
+
+def _session(args: argparse.Namespace, summary: Summary):
+    from .abs2_api import ABS2API
+    from .auth import ABS2Session
+    from .dedup import UploadIndex
+    from .retry import RetryPolicy
+
+    if not args.username or not args.password:
+        raise ABS2Exception(
+            "A username and password are required, "
+            "use --username / --password or ABS2_USERNAME / ABS2_PASSWORD"
+        )
+    api = ABS2API(
+        args.host,
+        scheme=args.scheme,
+        pool_size=args.workers,
+        timeout=args.request_timeout,
+        hooks=[summary],
+        retry=RetryPolicy(),
+        upload_index=UploadIndex(args.index) if getattr(args, "index", None) else None,
+    )
+    return ABS2Session(UserNP(args.username, args.password), api)
+
+
+def _write_solution(directory: str, solution: SolutionInformation) -> str:
+    filename = os.path.join(directory, solution.job)
+    with open(filename, "w") as f:
+        json.dump(solution_to_json(solution), f)
+    return filename
+
+
+def status(args: argparse.Namespace, summary: Summary) -> int:
+    from .abs2_api import ABS2API
+
+    with ABS2API(args.host, scheme=args.scheme, timeout=args.request_timeout) as api:
+        try:
+            information = api.get_status()
+        except ABS2Exception as e:
+            if e.status_code != 503:
+                raise
+            print("QUBO solver is not working")
+            return 1
+    print(
+        f"{information.message}: {information.jobs_in_queue} jobs in queue, "
+        f"{information.total_time_limit}s total time limit"
+    )
+    return 0
+
+
+def upload(args: argparse.Namespace, summary: Summary) -> int:
+    files = collect_files(args.paths)
+    with _session(args, summary) as session:
+        with ThreadPoolExecutor(args.workers) as executor:
+            uploads = list(
+                executor.map(lambda filename: session.post_qubo_matrix(filename), files)
+            )
+        failed = 0
+        for information in session.iter_verified(
+            [message.file for message in uploads], timeout=args.timeout
+        ):
+            if information.verify:
+                print(f"{information.file}: verified, nbit={information.nbit}")
+            else:
+                failed += 1
+                print(
+                    f"{information.file}: verification failed, "
+                    f"{getattr(information, 'message', '')}"
+                )
+    summary.report(len(files) - failed, "problems")
+    return 1 if failed else 0
+
+
+def run(args: argparse.Namespace, summary: Summary) -> int:
+    from .tracker import JobTracker
+
+    files = collect_files(args.paths)
+    os.makedirs(args.output, exist_ok=True)
+    failed = 0
+    with _session(args, summary) as session:
+        posted = session.submit_when_verified(
+            files, args.time_limit, max_workers=args.workers, timeout=args.timeout
+        )
+        tracker = JobTracker(session, interval=args.interval)
+        futures = {}
+        for filename, job in zip(files, posted):
+            if job is None:
+                failed += 1
+                print(f"{filename}: verification failed, no job posted")
+            else:
+                futures[job.job] = tracker.track(job.job)
+        try:
+            tracker.run(args.timeout)
+        except ABS2Exception as e:
+            # The solutions of the jobs that did terminate are still written
+            print(f"Stopped waiting for jobs: {e}")
+        for name, future in futures.items():
+            if not future.done():
+                failed += 1
+                print(f"{name}: not terminated")
+                continue
+            try:
+                solution = future.result()
+            except ABS2Exception as e:
+                failed += 1
+                print(f"{name}: {e}")
+                continue
+            _write_solution(args.output, solution)
+            print(f"{name}: energy {solution.energy}, tts {solution.tts:.3f}s")
+    summary.report(len(futures), "jobs")
+    return 1 if failed else 0
+
+
+def download(args: argparse.Namespace, summary: Summary) -> int:
+    os.makedirs(args.output, exist_ok=True)
+    with _session(args, summary) as session:
+
+        def fetch(job: str) -> Optional[SolutionInformation]:
+            try:
+                return session.get_solution(job, stream=args.stream)
+            except ABS2Exception as e:
+                print(f"{job}: {e}")
+                return None
+
+        with ThreadPoolExecutor(args.workers) as executor:
+            solutions = list(executor.map(fetch, args.jobs))
+    for solution in solutions:
+        if solution is not None:
+            print(f"{_write_solution(args.output, solution)}: energy {solution.energy}")
+    downloaded = sum(solution is not None for solution in solutions)
+    summary.report(downloaded, "solutions")
+    return 0 if downloaded == len(solutions) else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="abs2",
+        description="Upload, solve and download QUBO problems with the ABS2 web API",
+    )
+    parser.add_argument(
+        "--host",
+        default=os.environ.get("ABS2_HOST", "qubosolver.cs.hiroshima-u.ac.jp"),
+        help="host name of the web API (default: $ABS2_HOST or the public ABS2 web API)",
+    )
+    parser.add_argument("--scheme", default="https", choices=("https", "http"))
+    parser.add_argument("--username", default=os.environ.get("ABS2_USERNAME"))
+    parser.add_argument("--password", default=os.environ.get("ABS2_PASSWORD"))
+    parser.add_argument(
+        "--workers", type=int, default=4, help="parallel uploads / downloads"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="give up after this many seconds"
+    )
+    parser.add_argument(
+        "--request-timeout",
+        type=float,
+        default=60.0,
+        help="timeout of a single request in seconds",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="check if the QUBO solver is working")
+
+    upload_parser = commands.add_parser(
+        "upload", help="upload QUBO matrix files and wait for their verification"
+    )
+    upload_parser.add_argument(
+        "paths", nargs="+", help="QUBO matrix files (.json, .json.gz) or directories"
+    )
+    upload_parser.add_argument(
+        "--index", help="upload index file, identical matrices are uploaded once"
+    )
+
+    run_parser = commands.add_parser(
+        "run", help="upload, solve and download the solutions of QUBO matrix files"
+    )
+    run_parser.add_argument(
+        "paths", nargs="+", help="QUBO matrix files (.json, .json.gz) or directories"
+    )
+    run_parser.add_argument(
+        "--time-limit", type=int, required=True, help="time limit of every job"
+    )
+    run_parser.add_argument("--output", default=".", help="directory of the solutions")
+    run_parser.add_argument(
+        "--interval", type=float, default=2.0, help="seconds between polls"
+    )
+    run_parser.add_argument(
+        "--index", help="upload index file, identical matrices are uploaded once"
+    )
+
+    download_parser = commands.add_parser("download", help="download solutions")
+    download_parser.add_argument("jobs", nargs="+", help="names of the jobs")
+    download_parser.add_argument(
+        "--output", default=".", help="directory of the solutions"
+    )
+    download_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="parse large solutions while they arrive (requires NumPy)",
+    )
+    return parser
+
+
+COMMANDS = {"status": status, "upload": upload, "run": run, "download": download}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point of the abs2 console script.
+    :param argv: (optional) command-line arguments, sys.argv[1:] if omitted
+    :return: the exit status, 0 if every problem / job / solution succeeded
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.CRITICAL,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+    try:
+        return COMMANDS[args.command](args, Summary())
+    except ABS2Exception as e:
+        print(f"abs2: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import gzip
+import tempfile
+import zlib
+from typing import IO, Optional
+
+from .exceptions import ABS2Exception
+from .streaming import QUBOStreamValidator
+
+# zlib window bits producing the container of each supported Content-Encoding
+_WBITS = {"gzip": 31, "deflate": 15}
+_GZIP_MAGIC = b"\x1f\x8b"
+# Compressed request bodies are kept in memory up to this size and spill to a temporary file beyond it
+_SPOOL_SIZE = 1 << 26
+
+
+def check_compression(compression: Optional[str]) -> None:
+    if compression is not None and compression not in _WBITS:
+        raise ABS2Exception(
+            f"Unsupported compression {compression!r}, use one of {sorted(_WBITS)}"
+        )
+
+
+def is_gzip_file(filename: str) -> bool:
+    """
+    Check if a file is gzip compressed, e.g. a .json.gz QUBO matrix, by its magic number.
+    """
+    with open(filename, "rb") as f:
+        return f.read(2) == _GZIP_MAGIC
+
+
+def compress_bytes(data: bytes, compression: str, level: int = 6) -> bytes:
+    """
+    Compress a request body for the given Content-Encoding.
+    :param data: the uncompressed body
+    :param compression: "gzip" or "deflate"
+    :param level: compression level from 1 (fastest) to 9 (smallest)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[compression])
+    return compressor.compress(data) + compressor.flush()
+
+
+def spool_matrix_file(
+    filename: str,
+    compression: Optional[str],
+    level: int = 6,
+    validator: Optional[QUBOStreamValidator] = None,
+    chunk_size: int = 1 << 20,
+) -> IO[bytes]:
+    """
+    Re-encode a (possibly gzip compressed) QUBO matrix file chunk by chunk into a temporary file,
+    so it can be uploaded with a known Content-Length without holding the matrix in memory.
+    :param filename: the matrix file, plain JSON or gzip compressed JSON
+    :param compression: Content-Encoding of the result, "gzip", "deflate" or None for plain JSON
+    :param level: compression level from 1 (fastest) to 9 (smallest)
+    :param validator: (optional) validator that is fed the uncompressed content
+    :param chunk_size: number of bytes processed at once
+    :return: the re-encoded content, positioned at its start
+    """
+    opener = gzip.open if is_gzip_file(filename) else open
+    compressor = (
+        zlib.compressobj(level, zlib.DEFLATED, _WBITS[compression])
+        if compression is not None
+        else None
+    )
+    spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+    with opener(filename, "rb") as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            if validator is not None:
+                validator.feed(chunk)
+            spool.write(compressor.compress(chunk) if compressor else chunk)
+    if validator is not None:
+        validator.close()
+    if compressor is not None:
+        spool.write(compressor.flush())
+    spool.seek(0)
+    return spool
+
+
+class GzipValidator:
+    """
+    Feeds the decompressed content of a gzip compressed upload to a QUBOStreamValidator.
+    """
+
+    def __init__(self, validator: QUBOStreamValidator):
+        self._validator = validator
+        self._decompressor = zlib.decompressobj(_WBITS["gzip"])
+
+    def feed(self, chunk: bytes) -> None:
+        self._validator.feed(self._decompressor.decompress(chunk))
+
+    def close(self) -> None:
+        self._validator.feed(self._decompressor.flush())
+        self._validator.close()
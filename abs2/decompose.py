@@ -0,0 +1,304 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .abs2_api import ABS2API
+from .evaluate import QUBOEvaluator
+from .exceptions import ABS2Exception
+from .models import QUBOMatrix
+from .tracker import JobTracker
+
+# Smallest nbit the web API accepts, smaller subproblems are padded with unused variables
+_MIN_NBIT = 32
+
+
+def clamp(
+    evaluator: QUBOEvaluator, x: np.ndarray, variables: Sequence[int]
+) -> Tuple[np.ndarray, int]:
+    """
+    Subproblem over the given variables with all other variables fixed to their values in x.
+    The couplings to the fixed variables are folded into the diagonal of the subproblem, so for every
+    assignment y of the variables, energy of the subproblem(y) + offset == energy of x with x[variables] = y.
+    :param evaluator: the full problem
+    :param x: 0/1 vector of length nbit, the values of the fixed variables
+    :param variables: indices of the free variables
+    :return: [i, j, value] entries of the subproblem as (n, 3) int64 array with i, j in [0, len(variables)),
+             and the energy offset of the fixed variables
+    """
+    variables = np.asarray(variables, dtype=np.int64)
+    position = np.full(evaluator.nbit, -1, dtype=np.int64)
+    position[variables] = np.arange(len(variables))
+    fixed = np.array(x, dtype=np.int64)
+    fixed[variables] = 0
+
+    fields = evaluator.local_fields(fixed)[variables]
+    linear = np.flatnonzero(fields)
+    rows, cols = position[evaluator.rows], position[evaluator.cols]
+    inside = (rows >= 0) & (cols >= 0) & (evaluator.values != 0)
+    triples = np.concatenate(
+        (
+            np.stack((linear, linear, fields[linear]), axis=1),
+            np.stack((rows[inside], cols[inside], evaluator.values[inside]), axis=1),
+        )
+    )
+    return triples, evaluator.energy(fixed)
+
+
+def descend(evaluator: QUBOEvaluator, x: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Steepest descent with single bit flips until no flip lowers the energy.
+    :return: the local minimum and its energy
+    """
+    x = np.array(x, dtype=np.int64)
+    fields = evaluator.local_fields(x)
+    energy = evaluator.energy(x)
+    while True:
+        deltas = (1 - 2 * x) * fields
+        k = int(np.argmin(deltas))
+        if deltas[k] >= 0:
+            return x, energy
+        energy += int(deltas[k])
+        change = 1 - 2 * x[k]
+        x[k] ^= 1
+        start, end = evaluator.indptr[k], evaluator.indptr[k + 1]
+        np.add.at(
+            fields,
+            evaluator.indices[start:end],
+            change * evaluator.weights[start:end],
+        )
+
+
+class SubproblemSolver(ABC):
+    """
+    Solves a batch of subproblems at once, the backend of the QUBODecomposer.
+    """
+
+    @abstractmethod
+    def solve(self, matrices: List[QUBOMatrix]) -> List[Optional[np.ndarray]]:
+        """
+        :param matrices: the subproblems, with base 0
+        :return: a 0/1 vector of at least nbit values per subproblem, None for subproblems that could not be solved
+        """
+
+
+class RemoteSolver(SubproblemSolver):
+    """
+    Solves subproblems with the QUBO solver of the web API: all of them are uploaded concurrently,
+    a job is posted for each as soon as its verification succeeded, and the jobs are tracked until they terminated.
+    """
+
+    def __init__(
+        self,
+        api: ABS2API,
+        token: str,
+        time_limit: int,
+        max_workers: int = 4,
+        interval: float = 1.0,
+        timeout: Optional[float] = None,
+        cleanup: bool = True,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param api: the ABS2API used for all requests
+        :param token: the bearer token of the user
+        :param time_limit: the time limit of every job
+        :param max_workers: number of uploads running at the same time
+        :param interval: seconds between two polls of the jobs
+        :param timeout: (optional) seconds after which the subproblems of a batch that are not solved yet
+                        are given up, they are returned as None
+        :param cleanup: delete the problems, jobs and solutions of the subproblems once the batch is done,
+                        which also stops the jobs that were given up
+        :param logger: (optional) accepts preexisting logger
+        """
+        self._api = api
+        self._token = token
+        self.time_limit = time_limit
+        self.max_workers = max_workers
+        self.interval = interval
+        self.timeout = timeout
+        self.cleanup = cleanup
+        self._logger = logger or logging.getLogger(__name__)
+
+    def solve(self, matrices: List[QUBOMatrix]) -> List[Optional[np.ndarray]]:
+        posted, futures = [], []
+        try:
+            try:
+                posted = self._api.submit_when_verified(
+                    self._token,
+                    matrices,
+                    self.time_limit,
+                    max_workers=self.max_workers,
+                    timeout=self.timeout,
+                )
+            except ABS2Exception as e:
+                # The jobs posted before the failure are cleaned up as well
+                posted = getattr(e, "jobs", posted)
+                raise
+            tracker = JobTracker(self._api, self._token, interval=self.interval)
+            futures = [
+                None if job is None else tracker.track(job.job) for job in posted
+            ]
+            try:
+                tracker.run(self.timeout)
+            except ABS2Exception as e:
+                # The decomposer goes on with the subproblems solved so far
+                self._logger.warning(msg=f"Subproblems given up: {e}")
+            return [
+                (
+                    future.result().solution_array
+                    if future is not None
+                    and future.done()
+                    and future.exception() is None
+                    else None
+                )
+                for future in futures
+            ]
+        finally:
+            if self.cleanup:
+                for position, matrix in enumerate(matrices):
+                    job = posted[position] if position < len(posted) else None
+                    future = futures[position] if position < len(futures) else None
+                    self._delete(
+                        matrix.file,
+                        None if job is None else job.job,
+                        future is not None and not future.done(),
+                    )
+
+    def _delete(self, problem: str, job: Optional[str], unfinished: bool) -> None:
+        deletions = [(self._api.delete_qubo_matrix, problem)]
+        if job is not None:
+            deletions.insert(0, (self._api.delete_solution, job))
+        if unfinished:
+            # A queued job is deleted, a running one stops once its solution file is deleted
+            deletions.insert(0, (self._api.delete_job, job))
+        for delete, name in deletions:
+            try:
+                delete(self._token, name)
+            except ABS2Exception as e:
+                if e.status_code != 404:
+                    raise
+
+
+class DecompositionResult:
+    def __init__(
+        self,
+        solution: np.ndarray,
+        energy: int,
+        iterations: int,
+        subproblems: int,
+        energies: List[int],
+    ):
+        """
+        :param solution: the best 0/1 vector found
+        :param energy: its energy
+        :param iterations: number of iterations run
+        :param subproblems: number of subproblems solved
+        :param energies: the energy of the incumbent after the initial descent and after every iteration
+        """
+        self.solution = solution
+        self.energy = energy
+        self.iterations = iterations
+        self.subproblems = subproblems
+        self.energies = energies
+
+
+class QUBODecomposer:
+    """
+    Solves QUBO problems larger than the solver handles well by decomposition, in the style of qbsolv:
+    every iteration selects the variables whose flip changes the energy of the incumbent the least,
+    splits them into subproblems with all other variables clamped to the incumbent, solves the subproblems
+    in parallel and applies every subsolution that lowers the energy of the full problem, evaluated locally.
+    When an iteration finds no improvement, the next one selects random variables to escape the local minimum.
+    """
+
+    def __init__(
+        self,
+        solver: SubproblemSolver,
+        subproblem_size: int = 64,
+        subproblems: int = 4,
+        max_iterations: int = 20,
+        patience: int = 3,
+        prefix: str = "subproblem",
+        seed: Optional[int] = None,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param solver: solves the subproblems of an iteration, e.g. a RemoteSolver
+        :param subproblem_size: number of variables of a subproblem
+        :param subproblems: number of subproblems solved in parallel per iteration
+        :param max_iterations: stop after this many iterations
+        :param patience: stop after this many iterations in a row without improvement
+        :param prefix: file names of the subproblems start with this prefix
+        :param seed: (optional) seed of the random subproblems and the initial vector
+        :param logger: (optional) accepts preexisting logger
+        """
+        if subproblem_size < 1 or subproblems < 1:
+            raise ABS2Exception("subproblem_size and subproblems have to be positive")
+        self.solver = solver
+        self.subproblem_size = subproblem_size
+        self.subproblems = subproblems
+        self.max_iterations = max_iterations
+        self.patience = patience
+        self.prefix = prefix
+        self._random = np.random.default_rng(seed)
+        self._logger = logger or logging.getLogger(__name__)
+
+    def select(self, evaluator: QUBOEvaluator, x: np.ndarray, stalled: bool):
+        """
+        Variables of the subproblems of the next iteration, disjoint as long as there are enough variables.
+        """
+        size = min(self.subproblem_size, evaluator.nbit)
+        if stalled:
+            order = self._random.permutation(evaluator.nbit)
+        else:
+            order = np.argsort(evaluator.flip_deltas(x), kind="stable")
+        count = min(self.subproblems, -(-evaluator.nbit // size))
+        return [np.sort(order[k * size : (k + 1) * size]) for k in range(count)]
+
+    def solve(self, problem, initial=None) -> DecompositionResult:
+        """
+        :param problem: QUBOEvaluator, QUBOMatrix, QUBO dict or matrix file name (see QUBOEvaluator.of)
+        :param initial: (optional) 0/1 vector to start from, a random vector if omitted
+        :return: DecompositionResult with the best vector found
+        """
+        evaluator = QUBOEvaluator.of(problem)
+        if initial is None:
+            initial = self._random.integers(0, 2, evaluator.nbit)
+        elif len(initial) != evaluator.nbit:
+            raise ABS2Exception(f"The initial vector needs {evaluator.nbit} values")
+        x, energy = descend(evaluator, initial)
+        energies = [energy]
+        solved = stalls = iteration = 0
+        while iteration < self.max_iterations and stalls < self.patience:
+            iteration += 1
+            subsets = self.select(evaluator, x, stalled=stalls > 0)
+            matrices = []
+            for k, variables in enumerate(subsets):
+                triples, _ = clamp(evaluator, x, variables)
+                matrices.append(
+                    QUBOMatrix(
+                        f"{self.prefix}_{iteration:04d}_{k:02d}.json",
+                        max(_MIN_NBIT, len(variables)),
+                        0,
+                        triples,
+                    )
+                )
+            vectors = self.solver.solve(matrices)
+            solved += len(matrices)
+
+            best = energy
+            for variables, vector in zip(subsets, vectors):
+                if vector is None:
+                    continue
+                candidate = x.copy()
+                candidate[variables] = np.asarray(vector[: len(variables)])
+                candidate_energy = evaluator.energy(candidate)
+                if candidate_energy < energy:
+                    x, energy = candidate, candidate_energy
+            x, energy = descend(evaluator, x)
+            stalls = stalls + 1 if energy >= best else 0
+            energies.append(energy)
+            self._logger.debug(msg=f"Iteration {iteration}: energy {energy}")
+        return DecompositionResult(x, energy, iteration, solved, energies)
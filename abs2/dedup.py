@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from .compression import is_gzip_file
+
+
+def _canonical_json(qubo, base: int) -> str:
+    try:
+        from .sparse import coo_to_triples, triples_to_json
+    except ImportError:
+        merged = {}
+        for i, j, value in qubo:
+            key = (min(i, j) - base, max(i, j) - base)
+            merged[key] = merged.get(key, 0) + value
+        entries = sorted(
+            (i, j, int(value)) for (i, j), value in merged.items() if int(value)
+        )
+        return "[" + ",".join("[%d,%d,%d]" % entry for entry in entries) + "]"
+    import numpy as np
+
+    triples = np.asarray(qubo).reshape(-1, 3)
+    return triples_to_json(
+        coo_to_triples(triples[:, 0] - base, triples[:, 1] - base, triples[:, 2])
+    )
+
+
+def problem_key(nbit: int, base: int, qubo) -> str:
+    """
+    Content hash of a QUBO matrix, independent of its file name, of base, of the order of the entries
+    and of whether an entry is given as (i, j) or (j, i) or split into several entries.
+    :param nbit: number of variables
+    :param base: index of the first variable
+    :param qubo: [i, j, value] entries as list or NumPy array
+    :return: hex digest identifying the matrix
+    """
+    digest = hashlib.sha256(b"%d;" % int(nbit))
+    digest.update(_canonical_json(qubo, int(base)).encode())
+    return digest.hexdigest()
+
+
+def problem_key_of_file(filename: str) -> Tuple[str, int]:
+    """
+    Content hash of a QUBO matrix file, plain or gzip compressed JSON, see problem_key.
+    :return: the content hash and nbit of the matrix
+    """
+    opener = gzip.open if is_gzip_file(filename) else open
+    with opener(filename, "rt") as f:
+        matrix = json.load(f)
+    return problem_key(matrix["nbit"], matrix["base"], matrix["qubo"]), matrix["nbit"]
+
+
+class UploadIndex:
+    """
+    Local index of uploaded QUBO matrices by content hash, so identical problems are uploaded
+    and verified only once. Pass it to ABS2API(upload_index=...) to consult it before every upload.
+    Each entry stores the file name on the server, nbit, the URI and the verification result once known.
+    The index is saved as JSON after every change if a path is given, and kept in memory otherwise.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        :param path: (optional) JSON file the index is loaded from and saved to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        # Set once the index was compared with the problems on the server in this process
+        self.reconciled = False
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f:
+                self._entries = json.load(f)["problems"]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """
+        :param key: content hash from problem_key
+        :return: the entry of an uploaded matrix with this content whose verification did not fail, or None
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.get("verify") is False:
+            return None
+        return dict(entry)
+
+    def add(self, key: str, file: str, nbit: int, uri_problem: str) -> None:
+        with self._lock:
+            # An upload replaces any earlier file of the same name on the server
+            self._entries = {
+                other: entry
+                for other, entry in self._entries.items()
+                if entry["file"] != file
+            }
+            self._entries[key] = {
+                "file": file,
+                "nbit": int(nbit),
+                "uri_problem": uri_problem,
+                "verify": None,
+            }
+            self._save()
+
+    def set_verified(self, file: str, verify: bool) -> None:
+        """
+        Record the verification result of an uploaded file.
+        """
+        with self._lock:
+            changed = False
+            for entry in self._entries.values():
+                if entry["file"] == file and entry["verify"] != verify:
+                    entry["verify"] = verify
+                    changed = True
+            if changed:
+                self._save()
+
+    def forget(self, files: Optional[Iterable[str]] = None) -> None:
+        """
+        Remove the entries of deleted files.
+        :param files: (optional) file names on the server, all entries are removed if omitted
+        """
+        with self._lock:
+            if files is None:
+                self._entries = {}
+            else:
+                files = set(files)
+                self._entries = {
+                    key: entry
+                    for key, entry in self._entries.items()
+                    if entry["file"] not in files
+                }
+            self._save()
+
+    def reconcile(self, problems: Iterable[Dict]) -> int:
+        """
+        Compare the index with the list of problems on the server (the data of get_all_problems).
+        Entries of files that no longer exist, or were replaced by a file of the same name, are removed.
+        :return: the number of removed entries
+        """
+        listed = {problem["file"]: problem for problem in problems}
+        with self._lock:
+            stale = []
+            for key, entry in self._entries.items():
+                problem = listed.get(entry["file"])
+                if problem is None:
+                    stale.append(key)
+                    continue
+                stamp = [problem.get("bytes"), problem.get("time")]
+                if entry.setdefault("stamp", stamp) != stamp:
+                    stale.append(key)
+            for key in stale:
+                del self._entries[key]
+            self.reconciled = True
+            self._save()
+        return len(stale)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        # Write to a temporary file and rename it, so an interrupted save never corrupts the index
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"problems": self._entries}, f)
+        os.replace(f.name, self.path)
@@ -0,0 +1,185 @@
+import gzip
+import json
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+
+from .compression import is_gzip_file
+from .exceptions import ABS2Exception
+from .models import (
+    QUBO,
+    PyQUBOMatrixUploadMsg,
+    QUBOMatrix,
+    SolutionInformation,
+    VariableIndex,
+)
+
+# Number of matrix entries evaluated at once for batches of vectors, bounds the temporary memory
+_EDGE_CHUNK = 1 << 18
+
+
+class QUBOEvaluator:
+    """
+    Local, array-backed evaluation of a QUBO matrix given as [i, j, value] entries.
+    The energy of a vector x is the sum of value * x[i] * x[j] over all entries, as computed by the QUBO solver.
+    """
+
+    def __init__(
+        self,
+        triples,
+        nbit: Optional[int] = None,
+        base: int = 0,
+        index: Optional[VariableIndex] = None,
+    ):
+        """
+        :param triples: [i, j, value] entries as list or NumPy array of shape (n, 3)
+        :param nbit: (optional) number of variables, derived from the largest index if omitted
+        :param base: index of the first variable, 0 or 1
+        :param index: (optional) VariableIndex of a pyqubo QUBO, allows evaluating samples given as dicts
+        """
+        triples = np.asarray(triples, dtype=np.int64).reshape(-1, 3)
+        rows, cols, values = triples[:, 0] - base, triples[:, 1] - base, triples[:, 2]
+        size = int(max(rows.max(), cols.max())) + 1 if len(triples) else 0
+        self.nbit = int(nbit) if nbit is not None else size
+        if len(triples) and (min(rows.min(), cols.min()) < 0 or size > self.nbit):
+            raise ABS2Exception(f"Indices have to be in [{base}, {base + self.nbit})")
+        self.index = index
+
+        diagonal = rows == cols
+        self.linear = np.zeros(self.nbit, dtype=np.int64)
+        np.add.at(self.linear, rows[diagonal], values[diagonal])
+        self.rows = rows[~diagonal]
+        self.cols = cols[~diagonal]
+        self.values = values[~diagonal]
+
+        # Symmetric adjacency in CSR layout, neighbors of k are indices[indptr[k]:indptr[k + 1]]
+        source = np.concatenate((self.rows, self.cols))
+        order = np.argsort(source, kind="stable")
+        self.indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(source, minlength=self.nbit)))
+        )
+        self.indices = np.concatenate((self.cols, self.rows))[order]
+        self.weights = np.concatenate((self.values, self.values))[order]
+
+    @classmethod
+    def from_matrix(cls, matrix: QUBOMatrix) -> "QUBOEvaluator":
+        return cls(matrix.qubo, matrix.nbit, matrix.base)
+
+    @classmethod
+    def from_pyqubo(
+        cls, qubo: QUBO, index: Optional[VariableIndex] = None
+    ) -> "QUBOEvaluator":
+        """
+        Build an evaluator for a QUBO in dict format, with the same integer entries post_pyqubo_matrix uploads.
+        """
+        if index is None:
+            index = VariableIndex.from_qubo(qubo)
+        return cls(index.encode_qubo(qubo), max(32, len(index)), 0, index)
+
+    @classmethod
+    def from_file(cls, filename: str) -> "QUBOEvaluator":
+        """
+        Build an evaluator from a QUBO matrix file as uploaded by post_qubo_matrix, plain or gzip compressed.
+        """
+        opener = gzip.open if is_gzip_file(filename) else open
+        with opener(filename, "rt") as f:
+            matrix = json.load(f)
+        return cls(matrix["qubo"], matrix["nbit"], matrix["base"])
+
+    @classmethod
+    def of(cls, problem) -> "QUBOEvaluator":
+        """
+        Build an evaluator from any supported description of a problem: a QUBOEvaluator (returned as is),
+        QUBOMatrix, PyQUBOMatrixUploadMsg, QUBO dict or the name of a matrix file.
+        """
+        if isinstance(problem, QUBOEvaluator):
+            return problem
+        if isinstance(problem, QUBOMatrix):
+            return cls.from_matrix(problem)
+        if isinstance(problem, PyQUBOMatrixUploadMsg):
+            return cls.from_pyqubo(problem.qubo, problem.index)
+        if isinstance(problem, dict):
+            return cls.from_pyqubo(problem)
+        if isinstance(problem, str):
+            return cls.from_file(problem)
+        raise ABS2Exception(f"Cannot evaluate a problem of type {type(problem)}")
+
+    def _vectors(
+        self, x: Union[SolutionInformation, Dict[Hashable, int], "np.ndarray", list]
+    ) -> Tuple[np.ndarray, bool]:
+        if isinstance(x, SolutionInformation):
+            x = x.solution_array
+        elif isinstance(x, dict):
+            if self.index is None:
+                raise ABS2Exception("Samples given as dict require a VariableIndex")
+            x = [x.get(name, 0) for name in self.index.names]
+        x = np.asarray(x, dtype=np.int64)
+        single = x.ndim == 1
+        x = np.atleast_2d(x)
+        if x.shape[1] < self.nbit:
+            # Variables missing at the end, e.g. padding of small pyqubo problems, are 0
+            x = np.pad(x, ((0, 0), (0, self.nbit - x.shape[1])))
+        return x[:, : self.nbit], single
+
+    def energy(self, x):
+        """
+        Energy of one vector or of a batch of vectors in one vectorized pass.
+        :param x: 0/1 vector of length nbit, a (batch, nbit) array, a SolutionInformation,
+                  or a dict of variable name to value for evaluators built from a pyqubo QUBO
+        :return: the energy as int, or an int64 array with one energy per vector of the batch
+        """
+        vectors, single = self._vectors(x)
+        energies = vectors @ self.linear
+        for start in range(0, len(self.values), _EDGE_CHUNK):
+            end = start + _EDGE_CHUNK
+            pairs = vectors[:, self.rows[start:end]] & vectors[:, self.cols[start:end]]
+            energies += pairs @ self.values[start:end]
+        return int(energies[0]) if single else energies
+
+    def local_fields(self, x) -> np.ndarray:
+        """
+        Energy change of setting each variable from 0 to 1 given all other variables of x.
+        :return: int64 array of length nbit, or (batch, nbit) for a batch of vectors
+        """
+        vectors, single = self._vectors(x)
+        # Summed in int64 over the whole batch, exact for any coefficients the energy is exact for
+        fields = np.tile(self.linear, (len(vectors), 1))
+        for start in range(0, len(self.values), _EDGE_CHUNK):
+            end = start + _EDGE_CHUNK
+            rows, cols = self.rows[start:end], self.cols[start:end]
+            values = self.values[start:end]
+            np.add.at(fields, (slice(None), rows), vectors[:, cols] * values)
+            np.add.at(fields, (slice(None), cols), vectors[:, rows] * values)
+        return fields[0] if single else fields
+
+    def flip_deltas(self, x) -> np.ndarray:
+        """
+        Energy change of flipping each single bit of x, for all bits at once.
+        :return: int64 array of length nbit, or (batch, nbit) for a batch of vectors
+        """
+        vectors, single = self._vectors(x)
+        deltas = (1 - 2 * vectors) * self.local_fields(vectors)
+        return deltas[0] if single else deltas
+
+    def flip_delta(self, x: np.ndarray, k: int) -> int:
+        """
+        Energy change of flipping bit k of the 0/1 vector x, using only the neighbors of k.
+        """
+        start, end = self.indptr[k], self.indptr[k + 1]
+        field = self.linear[k] + int(
+            self.weights[start:end] @ x[self.indices[start:end]]
+        )
+        return int((1 - 2 * x[k]) * field)
+
+    def verify(self, solution: SolutionInformation) -> int:
+        """
+        Evaluate a solution locally and compare the energy with the one reported by the QUBO solver.
+        :return: the energy of the solution
+        """
+        energy = self.energy(solution)
+        if energy != solution.energy:
+            raise ABS2Exception(
+                f"Solution {solution.job} reports energy {solution.energy}, "
+                f"but its vector evaluates to {energy}"
+            )
+        return energy
@@ -1,2 +1,20 @@
+from typing import Optional
+
+
 class ABS2Exception(Exception):
-    pass
+    def __init__(
+        self,
+        *args,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        message: Optional[str] = None,
+    ):
+        """
+        :param status_code: (optional) HTTP status code of the failed request, None if no response was received
+        :param retry_after: (optional) Retry-After header of the failed response
+        :param message: (optional) message in the JSON body of the failed response
+        """
+        super().__init__(*args)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.message = message
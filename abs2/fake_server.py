@@ -0,0 +1,745 @@
+import gzip
+import json
+import random
+import secrets
+import string
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import UserNP
+
+Response = Tuple[int, object]
+# Scripted answer to a request, called with the _FakeHandler of the request
+Route = Callable[["_FakeHandler"], Response]
+
+# Number of improved solutions the fake solver writes over the time limit of a job
+_STAGES = 4
+_SOLVER_PARAMETERS = {
+    "bfactor": 1.0,
+    "factor": 1.0,
+    "nsolpool": 20,
+    "ngpu": 1,
+    "nisland_per_gpu": 1,
+    "nisland": 1,
+    "value_bits": 16,
+    "arithmetic_bits": 32,
+}
+
+
+class _Problem:
+    def __init__(self, matrix, size: int, ready_at: float):
+        self.file = matrix.get("file") if isinstance(matrix, dict) else None
+        self.matrix = matrix
+        self.bytes = size
+        self.time = datetime.now().isoformat()
+        self.ready_at = ready_at
+        self.jobs = 0
+        self.message = self._check()
+        self.verify = self.message == "verified"
+
+    def _check(self) -> str:
+        matrix = self.matrix
+        if not isinstance(matrix, dict) or not isinstance(matrix.get("file"), str):
+            return "file is missing"
+        nbit, base, qubo = matrix.get("nbit"), matrix.get("base"), matrix.get("qubo")
+        if not isinstance(nbit, int) or nbit < 32:
+            return "nbit must be an integer of at least 32"
+        if base not in (0, 1):
+            return "base must be 0 or 1"
+        if not isinstance(qubo, list):
+            return "qubo must be a list"
+        for entry in qubo:
+            if not (
+                isinstance(entry, list)
+                and len(entry) == 3
+                and all(isinstance(value, int) for value in entry)
+                and base <= entry[0] < base + nbit
+                and base <= entry[1] < base + nbit
+            ):
+                return f"malformed entry {entry}"
+        return "verified"
+
+    def information(self, now: float) -> Dict:
+        information = {
+            "file": self.file,
+            "bytes": self.bytes,
+            "time": self.time,
+            "uri_problem": f"/v1/problems/{self.file}",
+        }
+        if now < self.ready_at:
+            return information
+        information["verify"] = self.verify
+        information["message"] = self.message
+        if self.verify:
+            values = [entry[2] for entry in self.matrix["qubo"]] or [0]
+            information.update(
+                nbit=self.matrix["nbit"],
+                nelement=len(self.matrix["qubo"]),
+                minval=min(values),
+                maxval=max(values),
+                parameters={
+                    "problem": self.file,
+                    "nbit": self.matrix["nbit"],
+                    "base": self.matrix["base"],
+                },
+            )
+        return information
+
+
+class _Job:
+    def __init__(self, name: str, user: str, problem: _Problem, time_limit, posted):
+        self.name = name
+        self.user = user
+        self.problem = problem
+        self.time_limit = time_limit
+        self.posted = posted
+        self.started: Optional[float] = None
+        self.duration = 0.0
+        self.stages: List[Tuple[int, List[int]]] = []
+        self.terminated = False
+        # The last solution file written and its size, so polls do not serialize it again
+        self._cached: Optional[Tuple[Tuple[int, bool], Dict]] = None
+        self._size: Optional[Tuple[Dict, int]] = None
+
+    def information(self) -> Dict:
+        matrix = self.problem.matrix
+        values = [entry[2] for entry in matrix["qubo"]] or [0]
+        return {
+            "job": self.name,
+            "problem": self.problem.file,
+            "nbit": matrix["nbit"],
+            "minval": min(values),
+            "maxval": max(values),
+            "parameters": {"problem": self.problem.file, "time_limit": self.time_limit},
+        }
+
+    def solve(self, rng: random.Random) -> None:
+        """
+        Greedy descent from a random vector, one sweep per stage, so the energy improves stage by stage.
+        """
+        matrix = self.problem.matrix
+        nbit, base = matrix["nbit"], matrix["base"]
+        linear = [0] * nbit
+        neighbors: List[List[Tuple[int, int]]] = [[] for _ in range(nbit)]
+        for i, j, value in matrix["qubo"]:
+            i, j = i - base, j - base
+            if i == j:
+                linear[i] += value
+            else:
+                neighbors[i].append((j, value))
+                neighbors[j].append((i, value))
+        x = [rng.randint(0, 1) for _ in range(nbit)]
+        energy = sum(
+            value * x[i - base] * x[j - base] for i, j, value in matrix["qubo"]
+        )
+        self.stages = [(energy, list(x))]
+        order = list(range(nbit))
+        for _ in range(_STAGES):
+            rng.shuffle(order)
+            for k in order:
+                field = linear[k] + sum(value * x[m] for m, value in neighbors[k])
+                delta = field if x[k] == 0 else -field
+                if delta < 0:
+                    x[k] ^= 1
+                    energy += delta
+            self.stages.append((energy, list(x)))
+
+    def stage(self, now: float) -> int:
+        if self.terminated or self.duration <= 0:
+            return len(self.stages) - 1
+        elapsed = min(now - self.started, self.duration)
+        return min(int(elapsed / self.duration * _STAGES), len(self.stages) - 1)
+
+    def modified(self, now: float) -> float:
+        """
+        Time the solution file was last written.
+        """
+        if self.terminated:
+            return self.started + self.duration
+        return self.started + self.stage(now) * self.duration / _STAGES
+
+    def solution(self, now: float) -> Dict:
+        stage = self.stage(now)
+        if self._cached is not None and self._cached[0] == (stage, self.terminated):
+            return self._cached[1]
+        energy, vector = self.stages[stage]
+        information = {
+            "terminated": self.terminated,
+            "problem": self.problem.file,
+            "job": self.name,
+            "energy": energy,
+            "tts": stage * self.duration / _STAGES,
+            "solution": vector,
+            "parameters": {
+                "time_limit": self.time_limit,
+                "target_energy": energy,
+                **_SOLVER_PARAMETERS,
+            },
+        }
+        if self.terminated:
+            information["success"] = True
+            information["kernel_time"] = self.duration
+        self._cached = ((stage, self.terminated), information)
+        return information
+
+    def size(self, now: float) -> int:
+        solution = self.solution(now)
+        if self._size is None or self._size[0] is not solution:
+            self._size = (solution, len(json.dumps(solution)))
+        return self._size[1]
+
+
+class FakeABS2Server:
+    """
+    In-process fake of the ABS2 web API, implementing every endpoint used by ABS2API, for tests and benchmarks
+    without network access or credentials. It listens on a local port, use it with
+    ABS2API(server.hostname, scheme="http").
+    The solver works through the jobs of all users in turn; a job runs for time_limit * time_scale seconds
+    and writes improved solutions of its problem (found by greedy descent) to its solution file meanwhile.
+    Routes can replace the simulation for single endpoints, to script responses in tests.
+    Notes:  The simulation advances lazily on every request, no background thread is solving.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        verification_delay: float = 0.0,
+        verification_rate: Optional[float] = None,
+        time_scale: float = 1.0,
+        token_lifetime: Optional[float] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        routes: Optional[Dict[Tuple[str, str], Route]] = None,
+        gzip_responses: bool = False,
+    ):
+        """
+        Constructor for FakeABS2Server
+        :param latency: seconds every response is delayed
+        :param verification_delay: seconds the verification of an uploaded matrix takes at least
+        :param verification_rate: (optional) verified bytes per second, added to the verification delay
+        :param time_scale: seconds a job runs per unit of its time_limit, e.g. 0.01 for fast tests
+        :param token_lifetime: (optional) seconds until an access token expires and requests are answered with 401
+        :param error_rate: probability of answering any request with 503, to test error handling
+        :param seed: (optional) seed of the random numbers of the solver and the error injection
+        :param host: address to listen on
+        :param port: port to listen on, 0 picks a free port
+        :param routes: (optional) handlers answering requests instead of the simulation by (method, path),
+                       e.g. ("GET", "/v1/jobs"), see route
+        :param gzip_responses: compress response bodies with gzip if the client accepts it
+        """
+        self.latency = latency
+        self.verification_delay = verification_delay
+        self.verification_rate = verification_rate
+        self.time_scale = time_scale
+        self.token_lifetime = token_lifetime
+        self.error_rate = error_rate
+        self.gzip_responses = gzip_responses
+        self.active = True
+        self.requests = 0
+        # Number of TCP connections accepted, to test connection reuse
+        self.connections = 0
+        self._routes: Dict[Tuple[str, str], Route] = dict(routes or {})
+        self._random = random.Random(seed)
+        # Converts the monotonic clock of the simulation into wall clock timestamps
+        self._epoch = time.time() - time.monotonic()
+        self._lock = threading.Lock()
+        self._users: Dict[str, Dict] = {}
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._problems: Dict[str, Dict[str, _Problem]] = {}
+        self._jobs: Dict[str, Dict[str, _Job]] = {}
+        self._queue: List[_Job] = []
+        self._running: Optional[_Job] = None
+        self._injected: List[List] = []
+        self._http = ThreadingHTTPServer((host, port), _FakeHandler)
+        self._http.daemon_threads = True
+        self._http.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def hostname(self) -> str:
+        """
+        Host and port to pass to ABS2API as hostname.
+        """
+        host, port = self._http.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "FakeABS2Server":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._http.serve_forever, args=(0.05,), daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._http.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._http.server_close()
+
+    def __enter__(self) -> "FakeABS2Server":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def add_user(
+        self, username: str = "user", password: Optional[str] = None, email: str = ""
+    ) -> UserNP:
+        """
+        Register a user directly, without the signup endpoint.
+        :return: the username and password to retrieve access tokens with
+        """
+        password = password or secrets.token_urlsafe(12)
+        with self._lock:
+            self._users[username] = {
+                "username": username,
+                "email": email or f"{username}@example.com",
+                "firstname": "",
+                "lastname": "",
+                "affiliation": "",
+                "password": password,
+                "jobs": 0,
+            }
+            self._problems.setdefault(username, {})
+            self._jobs.setdefault(username, {})
+        return UserNP(username, password)
+
+    def password(self, username: str) -> str:
+        """
+        The password of a user, as the real web API would send it by email.
+        """
+        return self._users[username]["password"]
+
+    def inject(
+        self,
+        status: int,
+        method: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        times: int = 1,
+    ) -> None:
+        """
+        Answer the next matching requests with an error.
+        :param status: the status code of the error, e.g. 500 or 503
+        :param method: (optional) only requests with this HTTP method, e.g. "POST"
+        :param endpoint: (optional) only requests whose path after /v1/ starts with this, e.g. "problems"
+        :param times: number of requests answered with the error
+        """
+        with self._lock:
+            self._injected.append([status, method, endpoint, times])
+
+    def route(self, method: str, path: str, handler: Route) -> None:
+        """
+        Answer requests with a handler instead of the simulation.
+        :param method: the HTTP method, e.g. "GET"
+        :param path: the full path of the request including the query string, e.g. "/v1/solutions/p_0001.json"
+        :param handler: called with the request handler, which has headers, path, command, read_body()
+                        and read_json(), and returns the status code and the JSON payload of the response
+        """
+        with self._lock:
+            self._routes[(method, path)] = handler
+
+    # Request handling
+
+    def handle(self, method: str, path: str, headers, body: bytes) -> Response:
+        with self._lock:
+            self.requests += 1
+            endpoint = path.split("?", 1)[0].partition("/v1/")[2].strip("/")
+            injected = self._take_injected(method, endpoint)
+            if injected is not None:
+                return injected, {"message": "injected error"}
+            if self.error_rate and self._random.random() < self.error_rate:
+                return 503, {"message": "injected error"}
+            try:
+                data = self._decode(headers, body)
+            except ValueError:
+                return 400, {"message": "malformed JSON"}
+            now = time.monotonic()
+            self._advance(now)
+            resource, _, name = endpoint.partition("/")
+            if resource in ("", "signup", "token") or (
+                resource == "account" and method != "DELETE"
+            ):
+                handler = getattr(
+                    self, f"_{method.lower()}_{resource or 'status'}", None
+                )
+                if handler is None:
+                    return 404, {"message": "not found"}
+                return handler(data)
+            handler = getattr(self, f"_{method.lower()}_{resource}", None)
+            if handler is None:
+                return 404, {"message": "not found"}
+            user = self._authorize(headers, now)
+            if user is None:
+                return 401, {"message": "unauthorized"}
+            return handler(user, name, data, now)
+
+    def _take_injected(self, method: str, endpoint: str) -> Optional[int]:
+        for rule in self._injected:
+            status, rule_method, rule_endpoint, times = rule
+            if rule_method not in (None, method):
+                continue
+            if rule_endpoint is not None and not endpoint.startswith(rule_endpoint):
+                continue
+            rule[3] -= 1
+            if rule[3] <= 0:
+                self._injected.remove(rule)
+            return status
+        return None
+
+    @staticmethod
+    def _decode(headers, body: bytes):
+        encoding = headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return json.loads(body) if body else None
+
+    def _authorize(self, headers, now: float) -> Optional[str]:
+        authorization = headers.get("Authorization", "")
+        token = authorization[len("Bearer ") :]
+        user, issued = self._tokens.get(token, (None, 0.0))
+        if user is None or user not in self._users:
+            return None
+        if self.token_lifetime is not None and now - issued > self.token_lifetime:
+            return None
+        return user
+
+    # Solver simulation
+
+    def _advance(self, now: float) -> None:
+        # Replay what the solver did since the last request: finish the running job, start the next ones
+        while True:
+            free_at = 0.0
+            running = self._running
+            if running is not None:
+                free_at = running.started + running.duration
+                if not running.terminated:
+                    if now < free_at:
+                        return
+                    running.terminated = True
+                self._running = None
+            if not self._queue:
+                return
+            job = self._queue.pop(0)
+            job.started = max(free_at, job.posted)
+            job.duration = job.time_limit * self.time_scale
+            job.solve(self._random)
+            self._running = job
+            self._users[job.user]["jobs"] += 1
+
+    def _stop_job(self, job: _Job, now: float) -> None:
+        if job is self._running and not job.terminated:
+            # Deleting the solution file of the running job frees the solver
+            job.duration = now - job.started
+            job.terminated = True
+            self._advance(now)
+
+    def _timestamp(self, moment: float) -> str:
+        return datetime.fromtimestamp(self._epoch + moment).isoformat()
+
+    # Unauthenticated endpoints
+
+    def _get_status(self, data) -> Response:
+        now = time.monotonic()
+        total = sum(job.time_limit for job in self._queue)
+        if self._running is not None and not self._running.terminated:
+            remaining = self._running.started + self._running.duration - now
+            total += remaining / self.time_scale if self.time_scale else 0
+        uris = {
+            f"uri_{name}": f"/v1/{name}"
+            for name in ("signup", "account", "token", "problems", "jobs", "solutions")
+        }
+        status = {
+            "message": "QUBO solver is working" if self.active else "not working",
+            "active": self.active,
+            "jobs_in_queue": len(self._queue),
+            "total_time_limit": int(total),
+            "uri_root": "/v1/",
+            **uris,
+        }
+        return (200 if self.active else 503), status
+
+    def _post_signup(self, data) -> Response:
+        fields = ("username", "email", "firstname", "lastname", "affiliation")
+        if not isinstance(data, dict) or not all(
+            isinstance(data.get(field), str) for field in fields
+        ):
+            return 400, {"message": "malformed parameters"}
+        if data["username"] in self._users or any(
+            user["email"] == data["email"] for user in self._users.values()
+        ):
+            return 409, {"message": "username or email already registered"}
+        password = "".join(
+            self._random.choices(string.ascii_letters + string.digits, k=12)
+        )
+        self._users[data["username"]] = {
+            **{field: data[field] for field in fields},
+            "password": password,
+            "jobs": 0,
+        }
+        self._problems[data["username"]] = {}
+        self._jobs[data["username"]] = {}
+        return 201, {"message": "user account created, the password is sent by email"}
+
+    def _login(self, data) -> Tuple[Optional[Dict], Optional[Response]]:
+        if not isinstance(data, dict) or not isinstance(data.get("password"), str):
+            return None, (400, {"message": "malformed parameters"})
+        user = self._users.get(data.get("username"))
+        if user is None:
+            return None, (404, {"message": "user not found"})
+        if user["password"] != data["password"]:
+            return None, (401, {"message": "wrong password"})
+        return user, None
+
+    def _post_token(self, data) -> Response:
+        user, error = self._login(data)
+        if error is not None:
+            return error
+        token = secrets.token_urlsafe(24)
+        self._tokens[token] = (user["username"], time.monotonic())
+        return 200, {"message": "access token issued", "access_token": token}
+
+    def _post_account(self, data) -> Response:
+        if not isinstance(data, dict):
+            return 400, {"message": "malformed parameters"}
+        if "password" in data:
+            user, error = self._login(data)
+            if error is not None:
+                return error
+            return 200, {key: value for key, value in user.items() if key != "password"}
+        if "username" in data:
+            user = self._users.get(data["username"])
+            if user is None:
+                return 404, {"message": "user not found"}
+            if user["email"] != data.get("email"):
+                return 401, {"message": "wrong email"}
+            user["password"] = secrets.token_urlsafe(12)
+            return 200, {"message": "new password sent by email"}
+        for user in self._users.values():
+            if user["email"] == data.get("email"):
+                return 200, {"message": "username sent by email"}
+        return 404, {"message": "user not found"}
+
+    def _put_account(self, data) -> Response:
+        user, error = self._login(data)
+        if error is not None:
+            return error
+        if not isinstance(data.get("newpassword"), str) or len(data["newpassword"]) < 8:
+            return 400, {"message": "the new password must have at least 8 characters"}
+        user["password"] = data["newpassword"]
+        return 200, {"message": "password changed"}
+
+    # Authenticated endpoints
+
+    def _delete_account(self, user: str, name: str, data, now: float) -> Response:
+        for job in self._jobs.pop(user, {}).values():
+            self._stop_job(job, now)
+        self._queue = [job for job in self._queue if job.user != user]
+        self._problems.pop(user, None)
+        del self._users[user]
+        return 200, {"message": "user account deleted"}
+
+    def _post_problems(self, user: str, name: str, data, now: float) -> Response:
+        size = len(json.dumps(data))
+        ready_at = now + self.verification_delay
+        if self.verification_rate:
+            ready_at += size / self.verification_rate
+        problem = _Problem(data, size, ready_at)
+        if problem.file is None:
+            return 400, {"message": "malformed parameters"}
+        self._problems[user][problem.file] = problem
+        return 202, {
+            "message": "QUBO matrix uploaded, verification started",
+            "file": problem.file,
+            "uri_problem": f"/v1/problems/{problem.file}",
+        }
+
+    def _get_problems(self, user: str, name: str, data, now: float) -> Response:
+        problems = self._problems[user]
+        if not name:
+            return 200, [
+                {
+                    "file": problem.file,
+                    "bytes": problem.bytes,
+                    "time": problem.time,
+                    "uri_problem": f"/v1/problems/{problem.file}",
+                }
+                for problem in problems.values()
+            ]
+        if name not in problems:
+            return 404, {"message": "file not found"}
+        return 200, problems[name].information(now)
+
+    def _delete_problems(self, user: str, name: str, data, now: float) -> Response:
+        problems = self._problems[user]
+        if not name:
+            problems.clear()
+            return 200, {"message": "all problems deleted"}
+        if problems.pop(name, None) is None:
+            return 404, {"message": "file not found"}
+        return 200, {"message": "problem deleted"}
+
+    def _post_jobs(self, user: str, name: str, data, now: float) -> Response:
+        if not isinstance(data, dict) or not isinstance(
+            data.get("time_limit"), (int, float)
+        ):
+            return 400, {"message": "malformed parameters"}
+        problem = self._problems[user].get(data.get("problem"))
+        if problem is None:
+            return 404, {"message": "no QUBO matrix found"}
+        if now < problem.ready_at:
+            return 102, {"message": "verification in progress"}
+        if not problem.verify:
+            return 404, {"message": "verification failed"}
+        problem.jobs += 1
+        job_name = f"{problem.file.rsplit('.', 1)[0]}_{problem.jobs:04d}.json"
+        job = _Job(job_name, user, problem, data["time_limit"], now)
+        self._jobs[user][job_name] = job
+        self._queue.append(job)
+        self._advance(now)
+        return 202, {
+            "message": "job accepted",
+            "job": job_name,
+            "uri_problem": f"/v1/problems/{problem.file}",
+            "uri_job": f"/v1/jobs/{job_name}",
+            "uri_solution": f"/v1/solutions/{job_name}",
+        }
+
+    def _queued(self, user: str) -> Dict[str, _Job]:
+        return {job.name: job for job in self._queue if job.user == user}
+
+    def _get_jobs(self, user: str, name: str, data, now: float) -> Response:
+        queued = self._queued(user)
+        if not name:
+            return 200, [
+                {
+                    "file": job.name,
+                    "bytes": len(json.dumps(job.information())),
+                    "time": self._timestamp(job.posted),
+                    "uri_job": f"/v1/jobs/{job.name}",
+                }
+                for job in queued.values()
+            ]
+        if name not in queued:
+            return 404, {"message": "job file not found"}
+        return 200, queued[name].information()
+
+    def _delete_jobs(self, user: str, name: str, data, now: float) -> Response:
+        queued = self._queued(user)
+        if name and name not in queued:
+            return 404, {"message": "job file not found"}
+        removed = {name} if name else set(queued)
+        self._queue = [
+            job for job in self._queue if job.name not in removed or job.user != user
+        ]
+        for job_name in removed:
+            del self._jobs[user][job_name]
+        return 200, {"message": "jobs deleted"}
+
+    def _started(self, user: str) -> Dict[str, _Job]:
+        return {
+            job.name: job
+            for job in self._jobs[user].values()
+            if job.started is not None
+        }
+
+    def _get_solutions(self, user: str, name: str, data, now: float) -> Response:
+        started = self._started(user)
+        if not name:
+            listing = []
+            for job in started.values():
+                listing.append(
+                    {
+                        "file": job.name,
+                        "bytes": job.size(now),
+                        "time": self._timestamp(job.modified(now)),
+                        "uri_solution": f"/v1/solutions/{job.name}",
+                    }
+                )
+            return 200, listing
+        if name not in started:
+            return 404, {"message": "solution file not found"}
+        return 200, started[name].solution(now)
+
+    def _delete_solutions(self, user: str, name: str, data, now: float) -> Response:
+        started = self._started(user)
+        if name and name not in started:
+            return 404, {"message": "solution file not found"}
+        for job_name in [name] if name else list(started):
+            self._stop_job(started[job_name], now)
+            del self._jobs[user][job_name]
+        return 200, {"message": "solutions deleted"}
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        fake: FakeABS2Server = self.server.fake
+        with fake._lock:
+            fake.connections += 1
+
+    def read_body(self) -> bytes:
+        """
+        The raw body of the request, as sent.
+        """
+        if self._body is None:
+            length = int(self.headers.get("Content-Length", 0))
+            self._body = self.rfile.read(length) if length else b""
+        return self._body
+
+    def read_json(self):
+        """
+        The decoded JSON body of the request, decompressed according to its Content-Encoding.
+        """
+        return FakeABS2Server._decode(self.headers, self.read_body())
+
+    def _handle(self):
+        self._body = None
+        fake: FakeABS2Server = self.server.fake
+        with fake._lock:
+            route = fake._routes.get((self.command, self.path))
+        if route is not None:
+            status, payload = route(self)
+            # The connection is kept alive, a body the route did not read must not be taken for the next request
+            self.read_body()
+        else:
+            status, payload = fake.handle(
+                self.command, self.path, self.headers, self.read_body()
+            )
+        if fake.latency:
+            time.sleep(fake.latency)
+        # Informational responses, e.g. 102 PROCESSING, have no body
+        data = json.dumps(payload).encode() if status >= 200 else b""
+        compress = fake.gzip_responses and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        )
+        if compress:
+            data = gzip.compress(data)
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if compress:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, e.g. after a timeout
+            self.close_connection = True
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
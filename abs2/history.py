@@ -0,0 +1,293 @@
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .exceptions import ABS2Exception
+from .models import JobInformation, QUBOMatrixInformation, SolutionInformation
+
+ProblemStats = Union[QUBOMatrixInformation, JobInformation, Dict]
+
+_PARAMETERS = (
+    "time_limit",
+    "target_energy",
+    "bfactor",
+    "factor",
+    "nsolpool",
+    "ngpu",
+    "nisland_per_gpu",
+    "nisland",
+    "value_bits",
+    "arithmetic_bits",
+)
+_STATS = ("nbit", "nelement", "minval", "maxval")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    job TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    recorded REAL NOT NULL,
+    {", ".join(f"{name} INTEGER" for name in _STATS)},
+    {", ".join(f"{name} REAL" for name in _PARAMETERS)},
+    energy INTEGER NOT NULL,
+    tts REAL NOT NULL,
+    kernel_time REAL,
+    success INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_nbit ON runs (nbit);
+CREATE TABLE IF NOT EXISTS trajectory (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    tts REAL NOT NULL,
+    energy INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trajectory_run ON trajectory (run);
+"""
+
+
+class RunHistory:
+    """
+    Local SQLite database of finished jobs: the statistics of the problem (nbit, nelement, minval, maxval),
+    the solver parameters, tts, kernel_time and the energy trajectory, i.e. the (tts, energy) of every
+    intermediate solution observed. It is the input of the TimeLimitTuner and can be queried for analytics.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        :param path: file of the database, created if it does not exist. ":memory:" keeps the history in memory
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.execute("PRAGMA foreign_keys = ON")
+            self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "RunHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(
+        self,
+        solution: SolutionInformation,
+        problem: Optional[ProblemStats] = None,
+        trajectory: Optional[Sequence[Tuple[float, int]]] = None,
+    ) -> int:
+        """
+        Store a finished job.
+        :param solution: the final solution of the job
+        :param problem: (optional) QUBOMatrixInformation or JobInformation of the problem, or a dict of
+                        nbit, nelement, minval and maxval. Without it, nbit is the length of the solution
+        :param trajectory: (optional) (tts, energy) of the intermediate solutions, the final one is added if missing
+        :return: the id of the run
+        """
+        stats = {
+            name: (
+                problem.get(name)
+                if isinstance(problem, dict)
+                else getattr(problem, name, None)
+            )
+            for name in _STATS
+        }
+        if stats["nbit"] is None:
+            stats["nbit"] = len(solution.solution)
+        try:
+            parameters = {
+                name: getattr(solution.parameters, name) for name in _PARAMETERS
+            }
+        except (AttributeError, TypeError):
+            parameters = dict.fromkeys(_PARAMETERS)
+        points = list(trajectory or [])
+        if not points or points[-1][1] != solution.energy:
+            points.append((solution.tts, solution.energy))
+        row = {
+            "job": solution.job,
+            "problem": solution.problem,
+            "recorded": time.time(),
+            **stats,
+            **parameters,
+            "energy": solution.energy,
+            "tts": solution.tts,
+            "kernel_time": getattr(solution, "kernel_time", None),
+            "success": getattr(solution, "success", None),
+        }
+        with self._lock, self._db:
+            run = self._db.execute(
+                f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO trajectory (run, tts, energy) VALUES (?, ?, ?)",
+                [(run, float(tts), int(energy)) for tts, energy in points],
+            )
+        return run
+
+    def recorder(self, problem: Optional[ProblemStats] = None):
+        """
+        Callback for JobTracker.track (or any loop over iter_solutions) collecting the trajectory of a job
+        and recording the job once its final solution arrives.
+        :param problem: (optional) the statistics of the problem, see record
+        """
+        points: List[Tuple[float, int]] = []
+
+        def on_update(solution: SolutionInformation) -> None:
+            points.append((solution.tts, solution.energy))
+            if solution.terminated:
+                self.record(solution, problem, points)
+
+        return on_update
+
+    def query(self, sql: str, parameters: Sequence = ()) -> List[Dict]:
+        """
+        Run any SELECT on the tables runs and trajectory, e.g.
+        history.query("SELECT nbit, AVG(tts) AS tts FROM runs GROUP BY nbit").
+        :return: the rows as dicts
+        """
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, parameters)]
+
+    def runs(
+        self,
+        problem: Optional[str] = None,
+        min_nbit: Optional[int] = None,
+        max_nbit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        The recorded runs, oldest first.
+        :param problem: (optional) only runs of this problem
+        :param min_nbit: (optional) only runs of problems with at least this many variables
+        :param max_nbit: (optional) only runs of problems with at most this many variables
+        """
+        conditions, parameters = [], []
+        for condition, value in (
+            ("problem = ?", problem),
+            ("nbit >= ?", min_nbit),
+            ("nbit <= ?", max_nbit),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(f"SELECT * FROM runs{where} ORDER BY id", parameters)
+
+    def trajectory(self, run: int) -> List[Tuple[float, int]]:
+        """
+        The (tts, energy) of the solutions of a run, in the order they were observed.
+        """
+        return [
+            (row["tts"], row["energy"])
+            for row in self.query(
+                "SELECT tts, energy FROM trajectory WHERE run = ? ORDER BY rowid",
+                (run,),
+            )
+        ]
+
+
+class TimeLimitTuner:
+    """
+    Proposes the time_limit of a job from the RunHistory of similar problems: for every recorded run of a problem
+    with about as many variables, the solver time needed to reach the requested quality is read from its
+    trajectory and scaled linearly to the size of the new problem. The proposal is a quantile of these times
+    with a safety margin. Runs that never reached the quality count as needing more than their time limit.
+    """
+
+    def __init__(
+        self,
+        history: RunHistory,
+        quantile: float = 0.9,
+        margin: float = 1.2,
+        size_ratio: float = 2.0,
+        min_runs: int = 3,
+        min_time_limit: int = 1,
+        max_time_limit: int = 3600,
+    ):
+        """
+        :param history: the recorded runs
+        :param quantile: share of similar runs that would have reached the quality within the proposed time limit,
+                         in (0, 1]
+        :param margin: factor applied to the quantile
+        :param size_ratio: runs of problems with between nbit / size_ratio and nbit * size_ratio variables are similar
+        :param min_runs: fewer similar runs than this are not enough for a proposal
+        :param min_time_limit: smallest time limit proposed
+        :param max_time_limit: largest time limit proposed
+        """
+        if not 0 < quantile <= 1:
+            raise ABS2Exception(f"quantile has to be in (0, 1], got {quantile}")
+        self.history = history
+        self.quantile = quantile
+        self.margin = margin
+        self.size_ratio = size_ratio
+        self.min_runs = min_runs
+        self.min_time_limit = min_time_limit
+        self.max_time_limit = max_time_limit
+
+    @staticmethod
+    def time_to_reach(
+        trajectory: Sequence[Tuple[float, int]], goal: float
+    ) -> Optional[float]:
+        """
+        The tts of the first solution with at most the goal energy, None if no solution reached it.
+        """
+        for tts, energy in trajectory:
+            if energy <= goal:
+                return tts
+        return None
+
+    def needed_times(
+        self,
+        nbit: int,
+        target_energy: Optional[int] = None,
+        gap: float = 0.0,
+    ) -> List[float]:
+        """
+        Solver time each similar run needed to reach the quality, scaled to nbit variables,
+        infinite for runs that did not reach it.
+        :param nbit: number of variables of the new problem
+        :param target_energy: (optional) the quality is reaching this energy
+        :param gap: without a target energy, the quality is reaching the final energy of the run
+                    within this relative gap, e.g. 0.01 for 1 %
+        """
+        times = []
+        for run in self.history.runs(
+            min_nbit=math.floor(nbit / self.size_ratio),
+            max_nbit=math.ceil(nbit * self.size_ratio),
+        ):
+            if target_energy is None:
+                goal = run["energy"] + gap * abs(run["energy"])
+            else:
+                goal = target_energy
+            needed = self.time_to_reach(self.history.trajectory(run["id"]), goal)
+            times.append(math.inf if needed is None else needed * nbit / run["nbit"])
+        return sorted(times)
+
+    def propose(
+        self,
+        nbit: int,
+        target_energy: Optional[int] = None,
+        gap: float = 0.0,
+        default: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        The smallest time limit expected to reach the quality, see needed_times.
+        :param nbit: number of variables of the new problem
+        :param target_energy: (optional) the energy to reach
+        :param gap: without a target energy, the relative gap to the final energy of the similar runs
+        :param default: returned if there are fewer than min_runs similar runs
+        :return: the time limit in seconds, max_time_limit if too many similar runs never reached the quality
+        """
+        times = self.needed_times(nbit, target_energy, gap)
+        if len(times) < max(self.min_runs, 1):
+            return default
+        position = math.ceil(self.quantile * len(times)) - 1
+        needed = times[max(0, min(len(times) - 1, position))]
+        if math.isinf(needed):
+            return self.max_time_limit
+        proposal = math.ceil(needed * self.margin)
+        return max(self.min_time_limit, min(self.max_time_limit, proposal))
@@ -0,0 +1,496 @@
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .backends import SolverBackend
+from .compression import is_gzip_file
+from .decompose import descend
+from .evaluate import QUBOEvaluator
+from .exceptions import ABS2Exception
+from .models import (
+    QUBO,
+    PostJobSuccessMsg,
+    PyQUBOMatrixUploadMsg,
+    QUBOMatrix,
+    QUBOMatrixUploadMsg,
+    Result,
+    SolutionInformation,
+    StatusInformation,
+    VariableIndex,
+    random_file_name,
+)
+
+Adjacency = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Number of parts the annealing schedule of a job is run in, the best solution so far is published after each
+_SEGMENTS = 10
+
+
+def read_matrix(filename: str) -> Dict:
+    """
+    Load a QUBO matrix file as uploaded by post_qubo_matrix, plain or gzip compressed.
+    """
+    opener = gzip.open if is_gzip_file(filename) else open
+    with opener(filename, "rt") as f:
+        return json.load(f)
+
+
+def merged_adjacency(evaluator: QUBOEvaluator) -> Adjacency:
+    """
+    Neighbors of every variable in CSR layout with the weights of repeated entries, e.g. [i, j] and [j, i], summed,
+    so the neighbors of a variable are unique and their fields can be updated with fancy indexing.
+    :return: indptr, indices and weights, the neighbors of k are indices[indptr[k]:indptr[k + 1]]
+    """
+    sources = np.repeat(np.arange(evaluator.nbit), np.diff(evaluator.indptr))
+    pairs = sources * evaluator.nbit + evaluator.indices
+    unique, inverse = np.unique(pairs, return_inverse=True)
+    weights = np.bincount(inverse, evaluator.weights).astype(np.int64)
+    keep = weights != 0
+    unique, weights = unique[keep], weights[keep]
+    indptr = np.concatenate(
+        (
+            [0],
+            np.cumsum(np.bincount(unique // evaluator.nbit, minlength=evaluator.nbit)),
+        )
+    )
+    return indptr, unique % evaluator.nbit, weights
+
+
+def beta_range(evaluator: QUBOEvaluator, adjacency: Adjacency) -> Tuple[float, float]:
+    """
+    Inverse temperatures at the start and the end of the annealing schedule: at first the largest possible
+    energy increase of a flip is accepted with probability 1/2, at last the smallest one with probability 1/100.
+    """
+    indptr, _, weights = adjacency
+    bound = np.abs(evaluator.linear) + np.add.reduceat(
+        np.abs(np.append(weights, 0)), indptr[:-1]
+    ) * (np.diff(indptr) > 0)
+    values = np.abs(np.concatenate((evaluator.linear, weights)))
+    values = values[values > 0]
+    if not len(values):
+        return 1.0, 1.0
+    return np.log(2) / max(int(bound.max()), 1), np.log(100) / int(values.min())
+
+
+def anneal(
+    linear: np.ndarray,
+    adjacency: Adjacency,
+    replicas: int,
+    sweeps: int,
+    betas: Tuple[float, float],
+    seed: Optional[int] = None,
+    seconds: Optional[float] = None,
+    initial: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, int]:
+    """
+    Simulated annealing of many replicas at once: every step of a sweep flips one variable in all replicas
+    that accept the flip, so the work per step is a vector operation over the replicas.
+    :param linear: the diagonal of the QUBO matrix
+    :param adjacency: the couplings, see merged_adjacency
+    :param replicas: number of independent runs
+    :param sweeps: number of sweeps over all variables, along a geometric schedule of inverse temperatures
+    :param betas: inverse temperature of the first and the last sweep
+    :param seed: (optional) seed of the random numbers
+    :param seconds: (optional) stop after the sweep running when this many seconds passed
+    :param initial: (optional) (replicas, nbit) array of start vectors, e.g. to continue an earlier part
+                    of the schedule. Random if omitted
+    :return: the final vectors as (replicas, nbit) array and the number of sweeps done
+    """
+    deadline = None if seconds is None else time.monotonic() + seconds
+    indptr, indices, weights = adjacency
+    nbit = len(linear)
+    rng = np.random.default_rng(seed)
+    if initial is None:
+        x = rng.integers(0, 2, (replicas, nbit))
+    else:
+        x = np.array(initial, dtype=np.int64)
+        replicas = len(x)
+    fields = np.tile(linear, (replicas, 1))
+    for k in range(nbit):
+        start, end = indptr[k], indptr[k + 1]
+        fields[:, indices[start:end]] += x[:, k, None] * weights[start:end]
+    done = 0
+    for beta in np.geomspace(betas[0], betas[1], sweeps):
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        # Flip if the energy change is below -log(u) / beta, i.e. with probability min(1, exp(-beta * delta))
+        limits = -np.log(1.0 - rng.random((nbit, replicas))) / beta
+        for k in range(nbit):
+            delta = (1 - 2 * x[:, k]) * fields[:, k]
+            flip = np.flatnonzero(delta <= limits[k])
+            if not len(flip):
+                continue
+            change = 1 - 2 * x[flip, k]
+            x[flip, k] ^= 1
+            start, end = indptr[k], indptr[k + 1]
+            fields[np.ix_(flip, indices[start:end])] += (
+                change[:, None] * weights[start:end]
+            )
+        done += 1
+    return x, done
+
+
+class _LocalJob:
+    def __init__(self, name: str, problem: str, time_limit: int):
+        self.name = name
+        self.problem = problem
+        self.time_limit = time_limit
+        self.future: Optional[Future] = None
+        self.deleted = False
+        # Best solution found while the job is running
+        self.best: Optional[SolutionInformation] = None
+
+
+class LocalSolver(SolverBackend):
+    """
+    In-process QUBO solver with the interface of ABS2API, for problems too small to be worth the upload,
+    verification and queueing latency of the web API, or when the web API is unavailable.
+    Jobs are solved in turn by simulated annealing of many replicas at once, split over worker processes,
+    followed by a steepest descent of the best replica. A job runs for at most its time_limit in seconds.
+    The schedule runs in parts; after each, the best solution so far is published, like the intermediate
+    solutions of the web API, and a job whose solution was deleted stops.
+    Notes:  The token of every method is ignored. get_solution answers 404 while a job is queued,
+            like for an unknown job.
+    """
+
+    def __init__(
+        self,
+        replicas: int = 32,
+        sweeps: int = 1000,
+        workers: int = 1,
+        seed: Optional[int] = None,
+        logger: logging.Logger = None,
+    ):
+        """
+        Constructor for LocalSolver
+        :param replicas: number of annealing runs per job, the best result is returned
+        :param sweeps: number of sweeps over all variables per run, fewer if the time limit is reached first
+        :param workers: number of processes the replicas are split over, 1 anneals in the calling process
+        :param seed: (optional) seed of the random numbers
+        :param logger: (optional) accepts preexisting logger
+        """
+        self.replicas = replicas
+        self.sweeps = sweeps
+        self.workers = workers
+        self._seeds = np.random.SeedSequence(seed)
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._problems: Dict[str, Tuple[QUBOEvaluator, Adjacency]] = {}
+        self._jobs: Dict[str, _LocalJob] = {}
+        self._counts: Dict[str, int] = {}
+        # One job at a time, like the QUBO solver of the web API
+        self._queue = ThreadPoolExecutor(1)
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                job.future.cancel()
+                # The running job stops at the end of its current part
+                job.deleted = True
+        # The running job may still use the worker processes, so it is waited for before they are shut down
+        self._queue.shutdown(wait=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True)
+
+    def __enter__(self) -> "LocalSolver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_status(self) -> StatusInformation:
+        with self._lock:
+            queued = [
+                job
+                for job in self._jobs.values()
+                if job.future is not None and not job.future.done()
+            ]
+        return StatusInformation(
+            message="local solver working",
+            active=True,
+            jobs_in_queue=len(queued),
+            total_time_limit=sum(job.time_limit for job in queued),
+            uri_root="",
+            uri_signup="",
+            uri_account="",
+            uri_token="",
+            uri_problems="",
+            uri_jobs="",
+            uri_solutions="",
+        )
+
+    def _add_problem(self, file: str, evaluator: QUBOEvaluator) -> str:
+        with self._lock:
+            self._problems[file] = (evaluator, merged_adjacency(evaluator))
+        return f"/local/problems/{file}"
+
+    def post_qubo_matrix(
+        self, token: str, filename: str, **kwargs
+    ) -> QUBOMatrixUploadMsg:
+        """
+        Load a QUBO matrix file, see ABS2API.post_qubo_matrix. Upload options in kwargs are ignored.
+        """
+        matrix = read_matrix(filename)
+        return self.post_matrix(token, QUBOMatrix(**matrix))
+
+    def post_matrix(
+        self, token: str, matrix: QUBOMatrix, **kwargs
+    ) -> QUBOMatrixUploadMsg:
+        evaluator = QUBOEvaluator.from_matrix(matrix)
+        uri = self._add_problem(matrix.file, evaluator)
+        return QUBOMatrixUploadMsg("QUBO matrix loaded", matrix.file, uri)
+
+    def post_pyqubo_matrix(
+        self,
+        token: str,
+        qubo: QUBO,
+        file: Optional[str] = None,
+        index: Optional[VariableIndex] = None,
+        **kwargs,
+    ) -> PyQUBOMatrixUploadMsg:
+        if index is None:
+            index = VariableIndex.from_qubo(qubo)
+        file = file or random_file_name()
+        uri = self._add_problem(file, QUBOEvaluator.from_pyqubo(qubo, index))
+        return PyQUBOMatrixUploadMsg(
+            qubo=qubo,
+            key_mapping=None,
+            status_code=202,
+            message="QUBO matrix loaded",
+            file=file,
+            uri_problem=uri,
+            index=index,
+        )
+
+    def delete_qubo_matrix(self, token: str, name: str) -> Result:
+        with self._lock:
+            if self._problems.pop(name, None) is None:
+                raise ABS2Exception("file not found", status_code=404)
+        return Result(200, message="problem deleted")
+
+    def post_job(self, token: str, problem: str, time_limit: int) -> PostJobSuccessMsg:
+        with self._lock:
+            if problem not in self._problems:
+                raise ABS2Exception("no QUBO matrix found", status_code=404)
+            count = self._counts[problem] = self._counts.get(problem, 0) + 1
+            name = f"{os.path.splitext(problem)[0]}_{count:04d}.json"
+            job = self._jobs[name] = _LocalJob(name, problem, time_limit)
+            job.future = self._queue.submit(self._solve, job)
+        return PostJobSuccessMsg(
+            "job accepted",
+            name,
+            f"/local/problems/{problem}",
+            f"/local/jobs/{name}",
+            f"/local/solutions/{name}",
+        )
+
+    def _solve(self, job: _LocalJob) -> SolutionInformation:
+        try:
+            return self._anneal(job)
+        except ABS2Exception:
+            raise
+        except Exception as e:
+            self._logger.exception(msg=f"Job {job.name} failed")
+            raise ABS2Exception(f"Job {job.name} failed: {e!r}") from e
+
+    def _anneal(self, job: _LocalJob) -> SolutionInformation:
+        with self._lock:
+            evaluator, adjacency = self._problems[job.problem]
+        started = time.monotonic()
+        deadline = started + job.time_limit
+        betas = np.geomspace(*beta_range(evaluator, adjacency), self.sweeps)
+        workers = max(1, min(self.workers, self.replicas))
+        chunks = [len(chunk) for chunk in np.array_split(range(self.replicas), workers)]
+        seeds = self._seeds.spawn(workers)
+        # Parts of at most a tenth of the sweeps and of the time limit, whatever is reached first
+        step = -(-self.sweeps // _SEGMENTS)
+        step_seconds = job.time_limit / _SEGMENTS
+        states = [None] * workers
+        sweeps = 0
+        while True:
+            if job.deleted:
+                raise ABS2Exception(f"Job {job.name} deleted")
+            schedule = betas[sweeps : sweeps + step]
+            arguments = [
+                (
+                    evaluator.linear,
+                    adjacency,
+                    chunk,
+                    len(schedule),
+                    (schedule[0], schedule[-1]),
+                    seed.spawn(1)[0],
+                    min(step_seconds, deadline - time.monotonic()),
+                    state,
+                )
+                for chunk, seed, state in zip(chunks, seeds, states)
+            ]
+            if workers == 1:
+                results = [anneal(*arguments[0])]
+            else:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(self.workers)
+                results = list(self._processes.map(anneal, *zip(*arguments)))
+            states = [vectors for vectors, _ in results]
+            done = min(done for _, done in results)
+            sweeps += done
+            vectors = np.concatenate(states)
+            energies = evaluator.energy(vectors)
+            best = int(np.argmin(energies))
+            if job.best is None or energies[best] < job.best.energy:
+                job.best = self._solution(
+                    job, vectors[best], int(energies[best]), started, workers, False
+                )
+            if sweeps >= len(betas) or not done or time.monotonic() >= deadline:
+                break
+        x, energy = descend(evaluator, vectors[best])
+        self._logger.debug(
+            msg=f"Job {job.name} solved in {time.monotonic() - started:.3f}s "
+            f"with {sweeps} sweeps"
+        )
+        return self._solution(job, x, energy, started, workers, True)
+
+    def _solution(
+        self,
+        job: _LocalJob,
+        x: np.ndarray,
+        energy: int,
+        started: float,
+        workers: int,
+        terminated: bool,
+    ) -> SolutionInformation:
+        seconds = time.monotonic() - started
+        information = SolutionInformation(
+            terminated=terminated,
+            problem=job.problem,
+            job=job.name,
+            energy=energy,
+            tts=seconds,
+            solution=x.tolist(),
+            parameters={
+                "time_limit": job.time_limit,
+                "target_energy": energy,
+                "bfactor": 1.0,
+                "factor": 1.0,
+                "nsolpool": self.replicas,
+                "ngpu": 0,
+                "nisland_per_gpu": 0,
+                "nisland": workers,
+                "value_bits": 64,
+                "arithmetic_bits": 64,
+            },
+        )
+        if terminated:
+            information.success = True
+            information.kernel_time = seconds
+        return information
+
+    def _job(self, name: str) -> _LocalJob:
+        with self._lock:
+            job = self._jobs.get(name)
+        if job is None or job.deleted:
+            raise ABS2Exception("file not found", status_code=404)
+        return job
+
+    def get_solution(
+        self,
+        token: str,
+        solution_name: str,
+        verify: bool = False,
+        problem=None,
+        stream: bool = False,
+    ) -> SolutionInformation:
+        """
+        The solution of a job, see ABS2API.get_solution: the final one once the job terminated,
+        the best one found so far while it is running.
+        :param verify: (optional) check the energy against the QUBO matrix of the problem
+        :param problem: (optional) the QUBO matrix to verify against, see ABS2API.get_solution.
+                        The loaded problem of the job if omitted
+        :param stream: ignored, the solution is not transferred
+        """
+        job = self._job(solution_name)
+        if job.future.done():
+            solution = job.future.result()
+        elif job.best is None:
+            raise ABS2Exception("file not found", status_code=404)
+        else:
+            solution = job.best
+        if verify:
+            if problem is None:
+                with self._lock:
+                    loaded = self._problems.get(job.problem)
+                if loaded is None:
+                    raise ABS2Exception(
+                        "verify=True requires the QUBO matrix of the problem"
+                    )
+                problem = loaded[0]
+            QUBOEvaluator.of(problem).verify(solution)
+        return solution
+
+    def wait_for_solution(
+        self,
+        token: str,
+        job: str,
+        target_energy: Optional[int] = None,
+        delete_on_target: bool = False,
+        time_limit: Optional[float] = None,
+        poll_interval: float = 0.5,
+        max_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> SolutionInformation:
+        """
+        Wait until a job terminated, or until its best solution so far reaches a target energy,
+        see ABS2API.wait_for_solution.
+        :param target_energy: (optional) stop waiting once the energy of the solution is at most this value
+        :param delete_on_target: stop the running job once the target energy is reached
+        :param time_limit: ignored, the time limit of the job is known
+        :param poll_interval: shortest interval between two checks of the best solution in seconds
+        :param max_interval: longest interval between two checks of the best solution in seconds
+        :param timeout: (optional) raise an ABS2Exception if the job has not terminated after this many seconds
+        """
+        local = self._job(job)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = poll_interval
+        while True:
+            wait = None if target_energy is None else interval
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0.0)
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                return local.future.result(wait)
+            except FutureTimeoutError:
+                pass
+            best = local.best
+            if (
+                target_energy is not None
+                and best is not None
+                and best.energy <= target_energy
+            ):
+                if delete_on_target:
+                    self.delete_solution(token, job)
+                return best
+            if deadline is not None and time.monotonic() >= deadline:
+                raise ABS2Exception(
+                    f"Job {job} did not terminate within {timeout} seconds"
+                )
+            interval = min(interval * 2, max_interval)
+
+    def delete_job(self, token: str, job_name: str) -> Result:
+        job = self._job(job_name)
+        if not job.future.cancel():
+            raise ABS2Exception("job is not queued", status_code=404)
+        job.deleted = True
+        return Result(200, message="job deleted")
+
+    def delete_solution(self, token: str, solution_name: str) -> Result:
+        # Like on the web API, a running job stops once its solution file is deleted
+        self._job(solution_name).deleted = True
+        return Result(200, message="solution deleted")
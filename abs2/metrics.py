@@ -0,0 +1,223 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .retry import CircuitBreaker
+
+# Upper bounds in seconds of the latency histogram buckets, from local stand-ins to long uploads
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def endpoint_label(endpoint: str) -> str:
+    """
+    Low-cardinality label of an endpoint: file names are replaced by a placeholder,
+    e.g. "problems/flower-k.json" becomes "problems/{name}" and the root endpoint "" becomes "status".
+    """
+    resource, separator, _ = endpoint.partition("/")
+    if not resource:
+        return "status"
+    return resource + "/{name}" if separator else resource
+
+
+class RequestRecord:
+    def __init__(
+        self,
+        method: str,
+        endpoint: str,
+        status_code: Optional[int],
+        seconds: float,
+        response_seconds: float = 0.0,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        encode_seconds: float = 0.0,
+        decode_seconds: float = 0.0,
+        attempt: int = 1,
+    ):
+        """
+        Measurements of one HTTP request sent by a RestAdapter, passed to every hook
+        :param method: HTTP method
+        :param endpoint: endpoint label, see endpoint_label
+        :param status_code: HTTP status code, None if no response was received
+        :param seconds: total time of the request, from encoding the body to decoding the response
+        :param response_seconds: time from sending the request until the response headers arrived,
+                                 i.e. connecting, uploading the body and the time the server took
+        :param request_bytes: size of the request body, 0 if unknown
+        :param response_bytes: size of the (decompressed) response body
+        :param encode_seconds: time spent serializing the request body to JSON
+        :param decode_seconds: time spent parsing the JSON response
+        :param attempt: 1 for the first attempt, higher for retries of the same call
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.seconds = seconds
+        self.response_seconds = response_seconds
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.encode_seconds = encode_seconds
+        self.decode_seconds = decode_seconds
+        self.attempt = attempt
+
+
+RequestHook = Callable[[RequestRecord], None]
+
+
+class _Histogram:
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    Request hook aggregating per-endpoint latency histograms, byte counts, JSON encode / decode time,
+    retries and status codes. Pass it to ABS2API(hooks=[metrics]) and export it with to_prometheus().
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param buckets: upper bounds in seconds of the latency histogram buckets, ascending
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], _Histogram] = {}
+        self.status: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.sent_bytes: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.received_bytes: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.encode_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.decode_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.retries: Dict[Tuple[str, str], int] = defaultdict(int)
+        # Circuit breakers by name, their state is read when exporting
+        self.breakers: Dict[str, "CircuitBreaker"] = {}
+
+    def track_breaker(self, breaker: "CircuitBreaker", name: str = "abs2") -> None:
+        """
+        Export the state, open time and rejected calls of a retry.CircuitBreaker.
+        :param name: value of the "breaker" label
+        """
+        with self._lock:
+            self.breakers[name] = breaker
+
+    def __call__(self, record: RequestRecord) -> None:
+        key = (record.method, record.endpoint)
+        status = str(record.status_code) if record.status_code is not None else "error"
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = _Histogram(len(self.buckets))
+            histogram.counts[bisect_left(self.buckets, record.seconds)] += 1
+            histogram.sum += record.seconds
+            histogram.count += 1
+            self.status[key + (status,)] += 1
+            self.sent_bytes[key] += record.request_bytes
+            self.received_bytes[key] += record.response_bytes
+            self.encode_seconds[key] += record.encode_seconds
+            self.decode_seconds[key] += record.decode_seconds
+            if record.attempt > 1:
+                self.retries[key] += 1
+
+    def to_prometheus(self, prefix: str = "abs2_client") -> str:
+        """
+        Export all metrics in the Prometheus text exposition format.
+        :param prefix: prefix of all metric names
+        """
+        lines = []
+
+        def labels(key, **extra) -> str:
+            pairs = {"method": key[0], "endpoint": key[1], **extra}
+            return ",".join(f'{name}="{value}"' for name, value in pairs.items())
+
+        def family(name: str, kind: str, help: str, values) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for key, value in sorted(values.items()):
+                lines.append(f"{prefix}_{name}{{{labels(key)}}} {value}")
+
+        with self._lock:
+            name = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {name} Duration of requests to the ABS2 web API")
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{{{labels(key, le=bound)}}} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{{{labels(key)}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels(key)}}} {histogram.count}")
+            name = f"{prefix}_requests_total"
+            lines.append(f"# HELP {name} Requests by status code")
+            lines.append(f"# TYPE {name} counter")
+            for key, count in sorted(self.status.items()):
+                lines.append(f"{name}{{{labels(key, status=key[2])}}} {count}")
+            family("request_bytes_total", "counter", "Bytes sent", self.sent_bytes)
+            family(
+                "response_bytes_total", "counter", "Bytes received", self.received_bytes
+            )
+            family(
+                "json_encode_seconds_total",
+                "counter",
+                "Time spent encoding JSON",
+                self.encode_seconds,
+            )
+            family(
+                "json_decode_seconds_total",
+                "counter",
+                "Time spent decoding JSON",
+                self.decode_seconds,
+            )
+            family("retries_total", "counter", "Retried requests", self.retries)
+            breakers = sorted(self.breakers.items())
+            for name, kind, help, sample in (
+                (
+                    "circuit_open",
+                    "gauge",
+                    "1 while the circuit is open",
+                    lambda breaker: int(breaker.state != breaker.CLOSED),
+                ),
+                (
+                    "circuit_open_seconds_total",
+                    "counter",
+                    "Time the circuit was open",
+                    lambda breaker: breaker.open_seconds,
+                ),
+                (
+                    "circuit_opened_total",
+                    "counter",
+                    "Times the circuit opened",
+                    lambda breaker: breaker.opened,
+                ),
+                (
+                    "circuit_rejected_total",
+                    "counter",
+                    "Calls failed fast while the circuit was open",
+                    lambda breaker: breaker.rejected,
+                ),
+            ):
+                if not breakers:
+                    break
+                lines.append(f"# HELP {prefix}_{name} {help}")
+                lines.append(f"# TYPE {prefix}_{name} {kind}")
+                for label, breaker in breakers:
+                    lines.append(
+                        f'{prefix}_{name}{{breaker="{label}"}} {sample(breaker)}'
+                    )
+        return "\n".join(lines) + "\n"
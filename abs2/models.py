@@ -1,11 +1,50 @@
 import json
+import string
 from datetime import datetime
-from typing import Dict, List, Tuple
+from itertools import chain
+from random import choices
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .exceptions import ABS2Exception
 
 QUBO = Dict[Tuple[str, str], float]
 
 
+def random_file_name() -> str:
+    """
+    Random file name for problems uploaded without an explicit name.
+    """
+    return "".join(choices(string.ascii_lowercase, k=10)) + ".json"
+
+
+def as_dict(model) -> Dict:
+    """
+    Public attributes of a model as dict, e.g. to send it as JSON. Models use __slots__ and have no __dict__,
+    optional attributes the web API did not return are left out.
+    """
+    return {
+        name: getattr(model, name)
+        for name in model.__slots__
+        if not name.startswith("_") and hasattr(model, name)
+    }
+
+
+def _optional(convert, value):
+    return None if value is None else convert(value)
+
+
+def _parse(cls, data):
+    # Nested objects are kept as received and converted to their model on first access.
+    # Keys the model does not know, e.g. added by a newer version of the web API, are ignored,
+    # missing keys, e.g. the empty parameters of some solutions, are None
+    if not isinstance(data, dict):
+        return data
+    return cls(**{name: data.get(name) for name in cls.__slots__})
+
+
 class Result:
+    __slots__ = ("status_code", "message", "data")
+
     def __init__(self, status_code: int, message: str = "", data: Dict = None):
         """
         Result returned from low-level RestAdapter
@@ -19,6 +58,8 @@ class Result:
 
 
 class User:
+    __slots__ = ("username", "email", "firstname", "lastname", "affiliation")
+
     def __init__(
         self, username: str, email: str, firstname: str, lastname: str, affiliation: str
     ):
@@ -30,12 +71,16 @@ class User:
 
 
 class UserNP:
+    __slots__ = ("username", "password")
+
     def __init__(self, username: str, password: str):
         self.username = str(username)
         self.password = str(password)
 
 
 class RegisteredUserInformation:
+    __slots__ = ("username", "email", "firstname", "lastname", "affiliation", "jobs")
+
     def __init__(
         self,
         username: str,
@@ -54,6 +99,20 @@ class RegisteredUserInformation:
 
 
 class StatusInformation:
+    __slots__ = (
+        "message",
+        "active",
+        "jobs_in_queue",
+        "total_time_limit",
+        "uri_root",
+        "uri_signup",
+        "uri_account",
+        "uri_token",
+        "uri_problems",
+        "uri_jobs",
+        "uri_solutions",
+    )
+
     def __init__(
         self,
         message: str,
@@ -82,30 +141,228 @@ class StatusInformation:
 
 
 class TokenMessage:
+    __slots__ = ("message", "access_token")
+
     def __init__(self, message: str, access_token: str):
         self.message = str(message)
         self.access_token = str(access_token)
 
 
 class MatrixParameters:
+    __slots__ = ("problem", "nbit", "base")
+
     def __init__(self, problem: str, nbit: int, base: int):
-        self.problem = str(problem)
-        self.nbit = int(nbit)
-        self.base = int(base)
+        self.problem = _optional(str, problem)
+        self.nbit = _optional(int, nbit)
+        self.base = _optional(int, base)
 
 
 class QUBOMatrix:
+    __slots__ = ("file", "nbit", "base", "qubo")
+
     def __init__(self, file: str, nbit: int, base: int, qubo: list):
+        """
+        :param qubo: list of [i, j, value] entries, or a NumPy array of shape (n, 3)
+        """
         self.file = str(file)
         self.nbit = int(nbit)
         self.base = int(base)
         self.qubo = qubo
 
     def to_json(self):
-        return json.dumps(self.__dict__)
+        if isinstance(self.qubo, list):
+            return json.dumps(as_dict(self))
+        from .sparse import triples_to_json
+
+        header = json.dumps({"file": self.file, "nbit": self.nbit, "base": self.base})
+        return header[:-1] + ', "qubo": ' + triples_to_json(self.qubo) + "}"
+
+    def to_bytes(self, serializer=None) -> bytes:
+        """
+        The matrix as UTF-8 encoded JSON, as sent to the web API.
+        :param serializer: (optional) serializers.JSONSerializer to encode the matrix with, see to_json if omitted.
+                           NumPy triples are passed as array to serializers supporting NumPy natively
+        """
+        if serializer is None:
+            return self.to_json().encode()
+        if isinstance(self.qubo, list):
+            return serializer.dumps(as_dict(self))
+        if not serializer.numpy:
+            return self.to_json().encode()
+        import numpy as np
+
+        matrix = as_dict(self)
+        matrix["qubo"] = np.ascontiguousarray(self.qubo, dtype=np.int64)
+        return serializer.dumps(matrix)
+
+    @classmethod
+    def from_coo(
+        cls,
+        rows,
+        cols,
+        values,
+        file: Optional[str] = None,
+        nbit: Optional[int] = None,
+        base: int = 0,
+    ) -> "QUBOMatrix":
+        """
+        Build a QUBO matrix from coordinate format arrays (requires NumPy).
+        (i, j) and (j, i) entries are merged, duplicates summed up and zeros dropped.
+        :param rows: row indices, counted from base
+        :param cols: column indices, counted from base
+        :param values: matrix entries, truncated to integers
+        :param file: (optional) file name of the problem on the server, a random name is generated if omitted
+        :param nbit: (optional) number of variables, at least 32. Derived from the largest index if omitted
+        :param base: index of the first variable, 0 or 1
+        """
+        from .sparse import coo_to_triples
+
+        triples = coo_to_triples(rows, cols, values)
+        return cls._from_triples(triples, file, nbit, base)
+
+    @classmethod
+    def from_scipy(
+        cls,
+        matrix,
+        file: Optional[str] = None,
+        nbit: Optional[int] = None,
+        base: int = 0,
+    ) -> "QUBOMatrix":
+        """
+        Build a QUBO matrix from a SciPy sparse matrix of any format, see from_coo.
+        Row and column i of the matrix belong to the variable with index base + i.
+        """
+        coo = matrix.tocoo()
+        return cls.from_coo(
+            coo.row + base, coo.col + base, coo.data, file, nbit or coo.shape[0], base
+        )
+
+    @classmethod
+    def from_dense(
+        cls,
+        matrix,
+        file: Optional[str] = None,
+        nbit: Optional[int] = None,
+        base: int = 0,
+    ) -> "QUBOMatrix":
+        """
+        Build a QUBO matrix from a dense square NumPy array, see from_coo.
+        Row and column i of the matrix belong to the variable with index base + i.
+        """
+        from .sparse import dense_to_triples
+
+        triples = dense_to_triples(matrix)
+        triples[:, :2] += base
+        return cls._from_triples(triples, file, nbit or len(matrix), base)
+
+    @classmethod
+    def _from_triples(
+        cls, triples, file: Optional[str], nbit: Optional[int], base: int
+    ) -> "QUBOMatrix":
+        size = int(triples[:, 1].max()) - base + 1 if len(triples) else 0
+        if nbit is None:
+            nbit = size
+        elif size > nbit:
+            raise ABS2Exception(f"Index {size + base - 1} exceeds nbit={nbit}")
+        return cls(file or random_file_name(), max(32, nbit), base, triples)
+
+
+class VariableIndex:
+    def __init__(self, names: Iterable[Hashable]):
+        """
+        Bidirectional mapping between variable names and their indices in an uploaded QUBO matrix.
+        The i-th name gets index i. An index only depends on the set of variables when built with from_qubo,
+        so it can be computed once and reused for uploads of every model with the same variables.
+        :param names: the variable names in index order
+        """
+        self.names: List[Hashable] = list(names)
+        self._indices: Dict[Hashable, int] = {
+            name: idx for idx, name in enumerate(self.names)
+        }
+        if len(self._indices) != len(self.names):
+            raise ABS2Exception("Variable names of a VariableIndex must be unique")
+
+    @classmethod
+    def from_qubo(cls, qubo: QUBO, sort: bool = True) -> "VariableIndex":
+        """
+        Collect the variables of a QUBO in dict format in a single pass over its keys.
+        :param qubo: QUBO in dict format as returned by pyqubo's to_qubo()
+        :param sort: sort the names, making the index independent of the order of the QUBO.
+                     Names that cannot be compared keep the order of their first appearance
+        """
+        names = list(dict.fromkeys(chain.from_iterable(qubo)))
+        if sort:
+            try:
+                names.sort()
+            except TypeError:
+                pass
+        return cls(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: Hashable) -> bool:
+        return name in self._indices
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VariableIndex) and self.names == other.names
+
+    def encode(self, name: Hashable) -> int:
+        return self._indices[name]
+
+    def decode(self, index: int) -> Hashable:
+        return self.names[index]
+
+    def decode_solution(self, solution, as_array: bool = False):
+        """
+        Map a solution vector to the variables of this index. Entries beyond the variables of the index,
+        e.g. the padding up to 32 bits of small problems, are ignored. An ABS2Exception is raised if the length
+        of the solution does not fit the index, e.g. for the solution of another problem.
+        :param solution: the solution as list, NumPy array or SolutionInformation
+        :param as_array: return a NumPy uint8 array whose i-th entry is the value of names[i] (requires NumPy)
+        :return: dict of variable name to value, or an array aligned to the index
+        """
+        if isinstance(solution, SolutionInformation):
+            if as_array:
+                solution = solution.solution_array
+            else:
+                solution = solution._solution
+        size = len(self.names)
+        if not size <= len(solution) <= max(32, size):
+            raise ABS2Exception(
+                f"Solution of {len(solution)} bits does not fit the {size} variables of the index"
+            )
+        if as_array:
+            import numpy as np
+
+            return np.asarray(solution, dtype=np.uint8)[:size]
+        if hasattr(solution, "tolist"):
+            solution = solution[:size].tolist()
+        return dict(zip(self.names, solution))
+
+    def encode_qubo(self, qubo: QUBO) -> List[List[int]]:
+        """
+        Convert a QUBO in dict format into the [i, j, value] entries of the web API.
+        """
+        indices = self._indices
+        try:
+            return [[indices[n1], indices[n2], int(v)] for (n1, n2), v in qubo.items()]
+        except KeyError as e:
+            raise ABS2Exception(
+                f"Variable {e.args[0]!r} is not part of the VariableIndex"
+            ) from e
+
+    @property
+    def key_mapping(self) -> Dict[int, Hashable]:
+        return dict(enumerate(self.names))
 
 
 class QUBOMatrixUploadMsg:
+    __slots__ = ("message", "file", "uri_problem")
+
     def __init__(self, message: str, file: str, uri_problem: str):
         self.message = message
         self.file = file
@@ -113,43 +370,57 @@ class QUBOMatrixUploadMsg:
 
 
 class PyQUBOMatrixUploadMsg:
+    __slots__ = ("message", "qubo", "uri_problem", "index", "file", "status_code")
+
     def __init__(
         self,
         qubo: QUBO,
-        key_mapping: Dict[int, str],
+        key_mapping: Optional[Dict[int, str]],
         status_code: int,
         message: str,
         file: str,
         uri_problem: str,
+        index: Optional[VariableIndex] = None,
     ) -> None:
+        """
+        :param key_mapping: mapping of indices to variable names, may be None if index is given
+        :param index: (optional) the VariableIndex used for the upload
+        """
         self.message = message
         self.qubo = qubo
         self.uri_problem = uri_problem
-        self.key_mapping = key_mapping
+        if index is None:
+            index = VariableIndex(key_mapping[idx] for idx in sorted(key_mapping))
+        self.index = index
         self.file = file
         self.status_code = status_code
 
+    @property
+    def key_mapping(self) -> Dict[int, str]:
+        return self.index.key_mapping
+
     def __str__(self) -> str:
         return f"{self.__class__.__name__}({self.message=}, {self.file=}, {self.uri_problem=})"
 
-    def decode_solution(self, solution: List[int]):
-        sol: Dict[str, int] = {}
-        for idx, x in enumerate(solution):
-            try:
-                sol[self.key_mapping[idx]] = x
-            # For small Problems, we might not use all of the 32 variables.
-            except KeyError:
-                break
-        return sol
+    def decode_solution(self, solution: List[int], as_array: bool = False):
+        """
+        Map a solution to the variables of the uploaded QUBO, see VariableIndex.decode_solution.
+        """
+        # For small Problems, we might not use all of the 32 variables.
+        return self.index.decode_solution(solution, as_array)
 
 
 class JobParameters:
+    __slots__ = ("problem", "time_limit")
+
     def __init__(self, problem: str, time_limit: str):
-        self.problem = str(problem)
-        self.time_limit = str(time_limit)
+        self.problem = _optional(str, problem)
+        self.time_limit = _optional(str, time_limit)
 
 
 class PostJobSuccessMsg:
+    __slots__ = ("message", "job", "uri_problem", "uri_job", "uri_solution")
+
     def __init__(
         self, message: str, job: str, uri_problem: str, uri_job: str, uri_solution: str
     ):
@@ -161,6 +432,19 @@ class PostJobSuccessMsg:
 
 
 class SolutionParameters:
+    __slots__ = (
+        "time_limit",
+        "target_energy",
+        "bfactor",
+        "factor",
+        "nsolpool",
+        "ngpu",
+        "nisland_per_gpu",
+        "nisland",
+        "value_bits",
+        "arithmetic_bits",
+    )
+
     def __init__(
         self,
         time_limit: int,
@@ -174,19 +458,31 @@ class SolutionParameters:
         value_bits: int,
         arithmetic_bits: int,
     ):
-        self.time_limit = int(time_limit)
-        self.target_energy = int(target_energy)
-        self.bfactor = float(bfactor)
-        self.factor = float(factor)
-        self.nsolpool = int(nsolpool)
-        self.ngpu = int(ngpu)
-        self.nisland_per_gpu = int(nisland_per_gpu)
-        self.nisland = int(nisland)
-        self.value_bits = int(value_bits)
-        self.arithmetic_bits = int(arithmetic_bits)
+        self.time_limit = _optional(int, time_limit)
+        self.target_energy = _optional(int, target_energy)
+        self.bfactor = _optional(float, bfactor)
+        self.factor = _optional(float, factor)
+        self.nsolpool = _optional(int, nsolpool)
+        self.ngpu = _optional(int, ngpu)
+        self.nisland_per_gpu = _optional(int, nisland_per_gpu)
+        self.nisland = _optional(int, nisland)
+        self.value_bits = _optional(int, value_bits)
+        self.arithmetic_bits = _optional(int, arithmetic_bits)
 
 
 class SolutionInformation:
+    __slots__ = (
+        "terminated",
+        "problem",
+        "job",
+        "energy",
+        "tts",
+        "success",
+        "kernel_time",
+        "_solution",
+        "_parameters",
+    )
+
     def __init__(
         self,
         terminated: bool,
@@ -204,15 +500,88 @@ class SolutionInformation:
         self.job = str(job)
         self.energy = int(energy)
         self.tts = float(tts)
-        self.solution = list(solution)
-        self.parameters = parameters
+        self.solution = solution
+        self._parameters = parameters
         if success is not None:
             self.success = bool(success)
         if kernel_time is not None:
             self.kernel_time = float(kernel_time)
 
+    @property
+    def solution(self) -> List[int]:
+        """
+        The solution vector as a list of ints. It is stored with one byte per bit until the list is first
+        accessed, which then replaces it, so changes to the list are kept. Use solution_array instead
+        to keep the compact storage.
+        """
+        raw = self._solution
+        if not isinstance(raw, list):
+            raw = self._solution = raw.tolist() if hasattr(raw, "tolist") else list(raw)
+        return raw
+
+    @solution.setter
+    def solution(self, solution) -> None:
+        if isinstance(solution, list):
+            # A list holds an 8 byte pointer per bit, a bytearray a single byte
+            try:
+                solution = bytearray(solution)
+            except (TypeError, ValueError):
+                pass
+        self._solution = solution
+
+    @property
+    def parameters(self) -> SolutionParameters:
+        """
+        The solver parameters of the job, parsed on first access.
+        """
+        self._parameters = _parse(SolutionParameters, self._parameters)
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: SolutionParameters) -> None:
+        self._parameters = parameters
+
+    @property
+    def solution_array(self):
+        """
+        The solution vector as a NumPy uint8 array (requires NumPy), one byte per bit.
+        The array shares the memory of the received solution unless the solution list was accessed before,
+        writing to it then changes the solution.
+        """
+        import numpy as np
+
+        raw = self._solution
+        if isinstance(raw, bytearray):
+            return np.frombuffer(raw, dtype=np.uint8)
+        return np.asarray(raw, dtype=np.uint8)
+
+    @property
+    def solution_bits(self):
+        """
+        The solution vector bit-packed into a NumPy uint8 array (requires NumPy), eight bits per byte.
+        np.unpackbits(solution_bits, count=len(solution)) restores solution_array.
+        """
+        import numpy as np
+
+        return np.packbits(self.solution_array)
+
+    def to_image(self, shape: Tuple[int, int]):
+        """
+        Arrange the solution row by row into a binary image, 0 / 1 being black / white pixels
+        (requires NumPy and Pillow). Used e.g. for halftoning problems like flower-k.
+        :param shape: (height, width) of the image, height * width has to match the number of bits used
+        :return: PIL image in mode "1"
+        """
+        from PIL import Image
+
+        height, width = shape
+        pixels = self.solution_array[: height * width].reshape(shape)
+        return Image.fromarray(pixels.astype(bool))
+
 
 class JobInformation:
+    __slots__ = ("job", "problem", "nbit", "minval", "maxval", "_parameters")
+
     def __init__(
         self,
         job: str,
@@ -227,10 +596,36 @@ class JobInformation:
         self.nbit = int(nbit)
         self.minval = int(minval)
         self.maxval = int(maxval)
-        self.parameters = parameters
+        self._parameters = parameters
+
+    @property
+    def parameters(self) -> JobParameters:
+        """
+        The parameters the job was posted with, parsed on first access.
+        """
+        self._parameters = _parse(JobParameters, self._parameters)
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: JobParameters) -> None:
+        self._parameters = parameters
 
 
 class QUBOMatrixInformation:
+    __slots__ = (
+        "file",
+        "bytes",
+        "time",
+        "uri_problem",
+        "verify",
+        "message",
+        "nbit",
+        "nelement",
+        "minval",
+        "maxval",
+        "_parameters",
+    )
+
     def __init__(
         self,
         file: str,
@@ -262,4 +657,18 @@ class QUBOMatrixInformation:
         if maxval is not None:
             self.maxval = int(maxval)
         if parameters is not None:
-            self.parameters = parameters
+            self._parameters = parameters
+
+    @property
+    def parameters(self) -> MatrixParameters:
+        """
+        The parameters of the verified matrix, parsed on first access. Not set before verification succeeded.
+        """
+        if not hasattr(self, "_parameters"):
+            raise AttributeError("parameters")
+        self._parameters = _parse(MatrixParameters, self._parameters)
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: MatrixParameters) -> None:
+        self._parameters = parameters
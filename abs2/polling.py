@@ -0,0 +1,116 @@
+import random
+from typing import Optional
+
+from .models import SolutionInformation, StatusInformation
+
+
+class Backoff:
+    """
+    Poll intervals growing geometrically from `initial` up to `maximum`, with a little random jitter
+    so that many clients waiting for the same web API do not poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        initial: float = 0.5,
+        maximum: float = 30.0,
+        factor: float = 1.5,
+        jitter: float = 0.1,
+    ):
+        """
+        :param initial: first interval in seconds
+        :param maximum: upper bound of the interval in seconds
+        :param factor: growth of the interval after every poll without progress
+        :param jitter: relative random deviation of every interval
+        """
+        self.initial = initial
+        self.maximum = max(maximum, initial)
+        self.factor = factor
+        self.jitter = jitter
+        self._interval = initial
+
+    def reset(self, initial: Optional[float] = None) -> None:
+        """
+        Start again from the first interval, e.g. after the polled resource changed.
+        :param initial: (optional) new first interval, clamped to the maximum
+        """
+        if initial is not None:
+            self.initial = min(max(initial, 0.0), self.maximum)
+        self._interval = self.initial
+
+    def next(self) -> float:
+        """
+        :return: the interval to wait before the next poll, in seconds
+        """
+        interval = self._interval
+        self._interval = min(self._interval * self.factor, self.maximum)
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+def queued_interval(status: StatusInformation, initial: float, maximum: float) -> float:
+    """
+    Interval before the next poll for a job that is still waiting in the queue.
+    The QUBO solver works through the jobs in turn, so a job cannot start before the time limits
+    of the jobs ahead of it have mostly passed; polling much earlier is wasted.
+    """
+    if not status.jobs_in_queue:
+        return initial
+    return min(max(status.total_time_limit / 2, initial), maximum)
+
+
+def running_interval(
+    time_limit: Optional[float], initial: float, maximum: float
+) -> float:
+    """
+    Interval before the next poll for a running job: about 20 polls over its time limit.
+    """
+    if not time_limit:
+        return initial
+    return min(max(time_limit / 20, initial), maximum)
+
+
+def time_limit_of(solution: SolutionInformation) -> Optional[float]:
+    """
+    Time limit of the job of a solution, None if the web API did not report it.
+    """
+    try:
+        return solution.parameters.time_limit
+    except (AttributeError, TypeError):
+        # Parameters missing or incomplete
+        return None
+
+
+class VerificationStats:
+    """
+    Observed throughput of the verification of uploaded QUBO matrices, in bytes per second,
+    as exponentially weighted moving average so it follows changes of the load of the web API.
+    """
+
+    def __init__(self, weight: float = 0.3):
+        """
+        :param weight: weight of the newest observation in the average
+        """
+        self.weight = weight
+        self.rate: Optional[float] = None
+        self.samples = 0
+
+    def record(self, size: int, seconds: float) -> None:
+        """
+        Record that `size` bytes were verified within `seconds`.
+        """
+        if size <= 0 or seconds <= 0:
+            return
+        rate = size / seconds
+        if self.rate is None:
+            self.rate = rate
+        else:
+            self.rate += self.weight * (rate - self.rate)
+        self.samples += 1
+
+    def estimate(self, size: int) -> Optional[float]:
+        """
+        :return: expected seconds to verify `size` bytes, None before the first observation
+        """
+        if self.rate is None:
+            return None
+        return size / self.rate
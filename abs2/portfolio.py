@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from .abs2_api import ABS2API
+from .exceptions import ABS2Exception
+from .models import QUBO, QUBOMatrix, SolutionInformation
+from .tracker import JobTracker
+
+
+class Variant:
+    def __init__(
+        self,
+        problem: Union[str, QUBOMatrix, QUBO],
+        time_limit: int,
+        scale: float = 1.0,
+        label: Optional[str] = None,
+    ):
+        """
+        One way of solving a problem, raced against the other variants of a portfolio.
+        :param problem: QUBO matrix file, QUBOMatrix or QUBO in dict format, see ABS2API.submit_when_verified
+        :param time_limit: the time limit of the job
+        :param scale: factor the problem was scaled by, energies are divided by it before they are compared
+        :param label: (optional) name of the variant in the report, e.g. "x2, 60s"
+        """
+        self.problem = problem
+        self.time_limit = time_limit
+        self.scale = scale
+        self.label = label
+
+    def energy(self, solution: SolutionInformation) -> float:
+        """
+        The energy of a solution in the scale of the unscaled problem.
+        """
+        return solution.energy / self.scale
+
+
+class VariantReport:
+    def __init__(self, variant: Variant, job: Optional[str]):
+        """
+        :param variant: the variant
+        :param job: the name of its job, None if the verification of its problem failed
+        """
+        self.variant = variant
+        self.job = job
+        self.solution: Optional[SolutionInformation] = None
+        # (seconds since the portfolio started, energy in the scale of the unscaled problem) of every solution seen
+        self.trajectory: List[Tuple[float, float]] = []
+        self.time_to_target: Optional[float] = None
+        self.terminated = False
+        self.cancelled = False
+
+    @property
+    def energy(self) -> Optional[float]:
+        return self.trajectory[-1][1] if self.trajectory else None
+
+
+class PortfolioResult:
+    def __init__(self, reports: List[VariantReport], seconds: float, reason: str):
+        """
+        :param reports: the report of every variant, in the order of the variants
+        :param seconds: seconds from the first upload until the portfolio stopped
+        :param reason: "target" (a variant reached the target energy), "stalled" (no improvement for stall_seconds)
+                       or "terminated" (all jobs terminated)
+        """
+        self.reports = reports
+        self.seconds = seconds
+        self.reason = reason
+
+    @property
+    def best(self) -> Optional[VariantReport]:
+        """
+        The report of the variant with the lowest energy, the earliest of them if several are equal.
+        """
+        solved = [report for report in self.reports if report.trajectory]
+        if not solved:
+            return None
+        return min(solved, key=lambda report: (report.energy, report.trajectory[-1][0]))
+
+
+class PortfolioRunner:
+    """
+    Races variants of a problem, e.g. with different time limits or scalings, on the QUBO solver:
+    all variants are submitted at once and their solution files are watched with one JobTracker.
+    As soon as a variant reaches the target energy, or the best energy did not improve for stall_seconds,
+    the remaining jobs are deleted (queued ones) or stopped by deleting their solution files (running ones),
+    to give the solver time back.
+    """
+
+    def __init__(
+        self,
+        api: ABS2API,
+        token: str,
+        interval: float = 1.0,
+        max_workers: int = 4,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param api: the ABS2API used for all requests
+        :param token: the bearer token of the user
+        :param interval: seconds between two polls of the solution files
+        :param max_workers: number of uploads running at the same time
+        :param logger: (optional) accepts preexisting logger
+        """
+        self._api = api
+        self._token = token
+        self.interval = interval
+        self.max_workers = max_workers
+        self._logger = logger or logging.getLogger(__name__)
+
+    def _submit(self, variants: List[Variant], timeout: Optional[float]):
+        # submit_when_verified takes one time limit, variants sharing one are submitted together
+        groups: Dict[int, List[int]] = {}
+        for position, variant in enumerate(variants):
+            groups.setdefault(variant.time_limit, []).append(position)
+        jobs = [None] * len(variants)
+
+        def submit(time_limit: int) -> None:
+            positions = groups[time_limit]
+            posted = self._api.submit_when_verified(
+                self._token,
+                [variants[position].problem for position in positions],
+                time_limit,
+                timeout=timeout,
+                max_workers=self.max_workers,
+            )
+            for position, job in zip(positions, posted):
+                jobs[position] = None if job is None else job.job
+
+        with ThreadPoolExecutor(len(groups)) as executor:
+            list(executor.map(submit, groups))
+        return jobs
+
+    def _stop(self, report: VariantReport) -> None:
+        try:
+            self._api.delete_job(self._token, report.job)
+        except ABS2Exception as e:
+            if e.status_code != 404:
+                raise
+            # Not queued anymore, deleting the solution file of the running job stops it
+            try:
+                self._api.delete_solution(self._token, report.job)
+            except ABS2Exception as e:
+                if e.status_code != 404:
+                    raise
+        report.cancelled = True
+
+    def run(
+        self,
+        variants: List[Variant],
+        target_energy: Optional[float] = None,
+        stall_seconds: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> PortfolioResult:
+        """
+        Submit all variants and watch them until one reaches the target energy, the best energy stalls
+        or all jobs terminated.
+        :param variants: the variants to race
+        :param target_energy: (optional) stop once a variant reaches at most this energy (of the unscaled problem)
+        :param stall_seconds: (optional) stop once the best energy of all variants did not improve for this long
+        :param timeout: (optional) stop the remaining jobs and raise an ABS2Exception after this many seconds
+        :return: PortfolioResult with the report of every variant
+        """
+        if not variants:
+            raise ABS2Exception("No variants to run")
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        jobs = self._submit(variants, timeout)
+        reports = [VariantReport(variant, job) for variant, job in zip(variants, jobs)]
+        lock = threading.Lock()
+        state = {"best": None, "improved": time.monotonic(), "reason": "terminated"}
+        reached = threading.Event()
+
+        def on_update(report: VariantReport):
+            def update(solution: SolutionInformation) -> None:
+                now = time.monotonic()
+                energy = report.variant.energy(solution)
+                with lock:
+                    report.solution = solution
+                    report.terminated = solution.terminated
+                    report.trajectory.append((now - started, energy))
+                    if state["best"] is None or energy < state["best"]:
+                        state["best"], state["improved"] = energy, now
+                    if target_energy is not None and energy <= target_energy:
+                        if report.time_to_target is None:
+                            report.time_to_target = now - started
+                        reached.set()
+
+            return update
+
+        tracker = JobTracker(self._api, self._token, interval=self.interval)
+        for report in reports:
+            if report.job is not None:
+                tracker.track(report.job, on_update(report))
+        try:
+            while True:
+                tracker.poll()
+                if reached.is_set():
+                    state["reason"] = "target"
+                    break
+                if not tracker.pending:
+                    break
+                now = time.monotonic()
+                if (
+                    stall_seconds is not None
+                    and state["best"] is not None
+                    and now - state["improved"] >= stall_seconds
+                ):
+                    state["reason"] = "stalled"
+                    break
+                if deadline is not None and now >= deadline:
+                    raise ABS2Exception(
+                        f"No variant reached the target within {timeout} seconds"
+                    )
+                time.sleep(self.interval)
+        finally:
+            # Also when polling failed, no job is left running
+            for report in reports:
+                if report.job is not None and not report.terminated:
+                    try:
+                        self._stop(report)
+                    except ABS2Exception as e:
+                        self._logger.warning(
+                            msg=f"Stopping job {report.job} failed: {e}"
+                        )
+        seconds = time.monotonic() - started
+        self._logger.info(
+            msg=f"Portfolio of {len(variants)} variants stopped after {seconds:.1f}s: {state['reason']}"
+        )
+        return PortfolioResult(reports, seconds, state["reason"])
@@ -1,12 +1,68 @@
 import logging
-from json import JSONDecodeError
-from typing import Dict
-
-import requests
-import requests.packages
+import time
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from .exceptions import ABS2Exception
+from .metrics import RequestHook, RequestRecord, endpoint_label
 from .models import Result
+from .retry import CircuitBreaker, RetryPolicy
+from .serializers import JSONSerializer, default_serializer
+
+if TYPE_CHECKING:
+    import requests
+
+Timeout = Union[float, Tuple[float, float]]
+# Result of a request, or the response of a streamed request
+Response = TypeVar("Response")
+
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+def _error_message(data) -> Optional[str]:
+    # The web API explains most errors in the "message" member of the response
+    if isinstance(data, dict) and isinstance(data.get("message"), str):
+        return data["message"]
+    return None
+
+
+def _was_sent(error: Optional[BaseException]) -> bool:
+    import requests
+    import urllib3
+
+    # Only a failed connection attempt guarantees the request never reached the web API
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return False
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", None)
+        return not isinstance(reason, urllib3.exceptions.NewConnectionError)
+    return True
+
+
+class _BodyAborted(Exception):
+    # Raised by _send when the request body itself failed while it was sent, e.g. the validation of a
+    # streamed file. The request was aborted by the client, so it tells nothing about the web API
+    def __init__(self, error: ABS2Exception):
+        super().__init__(error)
+        self.error = error
 
 
 class RestAdapter:
@@ -17,22 +73,71 @@ class RestAdapter:
         ver: str = "v1",
         ssl_verify: bool = True,
         logger: logging.Logger = None,
+        pool_size: int = 10,
+        timeout: Optional[Timeout] = None,
+        scheme: str = "https",
+        hooks: Optional[Iterable[RequestHook]] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        serializer: Optional[JSONSerializer] = None,
     ):
         """
         Constructor for RestAdapter
+        All requests are sent through one persistent session, so TCP / TLS connections to the API are kept alive
+        and reused between calls instead of being re-established for every request.
         :param hostname: URL without "https://"
         :param api_key: (optional) string used for authentication when using POST / DELETE
         :param ver: version number of the API, standard v1
         :param ssl_verify: Normally set to true, can be set to false when facing issues with SSL/TLS cert
         :param logger: (optional) accepts preexisting logger
+        :param pool_size: maximum number of connections kept alive in the connection pool
+        :param timeout: (optional) default timeout in seconds for every request,
+                        either a single value or a (connect, read) tuple. None waits forever
+        :param scheme: (optional) URL scheme, "http" can be used for a local stand-in server
+        :param hooks: (optional) callables receiving a RequestRecord with the measurements of every request,
+                      e.g. a metrics.Metrics. Nothing is measured while there are no hooks
+        :param retry: (optional) RetryPolicy for failed requests, every failure is raised at once if omitted
+        :param breaker: (optional) CircuitBreaker failing requests fast while the web API is not available
+        :param serializer: (optional) JSONSerializer encoding request bodies and decoding responses,
+                           defaults to orjson if it is installed and the json module otherwise
         """
+        # requests is imported on first use, importing abs2 does not load it
+        import requests
+        import requests.adapters
 
         self._logger = logger or logging.getLogger(__name__)
-        self.url = "https://{}/{}/".format(hostname, ver)
+        self.url = "{}://{}/{}/".format(scheme, hostname, ver)
         self._api_key = api_key
         self._ssl_verify = ssl_verify
+        self._timeout = timeout
+        self.hooks: List[RequestHook] = list(hooks or ())
+        self.retry = retry
+        self.breaker = breaker
+        self.serializer = serializer or default_serializer()
         if not ssl_verify:
-            requests.packages.urllib3.disable_warnings()  # type: ignore
+            import urllib3
+
+            urllib3.disable_warnings()
+        self._session = requests.Session()
+        self._session.verify = ssl_verify
+        self._session.headers.update({"Connection": "keep-alive"})
+        pooled_adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self._session.mount("https://", pooled_adapter)
+        self._session.mount("http://", pooled_adapter)
+
+    def close(self) -> None:
+        """
+        Close the underlying session and all pooled connections
+        """
+        self._session.close()
+
+    def __enter__(self) -> "RestAdapter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def _do(
         self,
@@ -41,6 +146,8 @@ class RestAdapter:
         ep_params: Dict = None,
         data: Dict = None,
         additional_headers=None,
+        timeout: Optional[Timeout] = None,
+        body: Union[bytes, IO[bytes]] = None,
     ):
         """
         Generic method to send requests to the API
@@ -49,8 +156,90 @@ class RestAdapter:
         :param ep_params: (optional) Dictionary, list of tuples or bytes to send
         in the query string
         :param data: (optional) A JSON serializable Python object to send in the body
+        :param timeout: (optional) timeout for this request, overrides the default timeout of the adapter
+        :param body: (optional) raw JSON body as bytes or file-like object, sent as is instead of data.
+                     File-like objects are streamed without being loaded into memory, and never retried
         :return:
         """
+        started = time.perf_counter()
+        if body is None and data is not None:
+            # Encoded once for all attempts and sent as is, requests never serializes the data itself
+            body = self.serializer.dumps(data)
+        encode_seconds = time.perf_counter() - started
+        # A streamed body is consumed by the first attempt and cannot be sent again
+        return self._attempts(
+            http_method,
+            endpoint,
+            isinstance(body, (bytes, type(None))),
+            lambda attempt: self._send(
+                http_method,
+                endpoint,
+                ep_params,
+                additional_headers,
+                timeout,
+                body,
+                encode_seconds if attempt == 1 else 0.0,
+                attempt,
+            ),
+        )
+
+    def _attempts(
+        self,
+        http_method: str,
+        endpoint: str,
+        retriable: bool,
+        send: Callable[[int], Response],
+    ) -> Response:
+        # Calls send with the number of the attempt until it succeeds, or the retry policy gives up
+        # The status endpoint is never short-circuited, it tells whether the solver is available again
+        breaker = self.breaker if endpoint else None
+        retry = self.retry if retriable else None
+        attempt = 1
+        while True:
+            if breaker is not None:
+                breaker.before()
+            try:
+                result = send(attempt)
+            except _BodyAborted as e:
+                aborted = e.error
+            except ABS2Exception as e:
+                if breaker is not None:
+                    breaker.record(e.status_code)
+                if retry is None or not retry.should_retry(
+                    http_method, attempt, e.status_code, _was_sent(e.__cause__)
+                ):
+                    raise
+                delay = retry.delay(attempt, e.retry_after)
+                self._logger.warning(
+                    msg=f"method={http_method}, url={self.url + endpoint}, "
+                    f"attempt={attempt} failed ({e}), retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+                attempt += 1
+                continue
+            else:
+                if breaker is not None:
+                    breaker.record(result.status_code)
+                return result
+            # Raised outside of the except clause, so the error is not chained to _BodyAborted
+            if breaker is not None:
+                breaker.release()
+            raise aborted
+
+    def _send(
+        self,
+        http_method: str,
+        endpoint: str,
+        ep_params: Optional[Dict],
+        additional_headers: Optional[Dict],
+        timeout: Optional[Timeout],
+        body: Union[bytes, IO[bytes], None],
+        encode_seconds: float,
+        attempt: int,
+    ) -> Result:
+        # One attempt of _do, encode_seconds is the time it took to encode the body
+        import requests
+
         if additional_headers is None:
             additional_headers = {}
         full_url = self.url + endpoint
@@ -60,29 +249,85 @@ class RestAdapter:
         log_line_post = ", ".join(
             (log_line_pre, "success={}, status_code={}, message={}")
         )
+        instrumented = bool(self.hooks)
+        encoded = time.perf_counter()
+        started = encoded - encode_seconds
         # Log HTTP params and perform an HTTP request, catching and re-raising any exceptions
         try:
             self._logger.debug(msg=log_line_pre)
-            response = requests.request(
+            response = self._session.request(
                 method=http_method,
                 url=full_url,
                 verify=self._ssl_verify,
                 headers=headers,
                 params=ep_params,
-                json=data,
+                data=body,
+                timeout=timeout if timeout is not None else self._timeout,
             )
         except requests.exceptions.RequestException as e:
             self._logger.error(msg=(str(e)))
+            if instrumented:
+                self._notify(
+                    RequestRecord(
+                        http_method,
+                        endpoint_label(endpoint),
+                        None,
+                        time.perf_counter() - started,
+                        request_bytes=_body_size(body),
+                        encode_seconds=encoded - started,
+                        attempt=attempt,
+                    )
+                )
             raise ABS2Exception("Request failed") from e
-        # Deserialize JSON output to Python object, or return failed Result on exception
-        try:
-            data_out = response.json()
-        except (ValueError, JSONDecodeError) as e:
+        except ABS2Exception as e:
+            # Raised by the body while it was read, the request was aborted before it was complete
             self._logger.error(msg=log_line_post.format(False, None, e))
-            raise ABS2Exception("Bad JSON in response") from e
+            if instrumented:
+                self._notify(
+                    RequestRecord(
+                        http_method,
+                        endpoint_label(endpoint),
+                        None,
+                        time.perf_counter() - started,
+                        request_bytes=_body_size(body),
+                        encode_seconds=encoded - started,
+                        attempt=attempt,
+                    )
+                )
+            raise _BodyAborted(e) from None
+        # Deserialize JSON output to Python object, or return failed Result on exception
         # Test for 299 before 200 because response codes > 299 are more common
         # If status_code in 200-299 range, return success Result with data, otherwise raise exception
         is_success = 299 >= response.status_code >= 200  # OK
+        if instrumented:
+            received = time.perf_counter()
+        data_out = None
+        try:
+            data_out = self.serializer.loads(response.content)
+        except ValueError as e:
+            # Error responses without a JSON body, e.g. 102 PROCESSING, are reported by their status code below
+            if is_success:
+                self._logger.error(msg=log_line_post.format(False, None, e))
+                raise ABS2Exception(
+                    "Bad JSON in response", status_code=response.status_code
+                ) from e
+        finally:
+            if instrumented:
+                finished = time.perf_counter()
+                self._notify(
+                    RequestRecord(
+                        http_method,
+                        endpoint_label(endpoint),
+                        response.status_code,
+                        finished - started,
+                        response_seconds=response.elapsed.total_seconds(),
+                        request_bytes=_body_size(body),
+                        response_bytes=len(response.content),
+                        encode_seconds=encoded - started,
+                        decode_seconds=finished - received,
+                        attempt=attempt,
+                    )
+                )
         log_line = log_line_post.format(
             is_success, response.status_code, response.reason
         )
@@ -90,14 +335,147 @@ class RestAdapter:
             self._logger.debug(msg=log_line)
             return Result(response.status_code, message=response.reason, data=data_out)
         self._logger.error(msg=log_line)
-        raise ABS2Exception(f"{response.status_code}: {response.reason}")
+        raise ABS2Exception(
+            f"{response.status_code}: {response.reason}",
+            status_code=response.status_code,
+            retry_after=response.headers.get("Retry-After"),
+            message=_error_message(data_out),
+        )
+
+    def _notify(self, record: RequestRecord) -> None:
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                self._logger.exception(msg="Request hook failed")
+
+    def stream(
+        self,
+        endpoint: str,
+        additional_headers: Dict = None,
+        timeout: Optional[Timeout] = None,
+        chunk_size: int = 1 << 16,
+    ) -> Iterator[bytes]:
+        """
+        GET an endpoint and yield the (decompressed) response body in chunks as they arrive,
+        instead of reading and decoding it as a whole. Errors are raised like by get before the first chunk.
+        The request is sent when the iteration starts, it is retried only until the response headers arrive.
+        :param endpoint: Endpoint of the API on which the GET should be executed
+        :param additional_headers: additional headers for e.g. a bearer token
+        :param timeout: (optional) timeout for this request in seconds, applies to every chunk
+        :param chunk_size: maximum number of bytes per chunk
+        """
+        import requests
+
+        started = time.perf_counter()
+        attempt = 0
+
+        def open_response(number: int) -> "requests.Response":
+            nonlocal attempt
+            attempt = number
+            return self._open(endpoint, additional_headers, timeout, number)
+
+        response = self._attempts("GET", endpoint, True, open_response)
+        received = 0
+        try:
+            for chunk in response.iter_content(chunk_size):
+                received += len(chunk)
+                yield chunk
+        except requests.exceptions.RequestException as e:
+            self._logger.error(msg=(str(e)))
+            raise ABS2Exception("Request failed") from e
+        finally:
+            response.close()
+            if self.hooks:
+                self._notify(
+                    RequestRecord(
+                        "GET",
+                        endpoint_label(endpoint),
+                        response.status_code,
+                        time.perf_counter() - started,
+                        response_seconds=response.elapsed.total_seconds(),
+                        response_bytes=received,
+                        attempt=attempt,
+                    )
+                )
+
+    def _open(
+        self,
+        endpoint: str,
+        additional_headers: Optional[Dict],
+        timeout: Optional[Timeout],
+        attempt: int,
+    ) -> "requests.Response":
+        # One attempt of stream, returns the response once its headers arrived
+        import requests
+
+        full_url = self.url + endpoint
+        headers = {"x-api-key": self._api_key, **(additional_headers or {})}
+        started = time.perf_counter()
+        try:
+            self._logger.debug(msg=f"method=GET, url={full_url}, stream=True")
+            response = self._session.get(
+                full_url,
+                headers=headers,
+                verify=self._ssl_verify,
+                timeout=timeout if timeout is not None else self._timeout,
+                stream=True,
+            )
+        except requests.exceptions.RequestException as e:
+            self._logger.error(msg=(str(e)))
+            if self.hooks:
+                self._notify(
+                    RequestRecord(
+                        "GET",
+                        endpoint_label(endpoint),
+                        None,
+                        time.perf_counter() - started,
+                        attempt=attempt,
+                    )
+                )
+            raise ABS2Exception("Request failed") from e
+        if 299 >= response.status_code >= 200:
+            return response
+        # Error responses are small, reading them as a whole releases the connection
+        response_bytes = len(response.content)
+        if self.hooks:
+            self._notify(
+                RequestRecord(
+                    "GET",
+                    endpoint_label(endpoint),
+                    response.status_code,
+                    time.perf_counter() - started,
+                    response_seconds=response.elapsed.total_seconds(),
+                    response_bytes=response_bytes,
+                    attempt=attempt,
+                )
+            )
+        self._logger.error(
+            msg=f"method=GET, url={full_url}, success=False, "
+            f"status_code={response.status_code}, message={response.reason}"
+        )
+        try:
+            data_out = self.serializer.loads(response.content)
+        except ValueError:
+            data_out = None
+        raise ABS2Exception(
+            f"{response.status_code}: {response.reason}",
+            status_code=response.status_code,
+            retry_after=response.headers.get("Retry-After"),
+            message=_error_message(data_out),
+        )
 
     def get(
-        self, endpoint: str, ep_params: Dict = None, additional_headers: Dict = None
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        additional_headers: Dict = None,
+        timeout: Optional[Timeout] = None,
     ) -> Result:
         """
         Generic GET method for a given Endpoint
         :param additional_headers: additional headers for e.g. a bearer token
+        :param timeout: (optional) timeout for this request in seconds
         :param endpoint: Endpoint of the API on which the GET should be executed
         :param ep_params: (optional) Dictionary, list of tuples or bytes to send
         in the query string
@@ -108,6 +486,7 @@ class RestAdapter:
             endpoint=endpoint,
             ep_params=ep_params,
             additional_headers=additional_headers,
+            timeout=timeout,
         )
 
     def post(
@@ -116,14 +495,18 @@ class RestAdapter:
         ep_params: Dict = None,
         data: Dict = None,
         additional_headers: Dict = None,
+        timeout: Optional[Timeout] = None,
+        body: Union[bytes, IO[bytes]] = None,
     ) -> Result:
         """
         Generic POST method for a given Endpoint
         :param additional_headers: additional headers for e.g. a bearer token
+        :param timeout: (optional) timeout for this request in seconds
         :param endpoint: Endpoint of the API on which the POST should be executed
         :param ep_params: (optional) Dictionary, list of tuples or bytes to send
         in the query string
         :param data: (optional) A JSON serializable Python object to send in the body
+        :param body: (optional) raw JSON body as bytes or file-like object, sent instead of data
         :return:
         """
         return self._do(
@@ -132,6 +515,8 @@ class RestAdapter:
             ep_params=ep_params,
             data=data,
             additional_headers=additional_headers,
+            timeout=timeout,
+            body=body,
         )
 
     def delete(
@@ -140,10 +525,12 @@ class RestAdapter:
         ep_params: Dict = None,
         data: Dict = None,
         additional_headers: Dict = None,
+        timeout: Optional[Timeout] = None,
     ) -> Result:
         """
         Generic DELETE method for a given Endpoint
         :param additional_headers: additional headers for e.g. a bearer token
+        :param timeout: (optional) timeout for this request in seconds
         :param endpoint: Endpoint of the API on which the DELETE should be executed
         :param ep_params: (optional) Dictionary, list of tuples or bytes to send
         in the query string
@@ -156,6 +543,7 @@ class RestAdapter:
             ep_params=ep_params,
             data=data,
             additional_headers=additional_headers,
+            timeout=timeout,
         )
 
     def put(
@@ -164,10 +552,12 @@ class RestAdapter:
         ep_params: Dict = None,
         data: Dict = None,
         additional_headers: Dict = None,
+        timeout: Optional[Timeout] = None,
     ) -> Result:
         """
         Generic PUT method for a given Endpoint
         :param additional_headers: additional headers for e.g. a bearer token
+        :param timeout: (optional) timeout for this request in seconds
         :param endpoint: Endpoint of the API on which the PUT should be executed
         :param ep_params: (optional) Dictionary, list of tuples or bytes to send
         in the query string
@@ -180,4 +570,5 @@ class RestAdapter:
             ep_params=ep_params,
             data=data,
             additional_headers=additional_headers,
+            timeout=timeout,
         )
@@ -0,0 +1,224 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Collection, Optional
+
+from .exceptions import ABS2Exception
+
+# The web API did not process the request: PROCESSING (verification not finished yet),
+# TOO_MANY_REQUESTS and SERVICE_UNAVAILABLE (solver not working). Safe to retry for every method
+REJECTED_STATUSES = (102, 429, 503)
+# The request may have been processed, only idempotent requests are retried
+FAILED_STATUSES = (500, 502, 504)
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before a failed request is sent again: exponential backoff with jitter,
+    or the delay requested by the web API with a Retry-After header.
+    Requests the web API rejected without processing them (102, 429, 503, or a failed connection attempt)
+    are retried for every method. Requests that may have been processed (500, 502, 504, or a connection
+    lost after sending) are only retried for idempotent methods, so a POST never uploads a problem
+    or posts a job twice. Streamed request bodies are never retried.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 4,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: float = 0.2,
+        statuses: Collection[int] = REJECTED_STATUSES + FAILED_STATUSES,
+        idempotent_methods: Collection[str] = IDEMPOTENT_METHODS,
+    ):
+        """
+        :param attempts: maximum number of attempts of one call, including the first
+        :param backoff: delay in seconds before the first retry, doubled for every further retry
+        :param max_backoff: upper bound of the delay, also applied to Retry-After
+        :param jitter: relative random deviation of every delay
+        :param statuses: status codes that are retried
+        :param idempotent_methods: HTTP methods that may be retried after the request was possibly processed
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        status_code: Optional[int] = None,
+        sent: bool = True,
+    ) -> bool:
+        """
+        :param method: HTTP method of the failed request
+        :param attempt: number of attempts made so far
+        :param status_code: status code of the response, None if the request failed without a response
+        :param sent: False if the connection could not be established, i.e. the request was never sent
+        """
+        if attempt >= self.attempts:
+            return False
+        if status_code is None:
+            return not sent or method in self.idempotent_methods
+        if status_code not in self.statuses:
+            return False
+        return status_code in REJECTED_STATUSES or method in self.idempotent_methods
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        :param attempt: number of attempts made so far
+        :param retry_after: (optional) value of the Retry-After header of the response
+        :return: seconds to wait before the next attempt
+        """
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            return min(requested, self.max_backoff)
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait according to a Retry-After header, given in seconds or as HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the QUBO solver is known not to be working, instead of sending requests
+    that can only fail. The circuit opens after `threshold` consecutive failures with one of the `statuses`
+    (or without a response), or when get_status reports the solver inactive. While open, calls raise an
+    ABS2Exception with status code 503 without a request. After `reset_timeout` seconds one call is let through
+    as probe: if it succeeds the circuit closes, otherwise it opens again.
+    get_status is never short-circuited, so it can always be used to check the solver.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        reset_timeout: float = 30.0,
+        statuses: Collection[int] = (502, 503, 504),
+    ):
+        """
+        :param threshold: number of consecutive failures opening the circuit
+        :param reset_timeout: seconds the circuit stays open before a probe call is let through
+        :param statuses: status codes counted as failure of the web API
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.statuses = frozenset(statuses)
+        self.state = self.CLOSED
+        self.failures = 0
+        # Number of calls failed fast and opening of the circuit, for monitoring
+        self.rejected = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._open_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def open_seconds(self) -> float:
+        """
+        Total time the circuit was not closed, including the current period.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return self._open_seconds
+            return self._open_seconds + time.monotonic() - self._opened_at
+
+    def before(self) -> None:
+        """
+        Called before a request, raises an ABS2Exception while the circuit is open.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and (
+                time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                self.state = self.HALF_OPEN
+                return
+            self.rejected += 1
+        raise ABS2Exception(
+            "503: QUBO solver not available (circuit open)", status_code=503
+        )
+
+    def record(self, status_code: Optional[int]) -> None:
+        """
+        Called with the status code of every response, None if the request failed without a response.
+        """
+        if status_code is not None and status_code not in self.statuses:
+            self.close()
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self._open()
+
+    def release(self) -> None:
+        """
+        Called instead of record when a request was aborted by the client before the web API could answer,
+        e.g. because its streamed body was invalid. Counts neither as success nor as failure,
+        a probe call that was let through can be made again by the next call.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def trip(self) -> None:
+        """
+        Open the circuit, e.g. because get_status reported the solver inactive.
+        """
+        with self._lock:
+            self._open()
+
+    def report_status(self, active: bool) -> None:
+        """
+        Called with the result of get_status: the circuit is opened while the solver is inactive
+        and closed as soon as it is active again.
+        """
+        if active:
+            self.close()
+        else:
+            self.trip()
+
+    def close(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                self._open_seconds += time.monotonic() - self._opened_at
+                self.state = self.CLOSED
+            self.failures = 0
+
+    def _open(self) -> None:
+        if self.state == self.CLOSED:
+            self._opened_at = time.monotonic()
+            self.opened += 1
+        elif self.state == self.HALF_OPEN:
+            # Restart the timeout but keep counting the time since the circuit first opened
+            self._open_seconds += time.monotonic() - self._opened_at
+            self._opened_at = time.monotonic()
+        self.state = self.OPEN
@@ -0,0 +1,67 @@
+import json
+from typing import Union
+
+
+def _to_builtin(value):
+    # NumPy arrays and scalars, e.g. the [i, j, value] triples of a QUBOMatrix
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONSerializer:
+    """
+    Serializes request bodies and parses responses with the standard library json module.
+    Subclass it to plug another JSON library into RestAdapter(serializer=...).
+    """
+
+    name = "json"
+    # True if NumPy arrays are serialized natively, without converting them to lists first
+    numpy = False
+
+    def dumps(self, data) -> bytes:
+        """
+        :param data: a JSON serializable Python object, NumPy arrays are converted to lists
+        :return: the UTF-8 encoded JSON
+        """
+        return json.dumps(data, separators=(",", ":"), default=_to_builtin).encode()
+
+    def loads(self, data: Union[bytes, str]):
+        """
+        :param data: UTF-8 encoded JSON
+        :raises ValueError: if data is not valid JSON
+        """
+        return json.loads(data)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """
+    Serializes with orjson (requires orjson), several times faster than json for large QUBO matrices.
+    NumPy arrays are written directly from their buffer.
+    """
+
+    name = "orjson"
+    numpy = True
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._option = orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, data) -> bytes:
+        # Arrays of unsupported dtypes or memory layouts are converted by _to_builtin
+        return self._orjson.dumps(data, default=_to_builtin, option=self._option)
+
+    def loads(self, data: Union[bytes, str]):
+        return self._orjson.loads(data)
+
+
+def default_serializer() -> JSONSerializer:
+    """
+    The fastest available serializer: orjson if it is installed, json otherwise.
+    """
+    try:
+        return OrjsonSerializer()
+    except ImportError:
+        return JSONSerializer()
@@ -0,0 +1,62 @@
+import numpy as np
+
+from .exceptions import ABS2Exception
+
+
+def coo_to_triples(rows, cols, values) -> np.ndarray:
+    """
+    Convert a QUBO matrix in coordinate format into the canonical [i, j, value] triples of the web API.
+    Entries (i, j) and (j, i) describe the same coupling and are merged into the upper triangle (i <= j),
+    duplicates are summed up and zeros are dropped. Values are truncated to integers after merging,
+    like post_pyqubo_matrix does. The result is sorted by (i, j).
+    :param rows: row indices
+    :param cols: column indices
+    :param values: matrix entries
+    :return: array of shape (n, 3) and dtype int64
+    """
+    rows = np.asarray(rows).ravel()
+    cols = np.asarray(cols).ravel()
+    values = np.asarray(values).ravel()
+    if not (len(rows) == len(cols) == len(values)):
+        raise ABS2Exception("rows, cols and values must have the same length")
+    if len(values) == 0:
+        return np.empty((0, 3), dtype=np.int64)
+    rows = rows.astype(np.int64, copy=False)
+    cols = cols.astype(np.int64, copy=False)
+    if rows.min() < 0 or cols.min() < 0:
+        raise ABS2Exception("Indices of a QUBO matrix must not be negative")
+    upper = np.minimum(rows, cols)
+    lower = np.maximum(rows, cols)
+    keys = upper * (int(lower.max()) + 1) + lower
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    merged = np.add.reduceat(values[order], starts)
+    if merged.dtype.kind != "i":
+        merged = np.trunc(merged)
+    merged = merged.astype(np.int64)
+    keep = merged != 0
+    first = order[starts[keep]]
+    return np.stack((upper[first], lower[first], merged[keep]), axis=1)
+
+
+def dense_to_triples(matrix) -> np.ndarray:
+    """
+    Convert a dense square QUBO matrix into [i, j, value] triples, see coo_to_triples.
+    """
+    matrix = np.asarray(matrix)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ABS2Exception("A dense QUBO matrix must be a square 2d array")
+    rows, cols = np.nonzero(matrix)
+    return coo_to_triples(rows, cols, matrix[rows, cols])
+
+
+def triples_to_json(triples: np.ndarray) -> str:
+    """
+    Serialize [i, j, value] triples to the JSON list expected in the "qubo" field.
+    Formatting all integers in one printf-style operation is several times faster than json.dumps of nested lists.
+    """
+    if len(triples) == 0:
+        return "[]"
+    flat = np.asarray(triples, dtype=np.int64).ravel().tolist()
+    return "[" + ",".join(["[%d,%d,%d]"] * len(triples)) % tuple(flat) + "]"
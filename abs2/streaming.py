@@ -0,0 +1,409 @@
+import codecs
+import json
+import os
+import re
+import time
+from operator import itemgetter
+from typing import IO, Callable, Dict, Iterator, List, Optional, Union
+
+from .exceptions import ABS2Exception
+
+# Called with (bytes sent so far, total bytes, bytes per second)
+ProgressCallback = Callable[[int, int, float], None]
+
+_WHITESPACE = re.compile(r"\s*")
+_TRIPLE = r"\[\s*-?\d+\s*,\s*-?\d+\s*,\s*-?\d+\s*\]"
+# Comma separated triples, without a leading or trailing comma
+_TRIPLES = re.compile(rf"{_TRIPLE}(?:\s*,\s*{_TRIPLE})*")
+_ARRAY_END = re.compile(r"\]\s*\]")
+_decoder = json.JSONDecoder()
+# Rest of a buffer that may still belong to a number at its very end, e.g. "1" of "1.5"
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+# Characters between the entries of a solution vector
+_SEPARATORS = str.maketrans("", "", ", \t\r\n")
+
+
+class QUBOStreamValidator:
+    """
+    Incremental validator for QUBO matrix files. Chunks of the file are passed to feed() as they are read,
+    so the file is checked during the upload without ever being held in memory as a whole.
+    The "qubo" entries are checked in bulk per chunk, other members are decoded individually.
+    """
+
+    _OBJECT, _KEY, _COLON, _VALUE, _NEXT, _QUBO, _DONE = range(7)
+    # Member whose array is parsed in bulk by _consume_qubo
+    _ARRAY_KEY = "qubo"
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = self._OBJECT
+        self._key: Optional[str] = None
+        self.members = {}
+        self.nelement = 0
+        self.min_index: Optional[int] = None
+        self.max_index: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Validate the next chunk of the file.
+        :param chunk: the next bytes of the file
+        """
+        self._buffer += self._text.decode(chunk)
+        self._consume(final=False)
+
+    def close(self) -> None:
+        """
+        Validate the end of the file, raises ABS2Exception if the file is incomplete or inconsistent.
+        """
+        self._buffer += self._text.decode(b"", final=True)
+        self._consume(final=True)
+        if self._state != self._DONE:
+            self._fail("unexpected end of file")
+        for key in ("file", "nbit", "base", "qubo"):
+            if key not in self.members:
+                self._fail(f'missing "{key}"')
+        nbit, base = self.members["nbit"], self.members["base"]
+        if not isinstance(nbit, int) or not isinstance(base, int):
+            self._fail('"nbit" and "base" have to be integers')
+        if self.min_index is not None and (
+            self.min_index < base or self.max_index >= base + nbit
+        ):
+            self._fail(f"indices have to be in the range [{base}, {base + nbit})")
+
+    @staticmethod
+    def _fail(reason: str):
+        raise ABS2Exception(f"Invalid QUBO matrix file: {reason}")
+
+    def _skip_whitespace(self) -> str:
+        pos = _WHITESPACE.match(self._buffer).end()
+        self._buffer = self._buffer[pos:]
+        return self._buffer[:1]
+
+    def _decode_value(self, final: bool):
+        try:
+            value, end = _decoder.raw_decode(self._buffer)
+        except json.JSONDecodeError:
+            if final:
+                self._fail("malformed JSON")
+            return None, False
+        # A number at the very end of the buffer might continue in the next chunk
+        if not final and _NUMBER_TAIL.fullmatch(self._buffer, end):
+            return None, False
+        self._buffer = self._buffer[end:]
+        return value, True
+
+    def _consume(self, final: bool) -> None:
+        while True:
+            if self._state == self._QUBO:
+                if not self._consume_qubo(final):
+                    return
+                continue
+            char = self._skip_whitespace()
+            if not char:
+                return
+            if self._state == self._OBJECT:
+                if char != "{":
+                    self._fail("a QUBO matrix has to be a JSON object")
+                self._buffer = self._buffer[1:]
+                self._state = self._KEY
+            elif self._state == self._KEY:
+                if char == "}" and not self.members:
+                    self._buffer = self._buffer[1:]
+                    self._state = self._DONE
+                    continue
+                key, complete = self._decode_value(final)
+                if not complete:
+                    return
+                if not isinstance(key, str):
+                    self._fail("object keys have to be strings")
+                self._key = key
+                self._state = self._COLON
+            elif self._state == self._COLON:
+                if char != ":":
+                    self._fail(f'expected ":" after "{self._key}"')
+                self._buffer = self._buffer[1:]
+                self._state = self._VALUE
+            elif self._state == self._VALUE:
+                if self._key == self._ARRAY_KEY:
+                    if char != "[":
+                        self._fail(f'"{self._ARRAY_KEY}" has to be a list')
+                    self._buffer = self._buffer[1:]
+                    self.members[self._ARRAY_KEY] = None
+                    self._state = self._QUBO
+                    continue
+                value, complete = self._decode_value(final)
+                if not complete:
+                    return
+                self.members[self._key] = value
+                self._state = self._NEXT
+            elif self._state == self._NEXT:
+                self._buffer = self._buffer[1:]
+                if char == ",":
+                    self._state = self._KEY
+                elif char == "}":
+                    self._state = self._DONE
+                else:
+                    self._fail(f'unexpected "{char}"')
+            else:
+                self._fail("unexpected data after the end of the QUBO matrix")
+
+    def _consume_qubo(self, final: bool) -> bool:
+        if self._buffer.lstrip().startswith("]"):
+            end = self._buffer.index("]") + 1
+        else:
+            match = _ARRAY_END.search(self._buffer)
+            end = match.end() if match is not None else None
+        if end is not None:
+            body, self._buffer = self._buffer[: end - 1], self._buffer[end:]
+            self._state = self._NEXT
+        else:
+            cut = self._buffer.rfind("]") + 1
+            if cut == 0:
+                if final:
+                    self._fail('"qubo" is not terminated')
+                return False
+            body, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        self._check_entries(body)
+        return True
+
+    def _check_entries(self, body: str) -> None:
+        body = body.strip()
+        if not body:
+            return
+        # Bodies are cut after a "]", so every body after the first entry starts with the separating comma
+        if self.nelement:
+            if not body.startswith(","):
+                self._fail('missing "," between "qubo" entries')
+            body = body[1:].lstrip()
+        if _TRIPLES.fullmatch(body) is None:
+            self._fail(
+                '"qubo" entries have to be lists of three integers [i, j, value]'
+            )
+        try:
+            entries = json.loads("[" + body + "]")
+        except ValueError:
+            self._fail("malformed JSON")
+        self.nelement += len(entries)
+        low = min(min(map(itemgetter(0), entries)), min(map(itemgetter(1), entries)))
+        high = max(max(map(itemgetter(0), entries)), max(map(itemgetter(1), entries)))
+        self.min_index = low if self.min_index is None else min(self.min_index, low)
+        self.max_index = high if self.max_index is None else max(self.max_index, high)
+
+
+class JSONArrayParser:
+    """
+    Incremental parser for a JSON array received in chunks, e.g. the list of get_all_problems.
+    feed() returns the entries completed by a chunk, so they can be processed while the rest is still arriving.
+    """
+
+    _ARRAY, _FIRST, _VALUE, _NEXT, _DONE = range(5)
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = self._ARRAY
+
+    def feed(self, chunk: bytes) -> List:
+        """
+        :param chunk: the next bytes of the response
+        :return: the entries completed by this chunk
+        """
+        self._buffer += self._text.decode(chunk)
+        return self._consume(final=False)
+
+    def close(self) -> List:
+        """
+        Parse the end of the response, raises ABS2Exception if it is incomplete.
+        :return: the entries completed at the end of the response
+        """
+        self._buffer += self._text.decode(b"", final=True)
+        entries = self._consume(final=True)
+        if self._state != self._DONE:
+            self._fail("unexpected end of the list")
+        return entries
+
+    @staticmethod
+    def _fail(reason: str):
+        raise ABS2Exception(f"Bad JSON in response: {reason}")
+
+    def _consume(self, final: bool) -> List:
+        entries = []
+        buffer, pos = self._buffer, 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if self._state == self._ARRAY:
+                if char != "[":
+                    self._fail("expected a list")
+                pos += 1
+                self._state = self._FIRST
+            elif self._state == self._FIRST and char == "]":
+                pos += 1
+                self._state = self._DONE
+            elif self._state in (self._FIRST, self._VALUE):
+                try:
+                    value, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        self._fail("malformed entry")
+                    break
+                # A number at the very end of the buffer might continue in the next chunk
+                if not final and _NUMBER_TAIL.fullmatch(buffer, end):
+                    break
+                entries.append(value)
+                pos = end
+                self._state = self._NEXT
+            elif self._state == self._NEXT:
+                if char == ",":
+                    self._state = self._VALUE
+                elif char == "]":
+                    self._state = self._DONE
+                else:
+                    self._fail(f'unexpected "{char}"')
+                pos += 1
+            else:
+                self._fail("unexpected data after the end of the list")
+        self._buffer = buffer[pos:]
+        return entries
+
+
+class SolutionParser(QUBOStreamValidator):
+    """
+    Incremental parser for a solution (the response of get_solution) received in chunks.
+    The solution vector is decoded directly into NumPy uint8 arrays (requires NumPy),
+    without ever building the list of ints or holding the whole response as text.
+    """
+
+    _ARRAY_KEY = "solution"
+
+    def __init__(self):
+        import numpy as np
+
+        super().__init__()
+        self._np = np
+        self._parts = []
+        self._entries = 0
+
+    def close(self) -> Dict:
+        """
+        Parse the end of the response, raises ABS2Exception if it is incomplete.
+        :return: the members of the solution, "solution" being a NumPy uint8 array
+        """
+        self._buffer += self._text.decode(b"", final=True)
+        self._consume(final=True)
+        if self._state != self._DONE:
+            self._fail("unexpected end of the solution")
+        if "solution" not in self.members:
+            self._fail('missing "solution"')
+        parts = self._parts
+        solution = parts[0] if len(parts) == 1 else self._np.concatenate(parts)
+        self._parts = []
+        return {**self.members, "solution": solution.astype(self._np.uint8)}
+
+    @staticmethod
+    def _fail(reason: str):
+        raise ABS2Exception(f"Bad JSON in response: {reason}")
+
+    def _consume_qubo(self, final: bool) -> bool:
+        end = self._buffer.find("]")
+        if end >= 0:
+            body, self._buffer = self._buffer[:end], self._buffer[end + 1 :]
+            self._state = self._NEXT
+            # The last entry is not followed by a comma
+            last = 1 if body.strip() else 0
+        else:
+            # Keep the incomplete last entry for the next chunk
+            cut = self._buffer.rfind(",") + 1
+            if cut == 0:
+                if final:
+                    self._fail('"solution" is not terminated')
+                return False
+            body, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            last = 0
+        digits = body.translate(_SEPARATORS)
+        if digits.strip("01") or len(digits) != body.count(",") + last:
+            self._fail('"solution" entries have to be 0 or 1')
+        self._parts.append(
+            self._np.frombuffer(digits.encode("ascii"), dtype=self._np.uint8) - 48
+        )
+        return True
+
+
+class FileUploadStream:
+    """
+    File-like request body that streams a file from disk in chunks instead of loading it into memory.
+    It reports the upload progress and optionally validates the content while it is being sent.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, IO[bytes]],
+        chunk_size: int = 1 << 20,
+        progress: Optional[ProgressCallback] = None,
+        validator: Optional[QUBOStreamValidator] = None,
+    ):
+        """
+        :param source: the file to upload, either its name or a binary file object that is closed with the stream
+        :param chunk_size: maximum number of bytes read from disk at once and interval for progress reports
+        :param progress: (optional) called with (bytes sent, total bytes, bytes per second)
+        :param validator: (optional) validator that is fed every chunk before it is sent
+        """
+        self._file = open(source, "rb") if isinstance(source, str) else source
+        start = self._file.tell()
+        self._size = self._file.seek(0, os.SEEK_END) - start
+        self._file.seek(start)
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self._validator = validator
+        self._sent = 0
+        self._reported = 0
+        self._validated = False
+        self._start: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        if self._start is None:
+            self._start = time.perf_counter()
+        if size is None or size < 0:
+            size = self._chunk_size
+        chunk = self._file.read(min(size, self._chunk_size))
+        if self._validator is not None and not self._validated:
+            if chunk:
+                self._validator.feed(chunk)
+            # The end of the file is validated before its last chunk is returned,
+            # so the body of an invalid file is never completed
+            if not chunk or self._sent + len(chunk) >= self._size:
+                self._validator.close()
+                self._validated = True
+        self._sent += len(chunk)
+        if self._progress is not None and (
+            self._sent - self._reported >= self._chunk_size
+            or self._reported < self._sent == self._size
+        ):
+            self._reported = self._sent
+            elapsed = time.perf_counter() - self._start
+            self._progress(
+                self._sent, self._size, self._sent / elapsed if elapsed else 0.0
+            )
+        return chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "FileUploadStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from .abs2_api import ABS2API
+from .auth import ABS2Session
+from .exceptions import ABS2Exception
+from .models import SolutionInformation
+
+SolutionCallback = Callable[[SolutionInformation], None]
+
+
+class _TrackedJob:
+    def __init__(self, on_update: Optional[SolutionCallback]):
+        self.on_update = on_update
+        self.future: Future = Future()
+        self.snapshot: Optional[Tuple] = None
+        self.seen = False
+        self.queued = False
+        self.tracked = time.monotonic()
+        self.fetched = self.tracked
+
+
+class JobTracker:
+    """
+    Watches many jobs at once with two list requests per polling cycle (get_all_jobs and get_all_solutions),
+    regardless of the number of jobs. The full solution of a job is only fetched when the size or modification
+    time of its solution file changed since the previous cycle, when the job left the queue, or after refresh
+    seconds without a fetch, in case a change of the solution file is not visible in the listing.
+    Every tracked job has a concurrent.futures.Future that resolves with the final SolutionInformation.
+    """
+
+    def __init__(
+        self,
+        api: Union[ABS2API, ABS2Session],
+        token: Optional[str] = None,
+        interval: float = 5.0,
+        logger: logging.Logger = None,
+        grace: float = 60.0,
+        refresh: float = 60.0,
+    ):
+        """
+        :param api: the ABS2API used for all requests, or an ABS2Session, which supplies the token
+                    and retrieves a new one when it expires during long runs
+        :param token: the bearer token of the user, omitted with an ABS2Session
+        :param interval: seconds between two polling cycles of the background thread
+        :param logger: (optional) accepts preexisting logger
+        :param grace: seconds a tracked job may be missing from both listings before its future fails,
+                      e.g. because of a typo in its name or because it was deleted before it was first seen
+        :param refresh: seconds after which the solution of a running job is fetched even if its listing
+                        did not change
+        """
+        self._api = api
+        self._token = token
+        self.interval = interval
+        self.grace = grace
+        self.refresh = refresh
+        self._logger = logger or logging.getLogger(__name__)
+        self._jobs: Dict[str, _TrackedJob] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, job: str, on_update: Optional[SolutionCallback] = None) -> Future:
+        """
+        Start tracking a job.
+        :param job: the name of the job, equal to the file name of its solution file
+        :param on_update: (optional) called with every new intermediate and the final solution of the job
+        :return: Future resolving with the final SolutionInformation, or with an ABS2Exception if the job
+                 disappears from the web API before terminating or is not listed within the grace period.
+                 Cancelling it stops tracking the job.
+        """
+        with self._lock:
+            if job not in self._jobs:
+                self._jobs[job] = _TrackedJob(on_update)
+            return self._jobs[job].future
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of tracked jobs that have not terminated yet.
+        """
+        with self._lock:
+            return len(self._jobs)
+
+    def _call(self, name: str, *args):
+        method = getattr(self._api, name)
+        return method(*args) if self._token is None else method(self._token, *args)
+
+    @staticmethod
+    def _listing(result) -> Dict[str, Tuple]:
+        return {
+            entry["file"]: (entry.get("bytes"), entry.get("time"))
+            for entry in result.data or []
+        }
+
+    def poll(self) -> int:
+        """
+        Run one polling cycle.
+        :return: the number of solutions fetched in this cycle
+        """
+        with self._lock:
+            tracked = {
+                name: job
+                for name, job in self._jobs.items()
+                if not job.future.cancelled()
+            }
+            self._jobs = dict(tracked)
+        if not tracked:
+            return 0
+        # Jobs are listed before solutions, so a job moving from the queue to the solver in between
+        # shows up in both listings instead of in none
+        queued = self._listing(self._call("get_all_jobs"))
+        solutions = self._listing(self._call("get_all_solutions"))
+        fetched = 0
+        now = time.monotonic()
+        for name, job in tracked.items():
+            snapshot = solutions.get(name)
+            left_queue = job.queued and name not in queued
+            job.queued = name in queued
+            if snapshot is None:
+                if name in queued:
+                    job.seen = True
+                elif job.seen:
+                    self._finish(
+                        name, exception=ABS2Exception(f"Job {name} disappeared")
+                    )
+                elif now - job.tracked >= self.grace:
+                    self._finish(
+                        name,
+                        exception=ABS2Exception(
+                            f"Job {name} not found", status_code=404
+                        ),
+                    )
+                continue
+            job.seen = True
+            if (
+                snapshot == job.snapshot
+                and not left_queue
+                and now - job.fetched < self.refresh
+            ):
+                continue
+            try:
+                solution = self._call("get_solution", name)
+            except ABS2Exception as e:
+                if e.status_code == 404:
+                    continue
+                raise
+            fetched += 1
+            job.snapshot = snapshot
+            job.fetched = now
+            if job.on_update is not None:
+                try:
+                    job.on_update(solution)
+                except Exception:
+                    self._logger.exception(msg=f"Callback for job {name} failed")
+            if solution.terminated:
+                self._finish(name, result=solution)
+        return fetched
+
+    def _finish(self, name: str, result=None, exception=None) -> None:
+        with self._lock:
+            job = self._jobs.pop(name, None)
+        if job is None or job.future.done():
+            return
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
+
+    def run(self, timeout: Optional[float] = None) -> None:
+        """
+        Poll in the calling thread until all tracked jobs terminated.
+        :param timeout: (optional) raise an ABS2Exception if jobs are still pending after this many seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.poll()
+        while self.pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise ABS2Exception(f"{self.pending} jobs still pending")
+            time.sleep(self.interval)
+            self.poll()
+
+    def start(self) -> "JobTracker":
+        """
+        Poll in a background thread until stop() is called.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except ABS2Exception as e:
+                self._logger.warning(msg=f"Polling jobs failed: {e}")
+            except Exception:
+                # The thread keeps polling, e.g. after an unexpected response
+                self._logger.exception(msg="Polling jobs failed")
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, pending futures stay unresolved.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "JobTracker":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
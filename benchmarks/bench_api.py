@@ -0,0 +1,99 @@
+"""
+Measure requests/second, p50/p99 latency and peak memory of the upload, poll and decode paths of ABS2API,
+the latter also with the streamed response parsing of get_solution(stream=True).
+
+Runs against the in-process FakeABS2Server, so no network access or credentials are needed.
+Every path is run twice, once for timing and once under tracemalloc for the peak memory.
+
+    python -m benchmarks.bench_api [--requests 200] [--threads 1] [--nelement 100000] [--nbit 65536]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from abs2 import ABS2API
+from abs2.fake_server import FakeABS2Server
+from abs2.models import QUBOMatrix
+
+from .bench_upload import write_matrix
+
+
+def run(call: Callable[[], object], requests: int, threads: int) -> List[float]:
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(timed, range(requests)))
+
+
+def report(name: str, call: Callable[[], object], requests: int, threads: int):
+    start = time.perf_counter()
+    latencies = sorted(run(call, requests, threads))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run(call, max(1, requests // 10), threads)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{name:>8} {requests / elapsed:>10.1f} {p50:>9.2f} {p99:>9.2f} {peak:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--nelement", type=int, default=10**5)
+    parser.add_argument("--nbit", type=int, default=65536)
+    args = parser.parse_args()
+
+    with FakeABS2Server(time_scale=0.0, seed=1) as server, ABS2API(
+        server.hostname, scheme="http", pool_size=args.threads
+    ) as api, tempfile.TemporaryDirectory() as directory:
+        user = server.add_user("bench")
+        token = api.retrieve_access_token(user.username, user.password).access_token
+
+        filename = os.path.join(directory, "bench.json")
+        write_matrix(filename, args.nelement)
+        # A sparse matrix with nbit variables, its solution vector is decoded
+        entries = [
+            [k, (k + 1) % args.nbit, random.randint(-9, 9)] for k in range(args.nbit)
+        ]
+        api.post_matrix(token, QUBOMatrix("decode.json", args.nbit, 0, entries))
+        job = api.post_job(token, "decode.json", 1).job
+
+        print(f"{'path':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+        report(
+            "upload",
+            lambda: api.post_qubo_matrix(token, filename, stream=True),
+            max(1, args.requests // 20),
+            args.threads,
+        )
+        report(
+            "poll", lambda: api.get_all_solutions(token), args.requests, args.threads
+        )
+        report(
+            "decode",
+            lambda: api.get_solution(token, job).solution,
+            max(1, args.requests // 10),
+            args.threads,
+        )
+        report(
+            "stream",
+            lambda: api.get_solution(token, job, stream=True).solution_array,
+            max(1, args.requests // 10),
+            args.threads,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure the import time of the abs2 package with python -X importtime, in fresh interpreters.
+
+Reports the cumulative import time of abs2 for typical entry points and the heavy third-party
+modules they load. With --max-ms the script exits with status 1 if "import abs2" takes longer,
+so it can guard the lazy imports in CI.
+
+    python -m benchmarks.bench_import [--repeat 5] [--max-ms 20]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+STATEMENTS = (
+    "import abs2",
+    "from abs2 import models",
+    "from abs2 import ABS2API",
+    "from abs2 import ABS2API; ABS2API()",
+)
+HEAVY = ("requests", "urllib3", "numpy", "aiohttp")
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """
+    Cumulative import time in microseconds of every module imported by the statement,
+    nested imports are included in the time of the module importing them.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    return {
+        module: int(cumulative) if not indent else 0
+        for cumulative, indent, module in _LINE.findall(output)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    # Modules the interpreter imports at startup, e.g. site, are not counted
+    startup = set(import_times("pass"))
+    print(f"{'statement':<38} {'ms':>7}  heavy modules loaded")
+    medians: List[float] = []
+    for statement in STATEMENTS:
+        runs = [import_times(statement) for _ in range(args.repeat)]
+        totals = [
+            sum(time for module, time in times.items() if module not in startup) / 1000
+            for times in runs
+        ]
+        heavy = [module for module in HEAVY if module in runs[0]]
+        medians.append(statistics.median(totals))
+        print(f"{statement:<38} {medians[-1]:>7.1f}  {', '.join(heavy) or '-'}")
+    if args.max_ms is not None and medians[0] > args.max_ms:
+        print(f"import abs2 took {medians[0]:.1f} ms, more than {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Measure the memory held by job and solution records, as kept in memory for analytics of many runs.
+
+Builds the models from decoded JSON payloads like those of get_job_information / get_solution and
+compares them with the plain __dict__ classes the models used to be, which kept every solution as
+list of ints and the nested parameters as dict.
+
+    python -m benchmarks.bench_models [--records 10000] [--nbit 1024]
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from typing import Callable, Dict
+
+from abs2.models import JobInformation, SolutionInformation
+
+
+class LegacyJobInformation:
+    def __init__(self, job, problem, nbit, minval, maxval, parameters):
+        self.job = str(job)
+        self.problem = str(problem)
+        self.nbit = int(nbit)
+        self.minval = int(minval)
+        self.maxval = int(maxval)
+        self.parameters = parameters
+
+
+class LegacySolutionInformation:
+    def __init__(
+        self,
+        terminated,
+        problem,
+        job,
+        energy,
+        tts,
+        solution,
+        parameters,
+        success=None,
+        kernel_time=None,
+    ):
+        self.terminated = bool(terminated)
+        self.problem = str(problem)
+        self.job = str(job)
+        self.energy = int(energy)
+        self.tts = float(tts)
+        self.solution = solution
+        self.parameters = parameters
+        if success is not None:
+            self.success = bool(success)
+        if kernel_time is not None:
+            self.kernel_time = float(kernel_time)
+
+
+def solution_payload(nbit: int) -> str:
+    return json.dumps(
+        {
+            "terminated": True,
+            "problem": "problem.json",
+            "job": "problem_0001.json",
+            "energy": -100,
+            "tts": 1.5,
+            "solution": [random.randint(0, 1) for _ in range(nbit)],
+            "parameters": {
+                "time_limit": 10,
+                "target_energy": -100,
+                "bfactor": 1.0,
+                "factor": 1.0,
+                "nsolpool": 64,
+                "ngpu": 1,
+                "nisland_per_gpu": 1,
+                "nisland": 1,
+                "value_bits": 16,
+                "arithmetic_bits": 32,
+            },
+            "success": True,
+            "kernel_time": 9.9,
+        }
+    )
+
+
+def job_payload() -> str:
+    return json.dumps(
+        {
+            "job": "problem_0001.json",
+            "problem": "problem.json",
+            "nbit": 1024,
+            "minval": -9,
+            "maxval": 9,
+            "parameters": {"problem": "problem.json", "time_limit": 10},
+        }
+    )
+
+
+def measure(build: Callable[[Dict], object], payload: str, records: int) -> float:
+    """
+    Bytes per record held after decoding the payloads and building the models,
+    the decoded JSON being released like the Result of a request.
+    """
+    gc.collect()
+    tracemalloc.start()
+    models = [build(json.loads(payload)) for _ in range(records)]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held / len(models)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--nbit", type=int, default=1024)
+    args = parser.parse_args()
+
+    print(f"{'record':>10} {'legacy B':>10} {'slots B':>10} {'saved':>7}")
+    for name, payload, legacy, model in (
+        ("job", job_payload(), LegacyJobInformation, JobInformation),
+        (
+            "solution",
+            solution_payload(args.nbit),
+            LegacySolutionInformation,
+            SolutionInformation,
+        ),
+    ):
+        before = measure(lambda data: legacy(**data), payload, args.records)
+        after = measure(lambda data: model(**data), payload, args.records)
+        print(f"{name:>10} {before:>10.0f} {after:>10.0f} {1 - after / before:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the time to serialize QUBO matrix upload payloads of increasing size with every JSON backend.
+
+Each payload is serialized from a list of [i, j, value] entries (post_pyqubo_matrix / QUBOMatrix of lists)
+and, with NumPy installed, from a NumPy array of triples (post_matrix / post_sparse_qubo).
+
+    python -m benchmarks.bench_serializers [--sizes 1000 10000 100000 1000000] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from abs2.models import QUBOMatrix
+from abs2.serializers import JSONSerializer, OrjsonSerializer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def best_of(repeat: int, call: Callable[[], bytes]) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def serializers() -> List[JSONSerializer]:
+    found = [JSONSerializer()]
+    try:
+        found.append(OrjsonSerializer())
+    except ImportError:
+        print("orjson is not installed, only the json module is measured")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = serializers()
+    print(f"{'elements':>10} {'payload':>8} {'backend':>8} {'ms':>9} {'MB/s':>8}")
+    for size in args.sizes:
+        entries = [
+            [random.randrange(size), random.randrange(size), random.randint(-99, 99)]
+            for _ in range(size)
+        ]
+        payloads = [("list", QUBOMatrix("bench.json", size, 0, entries))]
+        if np is not None:
+            triples = np.array(entries, dtype=np.int64)
+            payloads.append(("numpy", QUBOMatrix("bench.json", size, 0, triples)))
+        for payload, matrix in payloads:
+            for serializer in backends:
+                seconds = best_of(args.repeat, lambda: matrix.to_bytes(serializer))
+                megabytes = len(matrix.to_bytes(serializer)) / 2**20
+                print(
+                    f"{size:>10} {payload:>8} {serializer.name:>8} "
+                    f"{seconds * 1000:>9.1f} {megabytes / seconds:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare requests/second of one-shot requests against the pooled RestAdapter session.
+
+Starts a local HTTP/1.1 stand-in for the status endpoint of the ABS2 web API and
+polls it sequentially, once with a fresh connection per request (the behaviour
+before RestAdapter owned a session) and once through the keep-alive session.
+
+    python -m benchmarks.bench_session [--requests 2000]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from abs2.rest_adapter import RestAdapter
+
+BODY = json.dumps({"message": "QUBO solver is working", "active": True}).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+def one_shot(url: str, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        requests.request("GET", url).json()
+    return n / (time.perf_counter() - start)
+
+
+def pooled(hostname: str, n: int) -> float:
+    with RestAdapter(hostname, scheme="http") as adapter:
+        start = time.perf_counter()
+        for _ in range(n):
+            adapter.get("")
+        return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    hostname = "127.0.0.1:{}".format(server.server_address[1])
+    try:
+        before = one_shot(f"http://{hostname}/v1/", args.requests)
+        after = pooled(hostname, args.requests)
+    finally:
+        server.shutdown()
+    print(f"one connection per request: {before:8.1f} req/s")
+    print(f"pooled keep-alive session:  {after:8.1f} req/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare serialization of a QUBO matrix through the pyqubo dict path and the vectorized NumPy path.
+
+Both paths produce the JSON body uploaded by post_pyqubo_matrix and post_sparse_qubo respectively.
+
+    python -m benchmarks.bench_sparse [--sizes 100000 1000000 10000000]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from abs2.abs2_api import prepare_pyqubo_matrix
+from abs2.models import QUBOMatrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**5, 10**6])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'entries':>10} {'dict s':>8} {'numpy s':>8} {'speedup':>8}")
+    for nelement in args.sizes:
+        nbit = max(32, int(nelement**0.5) * 4)
+        rows = rng.integers(0, nbit, nelement)
+        cols = rng.integers(0, nbit, nelement)
+        values = rng.integers(-100, 100, nelement)
+        qubo = {
+            (f"x{i}", f"x{j}"): float(v)
+            for i, j, v in zip(rows.tolist(), cols.tolist(), values.tolist())
+        }
+
+        start = time.perf_counter()
+        matrix, _ = prepare_pyqubo_matrix(qubo, "bench.json")
+        json.dumps(matrix).encode()
+        dict_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        QUBOMatrix.from_coo(rows, cols, values, "bench.json").to_json().encode()
+        numpy_time = time.perf_counter() - start
+
+        print(
+            f"{nelement:>10} {dict_time:>8.2f} {numpy_time:>8.2f} "
+            f"{dict_time / numpy_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare peak memory and throughput of post_qubo_matrix with and without streaming.
+
+Generates QUBO matrix files of increasing size and uploads them to a local stand-in
+server that discards the body, measuring the peak traced Python memory of the client.
+
+    python -m benchmarks.bench_upload [--sizes 100000 1000000]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+from abs2 import ABS2API
+
+UPLOADED = json.dumps({"message": "uploaded", "file": "bench.json", "uri_problem": ""})
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+        body = UPLOADED.encode()
+        self.send_response(202)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def write_matrix(filename: str, nelement: int) -> None:
+    nbit = max(32, int(nelement**0.5) * 2)
+    with open(filename, "w") as f:
+        f.write('{"file": "bench.json", "nbit": %d, "base": 0, "qubo": [' % nbit)
+        f.write(
+            ",".join(
+                "[%d,%d,%d]"
+                % (
+                    random.randrange(nbit),
+                    random.randrange(nbit),
+                    random.randint(-99, 99),
+                )
+                for _ in range(nelement)
+            )
+        )
+        f.write("]}")
+
+
+def measure(upload) -> Tuple[float, float]:
+    # Time and memory are measured in separate runs, tracing slows down allocations considerably
+    start = time.perf_counter()
+    upload()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    upload()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**4, 10**5, 10**6])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    hostname = "127.0.0.1:{}".format(server.server_address[1])
+    print(
+        f"{'entries':>10} {'MB':>8} {'mode':>16} {'seconds':>8} {'MB/s':>8} {'peak MB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as directory, ABS2API(
+        hostname, scheme="http"
+    ) as api:
+        for nelement in args.sizes:
+            filename = os.path.join(directory, "bench.json")
+            write_matrix(filename, nelement)
+            size = os.path.getsize(filename) / 2**20
+            modes = {
+                "json.load": lambda: api.post_qubo_matrix("token", filename),
+                "stream": lambda: api.post_qubo_matrix("token", filename, stream=True),
+                "stream+validate": lambda: api.post_qubo_matrix(
+                    "token", filename, stream=True, validate=True
+                ),
+            }
+            for mode, upload in modes.items():
+                elapsed, peak = measure(upload)
+                print(
+                    f"{nelement:>10} {size:>8.1f} {mode:>16} {elapsed:>8.2f} "
+                    f"{size / elapsed:>8.1f} {peak:>8.1f}"
+                )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import asyncio
+import gzip
+import os
+import tempfile
+import threading
+import time
+from unittest import IsolatedAsyncioTestCase, skipUnless
+
+from abs2 import ABS2Exception, models
+from abs2.dedup import UploadIndex
+from abs2.fake_server import FakeABS2Server
+
+from .test_session import STATUS
+from .test_streaming import TEST_FILE
+
+try:
+    from abs2.async_abs2_api import AsyncABS2API
+except ImportError:
+    AsyncABS2API = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SOLUTION = {
+    "terminated": True,
+    "problem": "testQUBO2.json",
+    "job": "testQUBO2_0001.json",
+    "energy": -4,
+    "tts": 0.1,
+    "solution": [1, 0, 1, 0],
+    "parameters": {},
+}
+
+
+@skipUnless(AsyncABS2API, "aiohttp is not installed")
+class AsyncApiTests(IsolatedAsyncioTestCase):
+    async def testSameModels(self):
+        with FakeABS2Server(
+            routes={
+                ("GET", "/v1/"): lambda h: (200, STATUS),
+                ("GET", "/v1/solutions/testQUBO2_0001.json"): lambda h: (200, SOLUTION),
+            }
+        ) as server:
+            async with AsyncABS2API(server.hostname, scheme="http") as api:
+                status, solution = await asyncio.gather(
+                    api.get_status(), api.get_solution("token", "testQUBO2_0001.json")
+                )
+        self.assertIsInstance(status, models.StatusInformation)
+        self.assertIsInstance(solution, models.SolutionInformation)
+        self.assertEqual(solution.solution, [1, 0, 1, 0])
+
+    async def testConcurrencyLimit(self):
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def slow(handler):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return 200, STATUS
+
+        with FakeABS2Server(routes={("GET", "/v1/"): slow}) as server:
+            async with AsyncABS2API(
+                server.hostname, scheme="http", concurrency=3
+            ) as api:
+                results = await asyncio.gather(*(api.get_status() for _ in range(12)))
+        self.assertEqual(len(results), 12)
+        self.assertLessEqual(in_flight[1], 3)
+
+    async def testErrorStatus(self):
+        with FakeABS2Server() as server:
+            async with AsyncABS2API(server.hostname, scheme="http") as api:
+                with self.assertRaises(ABS2Exception):
+                    await api.get_job_information("token", "missing.json")
+
+    async def testWaitForSolution(self):
+        responses = [
+            (404, {"message": "not found"}),
+            (200, {**SOLUTION, "terminated": False, "energy": -2}),
+            (200, SOLUTION),
+        ]
+        with FakeABS2Server(
+            routes={
+                ("GET", "/v1/"): lambda h: (200, STATUS),
+                ("GET", "/v1/solutions/testQUBO2_0001.json"): lambda h: responses.pop(
+                    0
+                ),
+            }
+        ) as server:
+            async with AsyncABS2API(server.hostname, scheme="http") as api:
+                energies = [
+                    solution.energy
+                    async for solution in api.iter_solutions(
+                        "token", "testQUBO2_0001.json", poll_interval=0.001
+                    )
+                ]
+        self.assertEqual(energies, [-2, -4])
+
+    async def testStreamedUploads(self):
+        with tempfile.TemporaryDirectory() as directory:
+            packed = os.path.join(directory, "matrix.json.gz")
+            with open(TEST_FILE, "rb") as source, gzip.open(packed, "wb") as target:
+                target.write(source.read())
+            malformed = os.path.join(directory, "malformed.json")
+            with open(malformed, "w") as f:
+                f.write('{"file": "bad.json", "nbit": 32, "base": 0, "qubo": [[0, 1]]}')
+            # Only detectable at the end of the file
+            out_of_range = os.path.join(directory, "out_of_range.json")
+            with open(out_of_range, "w") as f:
+                f.write(
+                    '{"file": "bad.json", "nbit": 32, "base": 0, "qubo": [[0, 40, 1]]}'
+                )
+            with FakeABS2Server() as server:
+                user = server.add_user()
+                async with AsyncABS2API(server.hostname, scheme="http") as api:
+                    token = (
+                        await api.retrieve_access_token(user.username, user.password)
+                    ).access_token
+                    progress = []
+                    uploads = await asyncio.gather(
+                        api.post_qubo_matrix(token, TEST_FILE),
+                        api.post_qubo_matrix(
+                            token,
+                            TEST_FILE,
+                            stream=True,
+                            validate=True,
+                            chunk_size=64,
+                            progress=lambda *p: progress.append(p),
+                        ),
+                        api.post_qubo_matrix(token, packed, compression="deflate"),
+                        api.post_qubo_matrix(token, packed, compression="gzip"),
+                    )
+                    for filename in (malformed, out_of_range):
+                        with self.assertRaisesRegex(
+                            ABS2Exception, "Invalid QUBO matrix file"
+                        ):
+                            await api.post_qubo_matrix(
+                                token,
+                                filename,
+                                stream=True,
+                                validate=True,
+                                chunk_size=8,
+                            )
+                    problems = (await api.get_all_problems(token)).data
+        self.assertEqual([problem["file"] for problem in problems], ["testQUBO2.json"])
+        self.assertEqual({upload.file for upload in uploads}, {"testQUBO2.json"})
+        self.assertEqual(progress[-1][:2], (os.path.getsize(TEST_FILE),) * 2)
+
+    async def testMirrorsSyncWorkflow(self):
+        matrix = models.QUBOMatrix("small.json", 32, 0, [[0, 0, -1], [0, 1, 2]])
+        with FakeABS2Server(time_scale=0.01, seed=1) as server:
+            user = server.add_user()
+            async with AsyncABS2API(
+                server.hostname, scheme="http", upload_index=UploadIndex()
+            ) as api:
+                token = (
+                    await api.retrieve_access_token(user.username, user.password)
+                ).access_token
+                await api.post_matrix(token, matrix, compression="gzip")
+                again = await api.post_matrix(token, matrix)
+                self.assertEqual(again.message, "QUBO matrix already uploaded")
+                information = await api.wait_until_verified(
+                    token, "small.json", poll_interval=0.01
+                )
+                self.assertTrue(information.verify)
+                jobs = await api.submit_when_verified(
+                    token, [matrix, TEST_FILE], 1, poll_interval=0.01
+                )
+                self.assertEqual(
+                    [problem["file"] async for problem in api.iter_all_problems(token)],
+                    ["small.json", "testQUBO2.json"],
+                )
+                await api.wait_for_solution(
+                    token, jobs[1].job, poll_interval=0.01, timeout=5
+                )
+                solutions = [
+                    entry["file"] async for entry in api.iter_all_solutions(token)
+                ]
+                self.assertIn(jobs[1].job, solutions)
+                solution = await api.get_solution(
+                    token,
+                    jobs[1].job,
+                    verify=np is not None,
+                    problem=TEST_FILE,
+                    stream=np is not None,
+                )
+        self.assertTrue(solution.terminated)
@@ -0,0 +1,75 @@
+import threading
+from unittest import TestCase
+
+from abs2 import ABS2Exception, models
+from abs2.auth import ABS2Session
+from abs2.fake_server import FakeABS2Server
+
+from .test_session import STATUS
+
+
+class TokenServer:
+    """
+    Issues numbered tokens and accepts only the most recent one.
+    """
+
+    def __init__(self):
+        self.issued = 0
+        self.lock = threading.Lock()
+
+    def token(self, handler):
+        body = handler.read_json()
+        if body["password"] != "secret":
+            return 401, {"message": "wrong password"}
+        with self.lock:
+            self.issued += 1
+            return 200, {"message": "ok", "access_token": f"token{self.issued}"}
+
+    def jobs(self, handler):
+        if handler.headers["Authorization"] != f"Bearer token{self.issued}":
+            return 401, {"message": "token expired"}
+        return 200, []
+
+    def routes(self):
+        return {
+            ("GET", "/v1/"): lambda h: (200, STATUS),
+            ("POST", "/v1/token"): self.token,
+            ("GET", "/v1/jobs"): self.jobs,
+        }
+
+
+class AuthenticatedSessionTests(TestCase):
+    def testTokenIsCachedAndRefreshedOnce(self):
+        tokens = TokenServer()
+        with FakeABS2Server(routes=tokens.routes()) as server:
+            user = models.UserNP("user", "secret")
+            with ABS2Session(user, hostname=server.hostname, scheme="http") as session:
+                self.assertTrue(session.get_status().active)
+                self.assertEqual(session.get_all_jobs().status_code, 200)
+                self.assertEqual(session.get_all_jobs().status_code, 200)
+                self.assertEqual(tokens.issued, 1)
+
+                # The token expires, all threads fail at once but only one logs in again
+                tokens.issued += 1
+                results = []
+                threads = [
+                    threading.Thread(
+                        target=lambda: results.append(session.get_all_jobs())
+                    )
+                    for _ in range(8)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertEqual(len(results), 8)
+                self.assertEqual(tokens.issued, 3)
+                self.assertEqual(session.token, "token3")
+
+    def testWrongPassword(self):
+        with FakeABS2Server(routes=TokenServer().routes()) as server:
+            user = models.UserNP("user", "wrong")
+            with ABS2Session(user, hostname=server.hostname, scheme="http") as session:
+                with self.assertRaises(ABS2Exception) as cm:
+                    session.get_all_jobs()
+                self.assertEqual(cm.exception.status_code, 401)
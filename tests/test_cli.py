@@ -0,0 +1,143 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import TestCase
+
+from abs2.cli import collect_files, main
+from abs2.fake_server import FakeABS2Server
+
+
+def matrix(name: str, weight: int) -> dict:
+    return {"file": name, "nbit": 32, "base": 0, "qubo": [[0, 0, weight], [0, 1, -2]]}
+
+
+class CLITests(TestCase):
+    def setUp(self) -> None:
+        self.server = FakeABS2Server(time_scale=0.01, seed=1).start()
+        self.user = self.server.add_user("user")
+        self.directory = tempfile.TemporaryDirectory()
+        self.problems = os.path.join(self.directory.name, "problems")
+        os.mkdir(self.problems)
+        for index in range(3):
+            with open(os.path.join(self.problems, f"p{index}.json"), "w") as f:
+                json.dump(matrix(f"p{index}.json", -index - 1), f)
+        with gzip.open(os.path.join(self.problems, "p3.json.gz"), "wt") as f:
+            json.dump(matrix("p3.json", -4), f)
+        with open(os.path.join(self.problems, "notes.txt"), "w") as f:
+            f.write("not a matrix")
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.directory.cleanup()
+
+    def abs2(self, *argv: str):
+        out, err = io.StringIO(), io.StringIO()
+        options = ["--scheme", "http", "--host", self.server.hostname]
+        options += [
+            f"--username={self.user.username}",
+            f"--password={self.user.password}",
+        ]
+        with redirect_stdout(out), redirect_stderr(err):
+            status = main(options + list(argv))
+        return status, out.getvalue(), err.getvalue()
+
+    def testCollectFiles(self):
+        files = collect_files([self.problems])
+        self.assertEqual(
+            [os.path.basename(f) for f in files],
+            ["p0.json", "p1.json", "p2.json", "p3.json.gz"],
+        )
+        with self.assertRaises(Exception):
+            collect_files([os.path.join(self.problems, "missing.json")])
+
+    def testStatus(self):
+        status, out, _ = self.abs2("status")
+        self.assertEqual(status, 0)
+        self.assertIn("jobs in queue", out)
+
+    def testUpload(self):
+        status, out, _ = self.abs2("--workers", "2", "upload", self.problems)
+        self.assertEqual(status, 0)
+        self.assertEqual(out.count("verified, nbit=32"), 4)
+        self.assertIn("4 problems in", out)
+        self.assertIn("POST problems", out)
+
+    def testRunAndDownload(self):
+        output = os.path.join(self.directory.name, "solutions")
+        status, out, _ = self.abs2(
+            "run",
+            self.problems,
+            "--time-limit",
+            "1",
+            "--interval",
+            "0.01",
+            "--output",
+            output,
+            "--index",
+            os.path.join(self.directory.name, "index.json"),
+        )
+        self.assertEqual(status, 0, out)
+        self.assertIn("4 jobs in", out)
+        jobs = sorted(os.listdir(output))
+        self.assertEqual(len(jobs), 4)
+        for job in jobs:
+            with open(os.path.join(output, job)) as f:
+                solution = json.load(f)
+            self.assertTrue(solution["terminated"])
+            self.assertEqual(len(solution["solution"]), 32)
+
+        again = os.path.join(self.directory.name, "again")
+        status, out, _ = self.abs2("download", *jobs, "--output", again)
+        self.assertEqual(status, 0)
+        self.assertEqual(sorted(os.listdir(again)), jobs)
+
+    def testFailures(self):
+        status, out, _ = self.abs2("download", "unknown.json")
+        self.assertEqual(status, 1)
+        self.assertIn("0 solutions in", out)
+        status, _, err = self.abs2("upload", "missing/")
+        self.assertEqual(status, 1)
+        self.assertIn("No such file or directory", err)
+
+    def testRunOutlivesToken(self):
+        self.server.stop()
+        self.server = FakeABS2Server(time_scale=0.1, token_lifetime=0.2, seed=1)
+        self.server.start()
+        self.user = self.server.add_user("user")
+        output = os.path.join(self.directory.name, "solutions")
+        status, out, _ = self.abs2(
+            "run",
+            self.problems,
+            "--time-limit",
+            "1",
+            "--interval",
+            "0.05",
+            "--output",
+            output,
+        )
+        self.assertEqual(status, 0, out)
+        self.assertIn("4 jobs in", out)
+
+    def testRunTimeout(self):
+        output = os.path.join(self.directory.name, "solutions")
+        status, out, _ = self.abs2(
+            "--timeout",
+            "0.5",
+            "run",
+            self.problems,
+            "--time-limit",
+            "30",
+            "--interval",
+            "0.01",
+            "--output",
+            output,
+        )
+        self.assertEqual(status, 1)
+        self.assertIn("not terminated", out)
+        # The jobs that terminated in time are written nevertheless
+        written = os.listdir(output)
+        self.assertGreaterEqual(len(written), 1)
+        self.assertEqual(out.count("not terminated"), 4 - len(written))
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+
+from .test_session import STATUS
+from .test_streaming import TEST_FILE
+
+UPLOADED = {"message": "uploaded", "file": "testQUBO2.json", "uri_problem": ""}
+
+
+class CompressionTests(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.gz_file = os.path.join(self.directory, "test.json.gz")
+        with open(TEST_FILE, "rb") as src, gzip.open(self.gz_file, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        with open(TEST_FILE) as f:
+            self.matrix = json.load(f)
+        self.uploads = []
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def accept(self, handler):
+        self.uploads.append(
+            (handler.headers.get("Content-Encoding"), handler.read_json())
+        )
+        return 202, UPLOADED
+
+    def reject_compressed(self, handler):
+        if handler.headers.get("Content-Encoding"):
+            handler.read_body()
+            return 415, {"message": "unsupported media type"}
+        return self.accept(handler)
+
+    def testCompressedUploads(self):
+        with FakeABS2Server(routes={("POST", "/v1/problems"): self.accept}) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                api.post_qubo_matrix("token", TEST_FILE, compression="gzip")
+                api.post_qubo_matrix("token", TEST_FILE, compression="deflate")
+                api.post_qubo_matrix(
+                    "token", self.gz_file, compression="gzip", validate=True
+                )
+                api.post_qubo_matrix("token", self.gz_file)
+                api.post_pyqubo_matrix("token", {("a", "b"): 1}, compression="gzip")
+        encodings = [encoding for encoding, _ in self.uploads]
+        self.assertEqual(encodings, ["gzip", "deflate", "gzip", None, "gzip"])
+        for _, matrix in self.uploads[:4]:
+            self.assertEqual(matrix, self.matrix)
+
+    def testFallbackWhenCompressionIsRejected(self):
+        with FakeABS2Server(
+            routes={("POST", "/v1/problems"): self.reject_compressed}
+        ) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                api.post_qubo_matrix("token", self.gz_file, compression="gzip")
+                api.post_pyqubo_matrix("token", {("a", "b"): 1}, compression="gzip")
+        self.assertEqual([encoding for encoding, _ in self.uploads], [None, None])
+        self.assertEqual(self.uploads[0][1], self.matrix)
+
+    def testOtherErrorsAreNotRetriedUncompressed(self):
+        def reject(handler):
+            self.uploads.append(handler.headers.get("Content-Encoding"))
+            handler.read_body()
+            if handler.headers.get("Content-Encoding") == "deflate":
+                return 400, {"message": "Content-Encoding deflate is not supported"}
+            return 400, {"message": "malformed QUBO matrix"}
+
+        with FakeABS2Server(routes={("POST", "/v1/problems"): reject}) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                with self.assertRaises(ABS2Exception) as context:
+                    api.post_qubo_matrix("token", TEST_FILE, compression="gzip")
+                self.assertEqual(context.exception.message, "malformed QUBO matrix")
+                self.assertEqual(self.uploads, ["gzip"])
+                # A 400 naming the encoding is a rejection, the upload is retried without it
+                with self.assertRaises(ABS2Exception):
+                    api.post_qubo_matrix("token", TEST_FILE, compression="deflate")
+                self.assertEqual(self.uploads, ["gzip", "deflate", None])
+                # Compression stays disabled
+                with self.assertRaises(ABS2Exception):
+                    api.post_qubo_matrix("token", TEST_FILE, compression="gzip")
+        self.assertEqual(self.uploads, ["gzip", "deflate", None, None])
+
+    def testUnknownCompression(self):
+        with self.assertRaises(ABS2Exception):
+            ABS2API().post_qubo_matrix("token", TEST_FILE, compression="br")
+
+    def testCompressedResponse(self):
+        with FakeABS2Server(
+            routes={("GET", "/v1/"): lambda h: (200, STATUS)}, gzip_responses=True
+        ) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                self.assertTrue(api.get_status().active)
@@ -0,0 +1,132 @@
+import itertools
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.models import QUBOMatrix
+
+try:
+    import numpy as np
+
+    from abs2.decompose import (
+        QUBODecomposer,
+        RemoteSolver,
+        SubproblemSolver,
+        clamp,
+        descend,
+    )
+    from abs2.evaluate import QUBOEvaluator
+except ImportError:
+    np = None
+
+
+def random_qubo(nbit: int, density: float, seed: int):
+    rng = np.random.default_rng(seed)
+    pairs = [
+        (i, j)
+        for i in range(nbit)
+        for j in range(i, nbit)
+        if i == j or rng.random() < density
+    ]
+    return [[i, j, int(rng.integers(-9, 10))] for i, j in pairs]
+
+
+class ExhaustiveSolver(SubproblemSolver):
+    """
+    Solves small subproblems exactly, stands in for the QUBO solver.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def solve(self, matrices):
+        self.batches.append([matrix.file for matrix in matrices])
+        vectors = []
+        for matrix in matrices:
+            evaluator = QUBOEvaluator.from_matrix(matrix)
+            used = int(np.asarray(matrix.qubo)[:, :2].max()) + 1
+            candidates = np.array(list(itertools.product((0, 1), repeat=used)))
+            candidates = np.pad(candidates, ((0, 0), (0, evaluator.nbit - used)))
+            vectors.append(candidates[np.argmin(evaluator.energy(candidates))])
+        return vectors
+
+
+@skipUnless(np, "numpy is not installed")
+class DecomposeTests(TestCase):
+    def setUp(self) -> None:
+        self.qubo = random_qubo(40, 0.2, seed=3)
+        self.evaluator = QUBOEvaluator(self.qubo, 40)
+        self.rng = np.random.default_rng(5)
+
+    def testClamp(self):
+        x = self.rng.integers(0, 2, 40)
+        variables = [1, 7, 8, 20, 39]
+        triples, offset = clamp(self.evaluator, x, variables)
+        sub = QUBOEvaluator(triples, len(variables))
+        for y in itertools.product((0, 1), repeat=len(variables)):
+            full = x.copy()
+            full[variables] = y
+            self.assertEqual(
+                sub.energy(np.array(y)) + offset, self.evaluator.energy(full)
+            )
+
+    def testDescend(self):
+        x, energy = descend(self.evaluator, self.rng.integers(0, 2, 40))
+        self.assertEqual(energy, self.evaluator.energy(x))
+        self.assertTrue((self.evaluator.flip_deltas(x) >= 0).all())
+
+    def testDecomposer(self):
+        solver = ExhaustiveSolver()
+        decomposer = QUBODecomposer(
+            solver, subproblem_size=8, subproblems=3, max_iterations=10, seed=1
+        )
+        result = decomposer.solve(self.evaluator)
+        self.assertEqual(result.energy, self.evaluator.energy(result.solution))
+        self.assertEqual(result.energies[-1], result.energy)
+        self.assertEqual(result.energies, sorted(result.energies, reverse=True))
+        self.assertEqual(result.subproblems, 3 * result.iterations)
+        self.assertEqual(len(solver.batches[0]), 3)
+        self.assertEqual(len(set(itertools.chain(*solver.batches))), result.subproblems)
+        # Every iteration ends with a descent to a local minimum
+        self.assertTrue((self.evaluator.flip_deltas(result.solution) >= 0).all())
+        with self.assertRaises(ABS2Exception):
+            decomposer.solve(self.evaluator, initial=[0, 1])
+
+    def testRemoteSolver(self):
+        with FakeABS2Server(time_scale=0.001, seed=2) as server, ABS2API(
+            server.hostname, scheme="http"
+        ) as api:
+            user = server.add_user()
+            token = api.retrieve_access_token(user.username, user.password).access_token
+            solver = RemoteSolver(api, token, time_limit=1, interval=0.01, timeout=30)
+            decomposer = QUBODecomposer(
+                solver, subproblem_size=16, subproblems=2, max_iterations=3, seed=1
+            )
+            initial = np.zeros(40, dtype=np.int64)
+            result = decomposer.solve(self.evaluator, initial=initial)
+            self.assertLessEqual(result.energy, descend(self.evaluator, initial)[1])
+            self.assertEqual(result.energy, self.evaluator.energy(result.solution))
+            self.assertFalse(api.get_all_problems(token).data)
+
+    def testRemoteSolverGivesUpAfterTimeout(self):
+        with FakeABS2Server(time_scale=0.01, seed=2) as server, ABS2API(
+            server.hostname, scheme="http"
+        ) as api:
+            user = server.add_user()
+            token = api.retrieve_access_token(user.username, user.password).access_token
+            solver = RemoteSolver(
+                api, token, time_limit=100, interval=0.01, timeout=0.2
+            )
+            matrices = [
+                QUBOMatrix(f"s{k}.json", 32, 0, [[0, 1, -1], [1, 2, k]])
+                for k in range(2)
+            ]
+            self.assertEqual(solver.solve(matrices), [None, None])
+            self.assertFalse(api.get_all_problems(token).data)
+            self.assertFalse(api.get_all_jobs(token).data)
+            self.assertFalse(api.get_all_solutions(token).data)
+            self.assertEqual(api.get_status().jobs_in_queue, 0)
+
+    def testSolverIsAbstract(self):
+        with self.assertRaises(TypeError):
+            SubproblemSolver()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from abs2 import ABS2API
+from abs2.dedup import UploadIndex, problem_key, problem_key_of_file
+from abs2.fake_server import FakeABS2Server
+
+from .test_models import QUBO
+from .test_streaming import TEST_FILE
+
+
+class ProblemServer:
+    """
+    Accepts uploads and lists the uploaded problems.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.uploads = 0
+        self.verified = {}
+
+    def upload(self, handler):
+        matrix = handler.read_json()
+        self.uploads += 1
+        self.files[matrix["file"]] = {
+            "file": matrix["file"],
+            "bytes": len(str(matrix)),
+            "time": str(self.uploads),
+            "uri_problem": "",
+        }
+        return 202, {"message": "accepted", "file": matrix["file"], "uri_problem": ""}
+
+    def information(self, handler):
+        problem = self.files[handler.path.rsplit("/", 1)[1]]
+        return 200, {**problem, **self.verified.get(problem["file"], {})}
+
+    def routes(self):
+        return {
+            ("POST", "/v1/problems"): self.upload,
+            ("GET", "/v1/problems"): lambda h: (200, list(self.files.values())),
+            ("GET", "/v1/problems/testQUBO2.json"): self.information,
+        }
+
+
+class ProblemKeyTests(TestCase):
+    def testCanonicalization(self):
+        key = problem_key(32, 0, [[0, 1, 3], [2, 2, -1]])
+        self.assertEqual(problem_key(32, 0, [[2, 2, -1], [1, 0, 3]]), key)
+        self.assertEqual(problem_key(32, 1, [[3, 3, -1], [1, 2, 1], [2, 1, 2]]), key)
+        self.assertEqual(problem_key(32, 0, [[0, 1, 3], [2, 2, -1], [5, 5, 0]]), key)
+        self.assertNotEqual(problem_key(64, 0, [[0, 1, 3], [2, 2, -1]]), key)
+        self.assertNotEqual(problem_key(32, 0, [[0, 1, 3], [2, 2, 1]]), key)
+
+    def testFileKey(self):
+        key, nbit = problem_key_of_file(TEST_FILE)
+        self.assertEqual(nbit, 32)
+        self.assertEqual(len(key), 64)
+
+
+class UploadIndexTests(TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(), "uploads.json")
+
+    def testIdenticalProblemsAreUploadedOnce(self):
+        problems = ProblemServer()
+        with FakeABS2Server(routes=problems.routes()) as server:
+            with ABS2API(
+                server.hostname, scheme="http", upload_index=UploadIndex(self.path)
+            ) as api:
+                first = api.post_pyqubo_matrix("token", QUBO)
+                second = api.post_pyqubo_matrix("token", QUBO)
+                self.assertEqual(second.file, first.file)
+                self.assertEqual(second.index, first.index)
+                api.post_qubo_matrix("token", TEST_FILE)
+                api.post_qubo_matrix("token", TEST_FILE)
+                self.assertEqual(problems.uploads, 2)
+                # Streamed uploads are never loaded as a whole to compute the content hash
+                api.post_qubo_matrix("token", TEST_FILE, stream=True)
+                self.assertEqual(problems.uploads, 3)
+
+            # The index survives the process, and is checked against the server before it is used
+            with ABS2API(
+                server.hostname, scheme="http", upload_index=UploadIndex(self.path)
+            ) as api:
+                self.assertEqual(len(api.upload_index), 2)
+                api.post_pyqubo_matrix("token", QUBO)
+                self.assertEqual(problems.uploads, 3)
+
+            del problems.files[first.file]
+            with ABS2API(
+                server.hostname, scheme="http", upload_index=UploadIndex(self.path)
+            ) as api:
+                api.post_pyqubo_matrix("token", QUBO)
+                self.assertEqual(problems.uploads, 4)
+                self.assertEqual(len(api.upload_index), 2)
+
+    def testVerificationIsRecorded(self):
+        problems = ProblemServer()
+        with FakeABS2Server(routes=problems.routes()) as server:
+            with ABS2API(
+                server.hostname, scheme="http", upload_index=UploadIndex()
+            ) as api:
+                api.post_qubo_matrix("token", TEST_FILE)
+                api.get_qubo_matrix_information("token", "testQUBO2.json")
+                problems.verified["testQUBO2.json"] = {"verify": False}
+                api.get_qubo_matrix_information("token", "testQUBO2.json")
+                api.post_qubo_matrix("token", TEST_FILE)
+                self.assertEqual(problems.uploads, 2)
+
+    def testFailedVerificationIsUploadedAgain(self):
+        index = UploadIndex()
+        index.reconciled = True
+        index.add("key", "a.json", 32, "")
+        self.assertEqual(index.lookup("key")["file"], "a.json")
+        index.set_verified("a.json", False)
+        self.assertIsNone(index.lookup("key"))
+        index.add("other", "a.json", 32, "")
+        self.assertEqual(len(index), 1)
@@ -0,0 +1,87 @@
+import json
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+
+from .test_models import QUBO
+from .test_streaming import TEST_FILE
+
+try:
+    import numpy as np
+
+    from abs2.evaluate import QUBOEvaluator
+except ImportError:
+    np = None
+
+
+def brute_force_energy(qubo, x):
+    return sum(v * x[i] * x[j] for i, j, v in qubo)
+
+
+@skipUnless(np, "numpy is not installed")
+class EvaluatorTests(TestCase):
+    def setUp(self) -> None:
+        with open(TEST_FILE) as f:
+            self.matrix = json.load(f)
+        self.evaluator = QUBOEvaluator.from_file(TEST_FILE)
+        self.vectors = np.random.default_rng(1).integers(0, 2, (64, 32))
+
+    def testEnergies(self):
+        expected = [brute_force_energy(self.matrix["qubo"], x) for x in self.vectors]
+        self.assertEqual(self.evaluator.energy(self.vectors).tolist(), expected)
+        self.assertEqual(self.evaluator.energy(self.vectors[3]), expected[3])
+
+    def testFlipDeltas(self):
+        for x in self.vectors[:8]:
+            deltas = self.evaluator.flip_deltas(x)
+            for k in range(32):
+                flipped = x.copy()
+                flipped[k] ^= 1
+                expected = self.evaluator.energy(flipped) - self.evaluator.energy(x)
+                self.assertEqual(deltas[k], expected)
+                self.assertEqual(self.evaluator.flip_delta(x, k), expected)
+        batch = self.evaluator.flip_deltas(self.vectors[:8])
+        self.assertEqual(
+            batch[5].tolist(), self.evaluator.flip_deltas(self.vectors[5]).tolist()
+        )
+
+    def testLargeCoefficients(self):
+        # Beyond 2**53 a float64 sum loses the lowest bits
+        large = 2**60 + 1
+        evaluator = QUBOEvaluator([[0, 1, large], [0, 2, large], [1, 2, -1]], 3)
+        fields = evaluator.local_fields([[0, 1, 1], [1, 1, 1]])
+        self.assertEqual(fields[0].tolist(), [2 * large, -1, -1])
+        self.assertEqual(fields[1].tolist(), [2 * large, large - 1, large - 1])
+        self.assertEqual(evaluator.flip_deltas([0, 1, 1])[0], 2 * large)
+
+    def testPyquboSamples(self):
+        evaluator = QUBOEvaluator.of(QUBO)
+        self.assertEqual(evaluator.energy({"s3": 1}), -196)
+        self.assertEqual(evaluator.energy({"s1": 1, "s3": 1}), -160 + 224 - 196)
+
+    def testVerifiedSolution(self):
+        solution = {
+            "terminated": True,
+            "problem": "testQUBO2.json",
+            "job": "testQUBO2_0001.json",
+            "energy": -4,
+            "tts": 0.1,
+            "solution": [0, 0, 0, 0, 1] + [0] * 27,
+            "parameters": {},
+        }
+        with FakeABS2Server(
+            routes={
+                ("GET", "/v1/solutions/testQUBO2_0001.json"): lambda h: (200, solution)
+            }
+        ) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                info = api.get_solution(
+                    "token", "testQUBO2_0001.json", verify=True, problem=self.evaluator
+                )
+                self.assertEqual(info.energy, -4)
+                solution["energy"] = -5
+                with self.assertRaises(ABS2Exception):
+                    api.get_solution(
+                        "token", "testQUBO2_0001.json", verify=True, problem=TEST_FILE
+                    )
@@ -0,0 +1,107 @@
+import time
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception, models
+from abs2.auth import ABS2Session
+from abs2.fake_server import FakeABS2Server
+
+from .test_models import QUBO
+from .test_streaming import TEST_FILE
+
+try:
+    from abs2.evaluate import QUBOEvaluator
+except ImportError:
+    QUBOEvaluator = None
+
+
+class FakeServerTests(TestCase):
+    def setUp(self) -> None:
+        self.server = FakeABS2Server(time_scale=0.01, seed=1).start()
+        self.api = ABS2API(self.server.hostname, scheme="http")
+        user = self.server.add_user("user")
+        self.token = self.api.retrieve_access_token(
+            user.username, user.password
+        ).access_token
+
+    def tearDown(self) -> None:
+        self.api.close()
+        self.server.stop()
+
+    def testAccount(self):
+        user = models.User("new", "new@example.com", "first", "last", "affiliation")
+        self.assertEqual(self.api.register_user(user).status_code, 201)
+        with self.assertRaises(ABS2Exception) as cm:
+            self.api.register_user(user)
+        self.assertEqual(cm.exception.status_code, 409)
+        password = self.server.password("new")
+        information = self.api.retrieve_user_information("new", password)
+        self.assertEqual(information.data["email"], "new@example.com")
+        self.api.change_password("new", password, "new password")
+        token = self.api.retrieve_access_token("new", "new password").access_token
+        self.assertEqual(
+            self.api.retrieve_new_username("new@example.com").status_code, 200
+        )
+        self.api.delete_user_account(token)
+        with self.assertRaises(ABS2Exception) as cm:
+            self.api.get_all_problems(token)
+        self.assertEqual(cm.exception.status_code, 401)
+
+    def testProblemsJobsAndSolutions(self):
+        self.assertTrue(self.api.get_status().active)
+        upload = self.api.post_qubo_matrix(self.token, TEST_FILE, compression="gzip")
+        information = self.api.wait_until_verified(self.token, upload.file)
+        self.assertTrue(information.verify)
+        self.assertEqual(information.nbit, 32)
+        self.assertEqual(len(self.api.get_all_problems(self.token).data), 1)
+
+        first = self.api.post_job(self.token, upload.file, 10)
+        second = self.api.post_job(self.token, upload.file, 10)
+        self.assertEqual(self.api.get_status().jobs_in_queue, 1)
+        queued = self.api.get_job_information(self.token, second.job)
+        self.assertEqual(queued.parameters.time_limit, "10")
+        self.assertEqual(len(self.api.get_all_jobs(self.token).data), 1)
+        self.api.delete_job(self.token, second.job)
+
+        solution = self.api.wait_for_solution(
+            self.token, first.job, poll_interval=0.01, timeout=5
+        )
+        self.assertTrue(solution.terminated)
+        if QUBOEvaluator is not None:
+            QUBOEvaluator.from_file(TEST_FILE).verify(solution)
+        self.assertEqual(len(self.api.get_all_solutions(self.token).data), 1)
+        self.api.delete_all_solutions(self.token)
+        self.api.delete_all_qubo_matrices(self.token)
+        self.assertFalse(self.api.get_all_problems(self.token).data)
+
+    def testVerification(self):
+        self.server.verification_delay = 0.2
+        bad = models.QUBOMatrix("bad.json", 32, 0, [[0, 40, 1]])
+        self.api.post_matrix(self.token, bad)
+        with self.assertRaises(ABS2Exception) as cm:
+            self.api.post_job(self.token, "bad.json", 10)
+        self.assertEqual(cm.exception.status_code, 102)
+        information = self.api.wait_until_verified(
+            self.token, "bad.json", poll_interval=0.01
+        )
+        self.assertFalse(information.verify)
+        jobs = self.api.submit_when_verified(
+            self.token, [bad, QUBO], 1, poll_interval=0.01
+        )
+        self.assertIsNone(jobs[0])
+        self.assertIsInstance(jobs[1], models.PostJobSuccessMsg)
+
+    def testErrorInjection(self):
+        self.server.inject(503, "GET", "problems", times=2)
+        for _ in range(2):
+            with self.assertRaises(ABS2Exception) as cm:
+                self.api.get_all_problems(self.token)
+            self.assertEqual(cm.exception.status_code, 503)
+        self.assertEqual(self.api.get_all_problems(self.token).status_code, 200)
+
+    def testTokenExpiry(self):
+        self.server.token_lifetime = 0.05
+        user = self.server.add_user("expiring", "password")
+        with ABS2Session(user, self.api) as session:
+            session.get_all_problems()
+            time.sleep(0.1)
+            session.get_all_problems()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.history import RunHistory, TimeLimitTuner
+from abs2.models import QUBOMatrix, SolutionInformation
+from abs2.tracker import JobTracker
+
+from .test_portfolio import MATRIX
+
+
+def solution(job: str, nbit: int, energy: int, tts: float, time_limit: int = 10):
+    return SolutionInformation(
+        terminated=True,
+        problem="p.json",
+        job=job,
+        energy=energy,
+        tts=tts,
+        solution=[0] * nbit,
+        parameters={
+            "time_limit": time_limit,
+            "target_energy": energy,
+            "bfactor": 1.0,
+            "factor": 1.0,
+            "nsolpool": 20,
+            "ngpu": 1,
+            "nisland_per_gpu": 1,
+            "nisland": 1,
+            "value_bits": 16,
+            "arithmetic_bits": 32,
+        },
+        success=True,
+        kernel_time=tts + 1,
+    )
+
+
+class RunHistoryTests(TestCase):
+    def setUp(self) -> None:
+        self.history = RunHistory()
+
+    def tearDown(self) -> None:
+        self.history.close()
+
+    def testRecord(self):
+        stats = {"nbit": 64, "nelement": 100, "minval": -3, "maxval": 5}
+        run = self.history.record(
+            solution("a.json", 64, -20, 4.0), stats, [(1.0, -5), (2.5, -12)]
+        )
+        self.history.record(solution("b.json", 32, -8, 1.0))
+        self.assertEqual(
+            self.history.trajectory(run), [(1.0, -5), (2.5, -12), (4.0, -20)]
+        )
+        (row,) = self.history.runs(min_nbit=50)
+        self.assertEqual(
+            (row["job"], row["nelement"], row["time_limit"], row["kernel_time"]),
+            ("a.json", 100, 10, 5.0),
+        )
+        self.assertEqual(self.history.runs(max_nbit=32)[0]["nbit"], 32)
+        self.assertEqual(
+            self.history.query("SELECT COUNT(*) AS n FROM trajectory"), [{"n": 4}]
+        )
+
+    def testPersistent(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.db")
+            with RunHistory(path) as history:
+                history.record(solution("a.json", 32, -1, 1.0))
+            with RunHistory(path) as history:
+                self.assertEqual(len(history.runs()), 1)
+
+    def testRecorder(self):
+        with FakeABS2Server(time_scale=0.01) as server, ABS2API(
+            server.hostname, scheme="http"
+        ) as api:
+            user = server.add_user()
+            token = api.retrieve_access_token(user.username, user.password).access_token
+            (job,) = api.submit_when_verified(token, [QUBOMatrix(**MATRIX)], 1)
+            problem = api.get_qubo_matrix_information(token, MATRIX["file"])
+            tracker = JobTracker(api, token, interval=0.01)
+            tracker.track(job.job, self.history.recorder(problem))
+            tracker.run(30)
+        (row,) = self.history.runs()
+        self.assertEqual(
+            (row["job"], row["nbit"], row["nelement"], row["time_limit"]),
+            (job.job, 32, len(MATRIX["qubo"]), 1),
+        )
+        trajectory = self.history.trajectory(row["id"])
+        self.assertEqual(trajectory[-1], (row["tts"], row["energy"]))
+
+
+class TimeLimitTunerTests(TestCase):
+    def setUp(self) -> None:
+        self.history = RunHistory()
+        # Runs of 100 variables reach -10 after k seconds and end at -12 after 2k seconds
+        for k in range(1, 11):
+            self.history.record(
+                solution(f"{k}.json", 100, -12, 2.0 * k),
+                {"nbit": 100},
+                [(0.1, 0), (float(k), -10)],
+            )
+        self.tuner = TimeLimitTuner(self.history, quantile=0.9, margin=1.0)
+
+    def tearDown(self) -> None:
+        self.history.close()
+
+    def testPropose(self):
+        self.assertEqual(self.tuner.propose(100, target_energy=-10), 9)
+        self.assertEqual(self.tuner.propose(100), 18)
+        # Scaled linearly to the size of the problem
+        self.assertEqual(self.tuner.propose(200, target_energy=-10), 18)
+        # Within 20 % of the final energy, i.e. at most -9.6
+        self.assertEqual(self.tuner.propose(100, gap=0.2), 9)
+        # Never reached
+        self.assertEqual(self.tuner.propose(100, target_energy=-13), 3600)
+        # No similar runs
+        self.assertIsNone(self.tuner.propose(1000))
+        self.assertEqual(self.tuner.propose(10, default=60), 60)
+
+    def testQuantile(self):
+        # The smallest quantile still picks the fastest run
+        tuner = TimeLimitTuner(self.history, quantile=0.01, margin=1.0)
+        self.assertEqual(tuner.propose(100, target_energy=-10), 1)
+        tuner.quantile = 1.0
+        self.assertEqual(tuner.propose(100, target_energy=-10), 10)
+        tuner.quantile = 0.0
+        self.assertEqual(tuner.propose(100, target_energy=-10), 1)
+        for quantile in (0, -0.5, 1.5):
+            with self.assertRaises(ABS2Exception):
+                TimeLimitTuner(self.history, quantile=quantile)
+
+    def testNeededTimes(self):
+        times = self.tuner.needed_times(100, target_energy=-10)
+        self.assertEqual(times, [float(k) for k in range(1, 11)])
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+import abs2
+
+
+def loaded_modules(statement: str) -> set:
+    output = subprocess.run(
+        [sys.executable, "-c", statement + "; import sys; print(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(output.split())
+
+
+class LazyImportTests(TestCase):
+    def testRequestsNotImportedUpFront(self):
+        for statement in ("import abs2", "from abs2 import models, ABS2Exception"):
+            modules = loaded_modules(statement)
+            self.assertNotIn("requests", modules, statement)
+            self.assertNotIn("abs2.abs2_api", modules, statement)
+        self.assertIn("requests", loaded_modules("from abs2 import ABS2API; ABS2API()"))
+
+    def testLazyAttributes(self):
+        from abs2.abs2_api import ABS2API
+
+        self.assertIs(abs2.ABS2API, ABS2API)
+        self.assertIn("ABS2API", dir(abs2))
+        self.assertTrue(hasattr(abs2.models, "QUBOMatrix"))
+        with self.assertRaises(AttributeError):
+            abs2.missing
@@ -0,0 +1,211 @@
+import itertools
+import time
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+
+from .test_models import QUBO
+from .test_streaming import TEST_FILE
+
+try:
+    import numpy as np
+
+    from abs2.backends import LOCAL_PREFIX, SolverBackend, SolverRouter
+    from abs2.evaluate import QUBOEvaluator
+    from abs2.local_solver import LocalSolver, anneal, beta_range, merged_adjacency
+    from abs2.models import QUBOMatrix
+
+    from .test_decompose import random_qubo
+except ImportError:
+    np = None
+
+
+@skipUnless(np, "numpy is not installed")
+class LocalSolverTests(TestCase):
+    def setUp(self) -> None:
+        self.qubo = random_qubo(12, 0.4, seed=7)
+        self.evaluator = QUBOEvaluator(self.qubo, 12)
+        candidates = np.array(list(itertools.product((0, 1), repeat=12)))
+        self.optimum = int(self.evaluator.energy(candidates).min())
+
+    def testMergedAdjacency(self):
+        # [i, j] and [j, i] entries are merged into a single coupling
+        evaluator = QUBOEvaluator([[0, 1, 2], [1, 0, 3], [1, 2, -1]], 3)
+        indptr, indices, weights = merged_adjacency(evaluator)
+        self.assertEqual(indptr.tolist(), [0, 1, 3, 4])
+        self.assertEqual(indices.tolist(), [1, 0, 2, 1])
+        self.assertEqual(weights.tolist(), [5, 5, -1, -1])
+
+    def testAnneal(self):
+        adjacency = merged_adjacency(self.evaluator)
+        betas = beta_range(self.evaluator, adjacency)
+        self.assertLess(betas[0], betas[1])
+        vectors, sweeps = anneal(
+            self.evaluator.linear, adjacency, 8, 200, betas, seed=1
+        )
+        self.assertEqual(vectors.shape, (8, 12))
+        self.assertEqual(sweeps, 200)
+        self.assertEqual(int(self.evaluator.energy(vectors).min()), self.optimum)
+        _, sweeps = anneal(
+            self.evaluator.linear, adjacency, 8, 10**6, betas, seed=1, seconds=0.05
+        )
+        self.assertLess(sweeps, 10**6)
+
+    def testJobs(self):
+        with LocalSolver(replicas=8, sweeps=200, seed=1) as solver:
+            upload = solver.post_matrix("", QUBOMatrix("local.json", 32, 0, self.qubo))
+            job = solver.post_job("", upload.file, 5)
+            self.assertEqual(job.job, "local_0001.json")
+            solution = solver.wait_for_solution("", job.job, timeout=30)
+            self.assertTrue(solution.terminated)
+            self.assertEqual(solution.energy, self.optimum)
+            self.assertEqual(solution.parameters.time_limit, 5)
+            self.assertEqual(len(solution.solution), 32)
+            self.assertIs(solver.get_solution("", job.job), solution)
+            solver.delete_solution("", job.job)
+            with self.assertRaises(ABS2Exception) as context:
+                solver.get_solution("", job.job)
+            self.assertEqual(context.exception.status_code, 404)
+
+            pyqubo = solver.post_pyqubo_matrix("", QUBO)
+            solution = solver.wait_for_solution(
+                "", solver.post_job("", pyqubo.file, 1).job
+            )
+            self.assertEqual(solution.energy, QUBOEvaluator.of(pyqubo).energy(solution))
+            with self.assertRaises(ABS2Exception):
+                solver.post_job("", "unknown.json", 1)
+
+    def testIntermediateSolutionsAndStop(self):
+        with LocalSolver(replicas=4, sweeps=10**6, seed=1) as solver:
+            solver.post_matrix(
+                "", QUBOMatrix("large.json", 300, 0, random_qubo(300, 0.02, seed=1))
+            )
+            running = solver.post_job("", "large.json", 2).job
+            queued = solver.post_job("", "large.json", 2).job
+            deadline = time.monotonic() + 1.5
+            while True:
+                try:
+                    solution = solver.get_solution("", running)
+                    break
+                except ABS2Exception as e:
+                    self.assertEqual(e.status_code, 404)
+                    self.assertLess(time.monotonic(), deadline)
+                    time.sleep(0.01)
+            self.assertFalse(solution.terminated)
+            self.assertEqual(len(solution.solution), 300)
+
+            # The problem is gone by the time the queued job starts
+            solver.delete_qubo_matrix("", "large.json")
+            started = time.monotonic()
+            solver.delete_solution("", running)
+            with self.assertRaises(ABS2Exception) as context:
+                solver.wait_for_solution("", queued, timeout=5)
+            self.assertLess(time.monotonic() - started, 1.0)
+            self.assertIn("failed", str(context.exception))
+
+    def testSolutionOptions(self):
+        with LocalSolver(replicas=4, sweeps=10**6, seed=1) as solver:
+            solver.post_matrix(
+                "", QUBOMatrix("large.json", 300, 0, random_qubo(300, 0.02, seed=1))
+            )
+            job = solver.post_job("", "large.json", 5).job
+            started = time.monotonic()
+            solution = solver.wait_for_solution(
+                "",
+                job,
+                target_energy=10**9,
+                delete_on_target=True,
+                poll_interval=0.01,
+                timeout=5,
+            )
+            self.assertLess(time.monotonic() - started, 2.0)
+            self.assertFalse(solution.terminated)
+            # The job was stopped once the target energy was reached
+            with self.assertRaises(ABS2Exception) as context:
+                solver.get_solution("", job)
+            self.assertEqual(context.exception.status_code, 404)
+
+            job = solver.post_job("", "large.json", 1).job
+            with self.assertRaises(ABS2Exception):
+                solver.wait_for_solution("", job, timeout=0.01)
+            solution = solver.wait_for_solution("", job, timeout=30)
+            self.assertIs(solver.get_solution("", job, verify=True), solution)
+            solution.energy += 1
+            with self.assertRaises(ABS2Exception):
+                solver.get_solution("", job, verify=True)
+            with self.assertRaises(TypeError):
+                solver.wait_for_solution("", job, target=0)
+
+    def testWorkerProcesses(self):
+        with LocalSolver(replicas=4, sweeps=100, workers=2, seed=1) as solver:
+            solver.post_matrix("", QUBOMatrix("local.json", 32, 0, self.qubo))
+            job = solver.post_job("", "local.json", 5)
+            solution = solver.wait_for_solution("", job.job, timeout=60)
+            self.assertEqual(solution.parameters.nisland, 2)
+            self.assertEqual(solution.energy, self.optimum)
+
+    def testCloseStopsRunningJob(self):
+        solver = LocalSolver(replicas=4, sweeps=10**6, workers=2, seed=1)
+        solver.post_matrix(
+            "", QUBOMatrix("large.json", 300, 0, random_qubo(300, 0.02, seed=1))
+        )
+        running = solver._jobs[solver.post_job("", "large.json", 60).job]
+        queued = solver._jobs[solver.post_job("", "large.json", 60).job]
+        while not running.future.running():
+            time.sleep(0.01)
+        started = time.monotonic()
+        solver.close()
+        # The running job finished its part before the worker processes were shut down
+        self.assertLess(time.monotonic() - started, 30)
+        self.assertTrue(running.future.done())
+        self.assertTrue(queued.future.cancelled())
+        with self.assertRaises(ABS2Exception) as context:
+            running.future.result()
+        self.assertIn("deleted", str(context.exception))
+
+    def testRouter(self):
+        large = QUBOMatrix("large.json", 300, 0, random_qubo(300, 0.01, seed=1))
+        with FakeABS2Server(time_scale=0.001) as server, ABS2API(
+            server.hostname, scheme="http"
+        ) as api, SolverRouter(
+            api, LocalSolver(replicas=4, sweeps=20), status_ttl=0
+        ) as router:
+            user = server.add_user()
+            token = api.retrieve_access_token(user.username, user.password).access_token
+            small = router.post_pyqubo_matrix(token, QUBO, file="small.json").file
+            self.assertEqual(small, LOCAL_PREFIX + "small.json")
+            self.assertEqual(router.post_matrix(token, large).file, "large.json")
+            self.assertEqual(
+                [problem["file"] for problem in api.iter_all_problems(token)],
+                ["large.json"],
+            )
+            api.wait_until_verified(token, "large.json")
+            for problem in (small, "large.json"):
+                job = router.post_job(token, problem, 1)
+                solution = router.wait_for_solution(token, job.job, timeout=30)
+                self.assertTrue(solution.terminated)
+                self.assertEqual(solution.problem, problem)
+                self.assertEqual(solution.job, job.job)
+
+            # The same name on both backends stays apart
+            server.active = False
+            fallback = router.post_matrix(token, large).file
+            self.assertEqual(fallback, LOCAL_PREFIX + "large.json")
+            self.assertEqual(
+                [problem["file"] for problem in api.iter_all_problems(token)],
+                ["large.json"],
+            )
+            job = router.post_job(token, fallback, 1).job
+            self.assertIn(job[len(LOCAL_PREFIX) :], router.local._jobs)
+            router.delete_solution(token, job)
+            router.delete_qubo_matrix(token, fallback)
+            self.assertNotIn("large.json", router.local._problems)
+            api.get_qubo_matrix_information(token, "large.json")
+
+            self.assertIsInstance(api, SolverBackend)
+            self.assertEqual(
+                router.post_qubo_matrix(token, TEST_FILE).file,
+                LOCAL_PREFIX + "testQUBO2.json",
+            )
+            self.assertIn("testQUBO2.json", router.local._problems)
@@ -0,0 +1,88 @@
+import os
+from unittest import IsolatedAsyncioTestCase, TestCase, skipUnless
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.metrics import Metrics, endpoint_label
+
+from .test_streaming import TEST_FILE
+
+try:
+    from abs2.async_abs2_api import AsyncABS2API
+except ImportError:
+    AsyncABS2API = None
+
+
+class MetricsTests(TestCase):
+    def testEndpointLabels(self):
+        self.assertEqual(endpoint_label(""), "status")
+        self.assertEqual(endpoint_label("problems"), "problems")
+        self.assertEqual(endpoint_label("problems/flower-k.json"), "problems/{name}")
+
+    def testRecordedRequests(self):
+        metrics = Metrics()
+        records = []
+        with FakeABS2Server() as server:
+            user = server.add_user()
+            with ABS2API(
+                server.hostname, scheme="http", hooks=[metrics, records.append]
+            ) as api:
+                token = api.retrieve_access_token(
+                    user.username, user.password
+                ).access_token
+                api.post_qubo_matrix(token, TEST_FILE)
+                api.post_qubo_matrix(token, TEST_FILE, stream=True)
+                api.get_qubo_matrix_information(token, "testQUBO2.json")
+                with self.assertRaises(ABS2Exception):
+                    api.get_solution(token, "missing.json")
+        self.assertEqual(
+            [(r.method, r.endpoint, r.status_code) for r in records],
+            [
+                ("POST", "token", 200),
+                ("POST", "problems", 202),
+                ("POST", "problems", 202),
+                ("GET", "problems/{name}", 200),
+                ("GET", "solutions/{name}", 404),
+            ],
+        )
+        upload = records[1]
+        self.assertGreater(upload.request_bytes, 0)
+        self.assertGreater(upload.response_bytes, 0)
+        self.assertGreaterEqual(upload.seconds, upload.response_seconds)
+        self.assertEqual(records[2].request_bytes, os.path.getsize(TEST_FILE))
+
+        text = metrics.to_prometheus()
+        self.assertIn(
+            'abs2_client_requests_total{method="POST",endpoint="problems",status="202"} 2',
+            text,
+        )
+        self.assertIn(
+            'abs2_client_request_duration_seconds_count{method="GET",endpoint="solutions/{name}"} 1',
+            text,
+        )
+        self.assertIn('le="+Inf"', text)
+
+    def testFailingHookIsIgnored(self):
+        def broken(record):
+            raise RuntimeError("broken hook")
+
+        with FakeABS2Server() as server:
+            with ABS2API(server.hostname, scheme="http", hooks=[broken]) as api:
+                with self.assertLogs("abs2.rest_adapter", "ERROR"):
+                    self.assertTrue(api.get_status().active)
+
+
+@skipUnless(AsyncABS2API, "aiohttp is not installed")
+class AsyncMetricsTests(IsolatedAsyncioTestCase):
+    async def testRecordedRequests(self):
+        metrics = Metrics()
+        with FakeABS2Server() as server:
+            user = server.add_user()
+            async with AsyncABS2API(
+                server.hostname, scheme="http", hooks=[metrics]
+            ) as api:
+                await api.retrieve_access_token(user.username, user.password)
+                await api.get_status()
+        self.assertEqual(metrics.status[("POST", "token", "200")], 1)
+        self.assertEqual(metrics.status[("GET", "status", "200")], 1)
+        self.assertGreater(metrics.sent_bytes[("POST", "token")], 0)
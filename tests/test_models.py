@@ -0,0 +1,169 @@
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2Exception, models
+from abs2.abs2_api import prepare_pyqubo_matrix
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import PIL
+except ImportError:
+    PIL = None
+
+QUBO = {
+    ("s1", "s1"): -160,
+    ("s1", "s2"): 64,
+    ("s2", "s2"): -96,
+    ("s3", "s1"): 224,
+    ("s3", "s2"): 112,
+    ("s3", "s3"): -196,
+    ("s4", "s1"): 32,
+    ("s4", "s2"): 16,
+    ("s4", "s3"): 56,
+    ("s4", "s4"): -52,
+}
+
+
+class VariableIndexTests(TestCase):
+    def testIndexIsIndependentOfQuboOrder(self):
+        reversed_qubo = dict(reversed(list(QUBO.items())))
+        index = models.VariableIndex.from_qubo(QUBO)
+        self.assertEqual(index, models.VariableIndex.from_qubo(reversed_qubo))
+        self.assertEqual(index.names, ["s1", "s2", "s3", "s4"])
+        self.assertEqual((index.encode("s3"), index.decode(3)), (2, "s4"))
+
+    def testUnsortableNamesKeepFirstAppearance(self):
+        index = models.VariableIndex.from_qubo({("b", 1): 1, (1, "a"): 2})
+        self.assertEqual(index.names, ["b", 1, "a"])
+
+    def testPreparedMatrixIsDeterministic(self):
+        matrix, index = prepare_pyqubo_matrix(QUBO, "a.json")
+        self.assertEqual(matrix["nbit"], 32)
+        self.assertEqual(matrix["qubo"][3], [2, 0, 224])
+        reused, _ = prepare_pyqubo_matrix(QUBO, "a.json", index)
+        self.assertEqual(matrix, reused)
+
+    def testUnknownVariable(self):
+        index = models.VariableIndex(["s1"])
+        with self.assertRaises(ABS2Exception):
+            index.encode_qubo(QUBO)
+
+    def testDecodeSolution(self):
+        _, index = prepare_pyqubo_matrix(QUBO)
+        msg = models.PyQUBOMatrixUploadMsg(QUBO, None, 202, "", "a.json", "", index)
+        solution = [0, 0, 1, 0] + [0] * 28
+        self.assertEqual(
+            msg.decode_solution(solution), {"s1": 0, "s2": 0, "s3": 1, "s4": 0}
+        )
+        self.assertEqual(msg.key_mapping, {0: "s1", 1: "s2", 2: "s3", 3: "s4"})
+        legacy = models.PyQUBOMatrixUploadMsg(QUBO, msg.key_mapping, 202, "", "", "")
+        self.assertEqual(
+            legacy.decode_solution(solution), msg.decode_solution(solution)
+        )
+        # The solution of another problem
+        for other in ([0, 1, 1], [0] * 33):
+            with self.assertRaises(ABS2Exception):
+                msg.decode_solution(other)
+
+
+def make_solution(solution) -> models.SolutionInformation:
+    return models.SolutionInformation(
+        terminated=True,
+        problem="flower-k.json",
+        job="flower-k_0001.json",
+        energy=-4,
+        tts=0.5,
+        solution=solution,
+        parameters={},
+    )
+
+
+class CompactModelTests(TestCase):
+    def testNoInstanceDict(self):
+        info = make_solution([1, 0, 1])
+        self.assertFalse(hasattr(info, "__dict__"))
+        with self.assertRaises(AttributeError):
+            info.unknown = 1
+        self.assertFalse(hasattr(info, "success"))
+        user = models.User("name", "mail", "first", "last", "affiliation")
+        self.assertEqual(models.as_dict(user)["email"], "mail")
+
+    def testSolutionStoredAsBytes(self):
+        info = make_solution([1, 0, 1])
+        self.assertIsInstance(info._solution, bytearray)
+        self.assertEqual(info.solution, [1, 0, 1])
+        spins = make_solution([1, -1])
+        self.assertEqual(spins.solution, [1, -1])
+
+    def testSolutionListIsKept(self):
+        info = make_solution([1, 0, 1])
+        self.assertIs(info.solution, info.solution)
+        info.solution[1] = 1
+        self.assertEqual(info.solution, [1, 1, 1])
+
+    def testLazyParameters(self):
+        job = models.JobInformation(
+            "a_0001.json", "a.json", 32, -1, 1, {"problem": "a.json", "time_limit": 10}
+        )
+        self.assertIsInstance(job._parameters, dict)
+        self.assertEqual(job.parameters.time_limit, "10")
+        self.assertIsInstance(job._parameters, models.JobParameters)
+        information = models.QUBOMatrixInformation("a.json", 10, None, "")
+        self.assertFalse(hasattr(information, "parameters"))
+        information.parameters = {"problem": "a.json", "nbit": 32, "base": 0}
+        self.assertEqual(information.parameters.nbit, 32)
+
+    def testUnknownParametersAreIgnored(self):
+        job = models.JobInformation(
+            "a_0001.json",
+            "a.json",
+            32,
+            -1,
+            1,
+            {"problem": "a.json", "time_limit": 10, "priority": 1},
+        )
+        self.assertEqual(job.parameters.problem, "a.json")
+
+    def testMissingParametersAreNone(self):
+        info = make_solution([1, 0, 1])
+        self.assertIsNone(info.parameters.time_limit)
+        job = models.JobInformation(
+            "a_0001.json", "a.json", 32, -1, 1, {"time_limit": 10}
+        )
+        self.assertIsNone(job.parameters.problem)
+        self.assertEqual(job.parameters.time_limit, "10")
+
+
+@skipUnless(np, "numpy is not installed")
+class SolutionArrayTests(TestCase):
+    def testLazyConversions(self):
+        info = make_solution([1, 0, 1, 1] + [0] * 6)
+        self.assertEqual(info.solution_array.dtype, np.uint8)
+        self.assertEqual(info.solution_array.tolist(), info.solution)
+        bits = info.solution_bits
+        self.assertEqual(bits.tolist(), [0b10110000, 0])
+        unpacked = np.unpackbits(bits, count=len(info.solution))
+        self.assertEqual(unpacked.tolist(), info.solution)
+
+    def testDecodeSolutionAsArray(self):
+        _, index = prepare_pyqubo_matrix(QUBO)
+        info = make_solution([0, 1, 1, 0] + [0] * 28)
+        self.assertEqual(
+            index.decode_solution(info, as_array=True).tolist(), [0, 1, 1, 0]
+        )
+        self.assertEqual(
+            index.decode_solution(info.solution_array),
+            {"s1": 0, "s2": 1, "s3": 1, "s4": 0},
+        )
+
+    @skipUnless(PIL, "pillow is not installed")
+    def testToImage(self):
+        info = make_solution([1, 0, 0, 0, 0, 1])
+        image = info.to_image((2, 3))
+        self.assertEqual((image.mode, image.size), ("1", (3, 2)))
+        self.assertEqual(bool(image.getpixel((0, 0))), True)
+        self.assertEqual(bool(image.getpixel((2, 1))), True)
+        self.assertEqual(bool(image.getpixel((1, 0))), False)
@@ -0,0 +1,117 @@
+import threading
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.polling import Backoff, queued_interval, running_interval
+from abs2.models import StatusInformation
+
+from .test_session import STATUS
+
+JOB = "testQUBO2_0001.json"
+
+
+def solution(energy, terminated=False):
+    return {
+        "terminated": terminated,
+        "problem": "testQUBO2.json",
+        "job": JOB,
+        "energy": energy,
+        "tts": 0.1,
+        "solution": [1, 0, 1, 0],
+        "parameters": {"time_limit": 0.01},
+    }
+
+
+class ScriptedSolver:
+    """
+    Answers the polls of a solution file with a fixed sequence of responses, the last one repeats.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.polls = 0
+        self.deleted = False
+        self.lock = threading.Lock()
+
+    def get(self, handler):
+        with self.lock:
+            self.polls += 1
+            if len(self.responses) > 1:
+                return self.responses.pop(0)
+            return self.responses[0]
+
+    def delete(self, handler):
+        self.deleted = True
+        return 200, {"message": "deleted"}
+
+    def routes(self):
+        return {
+            ("GET", "/v1/"): lambda h: (200, STATUS),
+            ("GET", f"/v1/solutions/{JOB}"): self.get,
+            ("DELETE", f"/v1/solutions/{JOB}"): self.delete,
+        }
+
+
+QUEUED = (404, {"message": "not found"})
+
+
+class PollingTests(TestCase):
+    def testBackoff(self):
+        backoff = Backoff(1, 4, factor=2, jitter=0)
+        self.assertEqual([backoff.next() for _ in range(4)], [1, 2, 4, 4])
+        backoff.reset(0.5)
+        self.assertEqual(backoff.next(), 0.5)
+
+    def testIntervals(self):
+        status = StatusInformation(
+            **{**STATUS, "jobs_in_queue": 3, "total_time_limit": 40}
+        )
+        self.assertEqual(queued_interval(status, 0.5, 30), 20)
+        self.assertEqual(queued_interval(StatusInformation(**STATUS), 0.5, 30), 0.5)
+        self.assertEqual(running_interval(600, 0.5, 10), 10)
+        self.assertEqual(running_interval(None, 0.5, 10), 0.5)
+
+    def testIterSolutions(self):
+        solver = ScriptedSolver(
+            QUEUED,
+            QUEUED,
+            (200, solution(-1)),
+            (200, solution(-1)),
+            (200, solution(-3)),
+            (200, solution(-5, terminated=True)),
+        )
+        with FakeABS2Server(routes=solver.routes()) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                solutions = list(
+                    api.iter_solutions(
+                        "token", JOB, poll_interval=0.001, max_interval=0.01
+                    )
+                )
+        self.assertEqual([s.energy for s in solutions], [-1, -3, -5])
+        self.assertTrue(solutions[-1].terminated)
+        self.assertEqual(solver.polls, 6)
+
+    def testStopAtTarget(self):
+        solver = ScriptedSolver(
+            (200, solution(-1)), (200, solution(-4)), (200, solution(-5, True))
+        )
+        with FakeABS2Server(routes=solver.routes()) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                result = api.wait_for_solution(
+                    "token",
+                    JOB,
+                    target_energy=-4,
+                    delete_on_target=True,
+                    poll_interval=0.001,
+                )
+        self.assertEqual(result.energy, -4)
+        self.assertTrue(solver.deleted)
+        self.assertEqual(solver.polls, 2)
+
+    def testTimeout(self):
+        solver = ScriptedSolver(QUEUED)
+        with FakeABS2Server(routes=solver.routes()) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                with self.assertRaises(ABS2Exception):
+                    api.wait_for_solution("token", JOB, poll_interval=0.01, timeout=0.1)
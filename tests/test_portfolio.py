@@ -0,0 +1,98 @@
+import json
+import time
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.models import QUBOMatrix
+from abs2.portfolio import PortfolioRunner, Variant
+
+from .test_streaming import TEST_FILE
+
+with open(TEST_FILE) as f:
+    MATRIX = json.load(f)
+
+
+class PortfolioTests(TestCase):
+    def setUp(self) -> None:
+        self.server = FakeABS2Server(time_scale=0.01, seed=1).start()
+        self.api = ABS2API(self.server.hostname, scheme="http")
+        user = self.server.add_user()
+        self.token = self.api.retrieve_access_token(
+            user.username, user.password
+        ).access_token
+        self.runner = PortfolioRunner(self.api, self.token, interval=0.01)
+
+    def tearDown(self) -> None:
+        self.api.close()
+        self.server.stop()
+
+    def matrix(self, name: str, scale: int = 1) -> QUBOMatrix:
+        qubo = [[i, j, value * scale] for i, j, value in MATRIX["qubo"]]
+        return QUBOMatrix(name, MATRIX["nbit"], MATRIX["base"], qubo)
+
+    def testAllTerminate(self):
+        variants = [
+            Variant(self.matrix("a.json"), 1, label="1s"),
+            Variant(self.matrix("a.json"), 2, label="2s"),
+            Variant(self.matrix("b.json", 2), 1, scale=2),
+        ]
+        result = self.runner.run(variants)
+        self.assertEqual(result.reason, "terminated")
+        self.assertEqual(len({report.job for report in result.reports}), 3)
+        for report in result.reports:
+            self.assertTrue(report.terminated)
+            self.assertFalse(report.cancelled)
+            self.assertEqual(
+                report.energy, report.solution.energy / report.variant.scale
+            )
+            self.assertEqual(
+                report.solution.parameters.time_limit, report.variant.time_limit
+            )
+        self.assertEqual(
+            result.best.energy, min(report.energy for report in result.reports)
+        )
+
+    def testTarget(self):
+        # Every solution reaches the target, the first one seen wins and the others are stopped
+        variants = [Variant(self.matrix(f"p{k}.json"), 100) for k in range(3)]
+        started = time.monotonic()
+        result = self.runner.run(variants, target_energy=10**9)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(result.reason, "target")
+        winners = [report for report in result.reports if report.time_to_target]
+        self.assertEqual(len(winners), 1)
+        self.assertIs(result.best, winners[0])
+        self.assertEqual(
+            sum(report.cancelled for report in result.reports), len(variants)
+        )
+        self.assertFalse(self.api.get_all_jobs(self.token).data)
+        self.assertFalse(self.api.get_all_solutions(self.token).data)
+        self.assertEqual(self.api.get_status().jobs_in_queue, 0)
+
+    def testStalled(self):
+        variants = [
+            Variant(self.matrix("a.json"), 1000),
+            Variant(self.matrix("b.json"), 1000),
+        ]
+        started = time.monotonic()
+        result = self.runner.run(variants, stall_seconds=0.2)
+        self.assertLess(time.monotonic() - started, 5.0)
+        self.assertEqual(result.reason, "stalled")
+        self.assertTrue(all(report.cancelled for report in result.reports))
+
+    def testTimeout(self):
+        with self.assertRaises(ABS2Exception):
+            self.runner.run([Variant(self.matrix("a.json"), 1000)], timeout=0.2)
+        self.assertFalse(self.api.get_all_solutions(self.token).data)
+
+    def testStoppedWhenPollingFails(self):
+        self.server.inject(500, "GET", "jobs")
+        with self.assertRaises(ABS2Exception):
+            self.runner.run([Variant(self.matrix("a.json"), 1000)])
+        self.assertFalse(self.api.get_all_jobs(self.token).data)
+        self.assertFalse(self.api.get_all_solutions(self.token).data)
+
+    def testNoVariants(self):
+        with self.assertRaises(ABS2Exception):
+            self.runner.run([])
@@ -0,0 +1,154 @@
+import time
+from email.utils import formatdate
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.metrics import Metrics
+from abs2.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+from .test_streaming import TEST_FILE
+
+
+def fast_policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(backoff=0.001, jitter=0.0, **kwargs)
+
+
+class RetryPolicyTests(TestCase):
+    def testIdempotency(self):
+        policy = RetryPolicy(attempts=3)
+        # Rejected requests are retried for every method
+        self.assertTrue(policy.should_retry("POST", 1, 503))
+        self.assertTrue(policy.should_retry("POST", 2, 102))
+        self.assertFalse(policy.should_retry("POST", 3, 503))
+        # Requests that may have been processed only for idempotent methods
+        self.assertTrue(policy.should_retry("GET", 1, 502))
+        self.assertFalse(policy.should_retry("POST", 1, 502))
+        self.assertTrue(policy.should_retry("DELETE", 1, None))
+        self.assertFalse(policy.should_retry("POST", 1, None))
+        self.assertTrue(policy.should_retry("POST", 1, None, sent=False))
+        self.assertFalse(policy.should_retry("GET", 1, 404))
+
+    def testDelay(self):
+        policy = RetryPolicy(backoff=1.0, max_backoff=5.0, jitter=0.0)
+        self.assertEqual([policy.delay(n) for n in (1, 2, 3, 4)], [1.0, 2.0, 4.0, 5.0])
+        self.assertEqual(policy.delay(1, "3"), 3.0)
+        self.assertEqual(policy.delay(1, "120"), 5.0)
+        jittered = RetryPolicy(backoff=1.0, jitter=0.5).delay(1)
+        self.assertTrue(0.5 <= jittered <= 1.5)
+
+    def testParseRetryAfter(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("2.5"), 2.5)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 60)), 0.0)
+        self.assertAlmostEqual(
+            parse_retry_after(formatdate(time.time() + 60)), 60, delta=2
+        )
+
+
+class CircuitBreakerTests(TestCase):
+    def testOpensAndRecovers(self):
+        breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+        breaker.record(503)
+        breaker.before()
+        breaker.record(None)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(ABS2Exception) as context:
+            breaker.before()
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(breaker.rejected, 1)
+        time.sleep(0.06)
+        # One probe is let through, a failing probe opens the circuit again
+        breaker.before()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.record(503)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        time.sleep(0.06)
+        breaker.before()
+        breaker.record(200)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.opened, 1)
+        self.assertGreaterEqual(breaker.open_seconds, 0.12)
+
+    def testReleasedProbeIsLetThroughAgain(self):
+        breaker = CircuitBreaker(threshold=1, reset_timeout=0.05)
+        breaker.record(None)
+        time.sleep(0.06)
+        breaker.before()
+        # A probe aborted by the client counts neither way, the next call is the probe
+        breaker.release()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        breaker.before()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual((breaker.failures, breaker.rejected), (1, 0))
+
+
+class RetryTests(TestCase):
+    def setUp(self):
+        self.server = FakeABS2Server().start()
+        self.addCleanup(self.server.stop)
+        self.user = self.server.add_user()
+
+    def api(self, **kwargs) -> ABS2API:
+        api = ABS2API(self.server.hostname, scheme="http", **kwargs)
+        self.addCleanup(api.close)
+        return api
+
+    def testRetriesTransientErrors(self):
+        metrics = Metrics()
+        api = self.api(retry=fast_policy(), hooks=[metrics])
+        token = api.retrieve_access_token(
+            self.user.username, self.user.password
+        ).access_token
+        self.server.inject(503, "POST", "problems", times=2)
+        api.post_qubo_matrix(token, TEST_FILE)
+        self.server.inject(502, "GET", "problems", times=1)
+        self.assertEqual(len(api.get_all_problems(token).data), 1)
+        self.assertEqual(metrics.retries[("POST", "problems")], 2)
+        self.assertEqual(metrics.retries[("GET", "problems")], 1)
+        # Give up after the last attempt
+        self.server.inject(503, "GET", "problems", times=4)
+        with self.assertRaises(ABS2Exception) as context:
+            api.get_all_problems(token)
+        self.assertEqual(context.exception.status_code, 503)
+
+    def testPostNotRetriedAfterProcessing(self):
+        api = self.api(retry=fast_policy())
+        token = api.retrieve_access_token(
+            self.user.username, self.user.password
+        ).access_token
+        self.server.inject(500, "POST", "problems")
+        with self.assertRaises(ABS2Exception):
+            api.post_qubo_matrix(token, TEST_FILE)
+        requests = self.server.requests
+        # Streamed bodies cannot be sent again
+        self.server.inject(503, "POST", "problems")
+        with self.assertRaises(ABS2Exception):
+            api.post_qubo_matrix(token, TEST_FILE, stream=True)
+        self.assertEqual(self.server.requests, requests + 1)
+
+    def testCircuitBreaker(self):
+        metrics = Metrics()
+        breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+        metrics.track_breaker(breaker)
+        api = self.api(breaker=breaker)
+        token = api.retrieve_access_token(
+            self.user.username, self.user.password
+        ).access_token
+        self.server.active = False
+        with self.assertRaises(ABS2Exception):
+            api.get_status()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        requests = self.server.requests
+        with self.assertRaises(ABS2Exception) as context:
+            api.get_all_problems(token)
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(self.server.requests, requests)
+        self.server.active = True
+        self.assertTrue(api.get_status().active)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        api.get_all_problems(token)
+        exported = metrics.to_prometheus()
+        self.assertIn('abs2_client_circuit_open{breaker="abs2"} 0', exported)
+        self.assertIn('abs2_client_circuit_rejected_total{breaker="abs2"} 1', exported)
@@ -0,0 +1,69 @@
+import json
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2API
+from abs2.fake_server import FakeABS2Server
+from abs2.models import QUBOMatrix
+from abs2.serializers import JSONSerializer, OrjsonSerializer, default_serializer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MATRIX = {"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, -2], [1, 1, 3]]}
+
+
+class CountingSerializer(JSONSerializer):
+    def __init__(self):
+        self.dumped = self.loaded = 0
+
+    def dumps(self, data) -> bytes:
+        self.dumped += 1
+        return super().dumps(data)
+
+    def loads(self, data):
+        self.loaded += 1
+        return super().loads(data)
+
+
+class SerializerTests(TestCase):
+    def serializers(self):
+        yield JSONSerializer()
+        if orjson is not None:
+            yield OrjsonSerializer()
+
+    def testRoundTrip(self):
+        for serializer in self.serializers():
+            data = serializer.dumps(MATRIX)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(serializer.loads(data), MATRIX)
+
+    @skipUnless(np, "numpy is not installed")
+    def testNumpyArrays(self):
+        triples = np.array(MATRIX["qubo"], dtype=np.int32)
+        for serializer in self.serializers():
+            encoded = serializer.dumps({"qubo": triples, "nbit": np.int64(32)})
+            self.assertEqual(json.loads(encoded), {"qubo": MATRIX["qubo"], "nbit": 32})
+            # Not C-contiguous, converted before it is serialized
+            matrix = QUBOMatrix("a.json", 32, 0, np.asfortranarray(triples))
+            self.assertEqual(json.loads(matrix.to_bytes(serializer)), MATRIX)
+
+    def testDefault(self):
+        expected = OrjsonSerializer if orjson is not None else JSONSerializer
+        self.assertIsInstance(default_serializer(), expected)
+
+    def testPluggedIntoAdapter(self):
+        serializer = CountingSerializer()
+        with FakeABS2Server() as server, ABS2API(
+            server.hostname, scheme="http", serializer=serializer
+        ) as api:
+            user = server.add_user()
+            token = api.retrieve_access_token(user.username, user.password)
+            api.post_matrix(token.access_token, QUBOMatrix(**MATRIX))
+        self.assertEqual((serializer.dumped, serializer.loaded), (2, 2))
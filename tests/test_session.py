@@ -0,0 +1,53 @@
+import time
+from unittest import TestCase
+
+import requests
+
+from abs2 import ABS2API, ABS2Exception, rest_adapter
+from abs2.fake_server import FakeABS2Server
+
+STATUS = {
+    "message": "QUBO solver is working",
+    "active": True,
+    "jobs_in_queue": 0,
+    "total_time_limit": 0,
+    "uri_root": "",
+    "uri_signup": "",
+    "uri_account": "",
+    "uri_token": "",
+    "uri_problems": "",
+    "uri_jobs": "",
+    "uri_solutions": "",
+}
+
+
+class SessionTests(TestCase):
+    def testConnectionIsReused(self):
+        with FakeABS2Server(
+            routes={("GET", "/v1/"): lambda h: (200, STATUS)}
+        ) as server:
+            with rest_adapter.RestAdapter(server.hostname, scheme="http") as api:
+                for _ in range(20):
+                    self.assertEqual(api.get("").status_code, 200)
+            self.assertEqual(server.connections, 1)
+
+    def testApiContextManager(self):
+        with FakeABS2Server(
+            routes={("GET", "/v1/"): lambda h: (200, STATUS)}
+        ) as server:
+            with ABS2API(server.hostname, scheme="http", pool_size=2) as api:
+                status = api.get_status()
+                self.assertTrue(status.active)
+
+    def testTimeout(self):
+        def slow(handler):
+            time.sleep(0.5)
+            return 200, STATUS
+
+        with FakeABS2Server(routes={("GET", "/v1/"): slow}) as server:
+            with rest_adapter.RestAdapter(
+                server.hostname, scheme="http", timeout=5
+            ) as api:
+                with self.assertRaises(ABS2Exception) as cm:
+                    api.get("", timeout=0.05)
+                self.assertIsInstance(cm.exception.__cause__, requests.Timeout)
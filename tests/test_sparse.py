@@ -0,0 +1,72 @@
+import json
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2API, ABS2Exception, models
+from abs2.fake_server import FakeABS2Server
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+
+@skipUnless(np, "numpy is not installed")
+class SparseTests(TestCase):
+    def testFromCooMergesEntries(self):
+        matrix = models.QUBOMatrix.from_coo(
+            rows=[0, 1, 0, 2, 3, 3],
+            cols=[1, 0, 0, 2, 1, 1],
+            values=[2, 3, -1, 0, 4, -4],
+            file="coo.json",
+        )
+        self.assertEqual(matrix.qubo.tolist(), [[0, 0, -1], [0, 1, 5]])
+        self.assertEqual((matrix.file, matrix.nbit, matrix.base), ("coo.json", 32, 0))
+
+    def testToJsonMatchesListMatrix(self):
+        triples = [[0, 0, 2], [0, 1, -3], [5, 40, 7]]
+        array_matrix = models.QUBOMatrix.from_coo(*np.array(triples).T, base=1)
+        list_matrix = models.QUBOMatrix(array_matrix.file, 40, 1, triples)
+        self.assertEqual(array_matrix.nbit, 40)
+        self.assertEqual(
+            json.loads(array_matrix.to_json()), json.loads(list_matrix.to_json())
+        )
+
+    def testFromDense(self):
+        dense = np.array([[1, 2, 0], [2, 0, 0], [0, -3, 4]])
+        matrix = models.QUBOMatrix.from_dense(dense, base=1)
+        self.assertEqual(
+            matrix.qubo.tolist(), [[1, 1, 1], [1, 2, 4], [2, 3, -3], [3, 3, 4]]
+        )
+
+    @skipUnless(scipy, "scipy is not installed")
+    def testFromScipy(self):
+        sparse = scipy.sparse.csr_matrix(np.array([[1, 2], [2, 0]]))
+        matrix = models.QUBOMatrix.from_scipy(sparse, nbit=64)
+        self.assertEqual(matrix.qubo.tolist(), [[0, 0, 1], [0, 1, 4]])
+        self.assertEqual(matrix.nbit, 64)
+
+    def testIndexExceedsNbit(self):
+        with self.assertRaises(ABS2Exception):
+            models.QUBOMatrix.from_coo([0], [40], [1], nbit=32)
+
+    def testPostSparseQubo(self):
+        uploads = []
+
+        def upload(handler):
+            uploads.append(handler.read_json())
+            return 202, {"message": "uploaded", "file": "coo.json", "uri_problem": ""}
+
+        with FakeABS2Server(routes={("POST", "/v1/problems"): upload}) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                response = api.post_sparse_qubo(
+                    "token", [1, 0], [0, 1], [1.5, 2.0], file="coo.json"
+                )
+        self.assertEqual(response.file, "coo.json")
+        self.assertEqual(
+            uploads, [{"file": "coo.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 3]]}]
+        )
@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.models import QUBOMatrix
+from abs2.retry import CircuitBreaker
+from abs2.streaming import JSONArrayParser, QUBOStreamValidator, SolutionParser
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "test.json")
+
+
+def validate(text: str, chunk_size: int) -> QUBOStreamValidator:
+    data = text.encode()
+    validator = QUBOStreamValidator()
+    for start in range(0, len(data), chunk_size):
+        validator.feed(data[start : start + chunk_size])
+    validator.close()
+    return validator
+
+
+class StreamingTests(TestCase):
+    def testValidatorAcceptsTestMatrix(self):
+        with open(TEST_FILE) as f:
+            text = f.read()
+        for chunk_size in (1, 2, 7, 64, 4096):
+            validator = validate(text, chunk_size)
+            self.assertEqual(validator.nelement, 12)
+            self.assertEqual((validator.min_index, validator.max_index), (0, 4))
+            self.assertEqual(validator.members["nbit"], 32)
+
+    def testValidatorRejectsMalformedMatrices(self):
+        matrices = [
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1]]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 2.5]]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 40, 1]]}',
+            '{"file": "a.json", "nbit": 32, "base": 1, "qubo": [[0, 1, 1]]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 1],]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 1], ]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [, [0, 1, 1]]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 1] [0, 2, 1]]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 1],, [0, 2, 1]]}',
+            '{"file": "a.json", "nbit": 32, "qubo": [[0, 1, 1]]}',
+            '{"file": "a.json", "nbit": 32, "base": 0, "qubo": [[0, 1, 1]]',
+            "[[0, 1, 1]]",
+        ]
+        for text in matrices:
+            # Every chunk boundary, e.g. a missing comma right after the end of a chunk
+            for chunk_size in range(1, len(text) + 1):
+                with self.assertRaises(ABS2Exception, msg=(text, chunk_size)):
+                    validate(text, chunk_size)
+
+    def testValidatorAcceptsEmptyQubo(self):
+        validate('{"qubo": [ ], "file": "a.json", "nbit": 32, "base": 0}', 5)
+
+    def testStreamedUpload(self):
+        received = []
+
+        def upload(handler):
+            received.append(handler.read_body())
+            return 202, {
+                "message": "uploaded",
+                "file": "testQUBO2.json",
+                "uri_problem": "",
+            }
+
+        progress = []
+        with FakeABS2Server(routes={("POST", "/v1/problems"): upload}) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                response = api.post_qubo_matrix(
+                    "token",
+                    TEST_FILE,
+                    stream=True,
+                    validate=True,
+                    chunk_size=64,
+                    progress=lambda *args: progress.append(args),
+                )
+        self.assertEqual(response.file, "testQUBO2.json")
+        with open(TEST_FILE, "rb") as f:
+            self.assertEqual(received, [f.read()])
+        size = os.path.getsize(TEST_FILE)
+        self.assertEqual(progress[-1][:2], (size, size))
+        self.assertGreater(len(progress), 1)
+
+    def testStreamedUploadAbortsOnInvalidFile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "broken.json")
+            with open(filename, "w") as f:
+                # Only detectable at the end of the file, after nbit has been read
+                json.dump(
+                    {
+                        "file": "broken.json",
+                        "nbit": 32,
+                        "base": 0,
+                        "qubo": [[0, 40, 1]],
+                    },
+                    f,
+                )
+            records = []
+            breaker = CircuitBreaker(threshold=1)
+            with FakeABS2Server() as server:
+                user = server.add_user()
+                with ABS2API(
+                    server.hostname,
+                    scheme="http",
+                    hooks=[records.append],
+                    breaker=breaker,
+                ) as api:
+                    token = api.retrieve_access_token(
+                        user.username, user.password
+                    ).access_token
+                    for chunk_size in (8, 1 << 20):
+                        with self.assertRaisesRegex(ABS2Exception, "indices"):
+                            api.post_qubo_matrix(
+                                token,
+                                filename,
+                                stream=True,
+                                validate=True,
+                                chunk_size=chunk_size,
+                            )
+                    self.assertFalse(api.get_all_problems(token).data)
+        # Reported to the hooks as a request without a response, but not as a failure of the web API
+        self.assertEqual([record.status_code for record in records[1:3]], [None, None])
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+def feed_in_chunks(parser, data: bytes, size: int):
+    entries = []
+    for start in range(0, len(data), size):
+        entries += parser.feed(data[start : start + size]) or []
+    return entries, parser.close()
+
+
+class ResponseParserTests(TestCase):
+    def testArrayEntriesInEveryChunking(self):
+        entries = [{"file": f"{k}.json", "bytes": k * 1.5} for k in range(20)] + [7]
+        data = json.dumps(entries).encode()
+        for size in (1, 2, 5, len(data)):
+            parsed, rest = feed_in_chunks(JSONArrayParser(), data, size)
+            self.assertEqual(parsed + rest, entries)
+        self.assertEqual(JSONArrayParser().feed(b"[]"), [])
+
+    def testArrayEntriesArriveEarly(self):
+        parser = JSONArrayParser()
+        self.assertEqual(parser.feed(b'[{"a": 1}, {"b"'), [{"a": 1}])
+        self.assertEqual(parser.feed(b": 2}]"), [{"b": 2}])
+        with self.assertRaises(ABS2Exception):
+            JSONArrayParser().feed(b'{"a": 1}')
+        with self.assertRaises(ABS2Exception):
+            feed_in_chunks(JSONArrayParser(), b"[1, 2", 1)
+
+
+@skipUnless(np, "numpy is not installed")
+class SolutionParserTests(TestCase):
+    def testSolutionInEveryChunking(self):
+        solution = {
+            "terminated": True,
+            "energy": -3,
+            "tts": 1.25e-3,
+            "solution": [k % 3 % 2 for k in range(100)],
+            "parameters": {"time_limit": 1},
+        }
+        data = json.dumps(solution).encode()
+        for size in (1, 3, 64, len(data)):
+            _, members = feed_in_chunks(SolutionParser(), data, size)
+            self.assertEqual(members["solution"].dtype, np.uint8)
+            self.assertEqual(
+                {**members, "solution": members["solution"].tolist()}, solution
+            )
+
+    def testRejectsNonBinaryEntries(self):
+        for data in (b'{"solution": [0, 2]}', b'{"solution": [10]}', b'{"a": 1}'):
+            with self.assertRaises(ABS2Exception):
+                feed_in_chunks(SolutionParser(), data, 4)
+
+    def testStreamedResponses(self):
+        with FakeABS2Server(time_scale=0.0) as server, ABS2API(
+            server.hostname, scheme="http"
+        ) as api:
+            user = server.add_user()
+            token = api.retrieve_access_token(user.username, user.password)
+            token = token.access_token
+            for name in ("a.json", "b.json"):
+                api.post_matrix(token, QUBOMatrix(name, 32, 0, [[0, 1, -1]]))
+            self.assertEqual(
+                [problem["file"] for problem in api.iter_all_problems(token)],
+                [problem["file"] for problem in api.get_all_problems(token).data],
+            )
+            job = api.post_job(token, "a.json", 1).job
+            expected = api.wait_for_solution(token, job, poll_interval=0.01)
+            streamed = api.get_solution(token, job, stream=True)
+            self.assertEqual(streamed.solution, expected.solution)
+            self.assertEqual(streamed.parameters.time_limit, 1)
+            self.assertEqual(
+                [entry["file"] for entry in api.iter_all_solutions(token)], [job]
+            )
+            self.assertEqual(list(api.iter_all_jobs(token)), [])
+            with self.assertRaises(ABS2Exception) as context:
+                api.get_solution(token, "missing.json", stream=True)
+            self.assertEqual(context.exception.status_code, 404)
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import Counter
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception
+from abs2.fake_server import FakeABS2Server
+from abs2.tracker import JobTracker
+
+from .test_polling import solution
+
+
+class FakeQueue:
+    """
+    Jobs and solution files of a user, as listed by the web API.
+    """
+
+    def __init__(self, server: FakeABS2Server):
+        self.jobs = {}
+        self.solutions = {}
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        self.server = server
+        server.route("GET", "/v1/jobs", self.list_jobs)
+        server.route("GET", "/v1/solutions", self.list_solutions)
+
+    def list_jobs(self, handler):
+        self.requests["jobs"] += 1
+        return 200, [{"file": name, "bytes": 10, "time": "t"} for name in self.jobs]
+
+    def list_solutions(self, handler):
+        self.requests["solutions"] += 1
+        with self.lock:
+            return 200, [
+                {"file": name, "bytes": 100, "time": str(version)}
+                for name, (version, _) in self.solutions.items()
+            ]
+
+    def queue(self, name):
+        self.jobs[name] = True
+
+    def update(self, name, energy, terminated=False):
+        self.jobs.pop(name, None)
+        with self.lock:
+            version = self.solutions.get(name, (0, None))[0] + 1
+            self.solutions[name] = (version, solution(energy, terminated))
+
+        def get(handler):
+            self.requests[name] += 1
+            return 200, self.solutions[name][1]
+
+        self.server.route("GET", f"/v1/solutions/{name}", get)
+
+
+class TrackerTests(TestCase):
+    def testOnlyChangedSolutionsAreFetched(self):
+        with FakeABS2Server() as server:
+            queue = FakeQueue(server)
+            with ABS2API(server.hostname, scheme="http") as api:
+                tracker = JobTracker(api, "token")
+                names = [f"p_{k:04d}.json" for k in range(10)]
+                updates = []
+                futures = {
+                    name: tracker.track(name, on_update=updates.append)
+                    for name in names
+                }
+                for name in names:
+                    queue.queue(name)
+                self.assertEqual(tracker.poll(), 0)
+
+                queue.update(names[0], -1)
+                queue.update(names[1], -2, terminated=True)
+                self.assertEqual(tracker.poll(), 2)
+                self.assertEqual(tracker.poll(), 0)
+                self.assertEqual(futures[names[1]].result(0).energy, -2)
+                self.assertFalse(futures[names[0]].done())
+
+                queue.update(names[0], -3, terminated=True)
+                del queue.jobs[names[2]]
+                self.assertEqual(tracker.poll(), 1)
+                self.assertEqual(futures[names[0]].result(0).energy, -3)
+                with self.assertRaises(ABS2Exception):
+                    futures[names[2]].result(0)
+                self.assertEqual(tracker.pending, 7)
+
+        self.assertEqual([s.energy for s in updates], [-1, -2, -3])
+        self.assertEqual(queue.requests["jobs"], 4)
+        self.assertEqual(queue.requests["solutions"], 4)
+        self.assertEqual(queue.requests[names[0]], 2)
+
+    def testUnchangedListingsAreRefreshed(self):
+        with FakeABS2Server() as server:
+            queue = FakeQueue(server)
+            with ABS2API(server.hostname, scheme="http") as api:
+                tracker = JobTracker(api, "token", refresh=0.1)
+                future = tracker.track("p_0001.json")
+                queue.update("p_0001.json", -1)
+                self.assertEqual(tracker.poll(), 1)
+                # The solution changes without a change of its size or modification time
+                with queue.lock:
+                    version, _ = queue.solutions["p_0001.json"]
+                    queue.solutions["p_0001.json"] = (version, solution(-2, True))
+                self.assertEqual(tracker.poll(), 0)
+                time.sleep(0.1)
+                self.assertEqual(tracker.poll(), 1)
+                self.assertEqual(future.result(0).energy, -2)
+
+                # A job leaving the queue is fetched once more
+                tracker = JobTracker(api, "token")
+                future = tracker.track("p_0002.json")
+                queue.update("p_0002.json", -1)
+                queue.queue("p_0002.json")
+                self.assertEqual(tracker.poll(), 1)
+                self.assertEqual(tracker.poll(), 0)
+                with queue.lock:
+                    version, _ = queue.solutions["p_0002.json"]
+                    queue.solutions["p_0002.json"] = (version, solution(-2, True))
+                del queue.jobs["p_0002.json"]
+                self.assertEqual(tracker.poll(), 1)
+                self.assertEqual(future.result(0).energy, -2)
+
+    def testBackgroundThread(self):
+        with FakeABS2Server() as server:
+            queue = FakeQueue(server)
+            with ABS2API(server.hostname, scheme="http") as api:
+                with JobTracker(api, "token", interval=0.01) as tracker:
+                    future = tracker.track("p_0001.json")
+                    queue.update("p_0001.json", -5, terminated=True)
+                    self.assertEqual(future.result(5).energy, -5)
+
+    def testNeverListedJobsFail(self):
+        with FakeABS2Server() as server:
+            queue = FakeQueue(server)
+            with ABS2API(server.hostname, scheme="http") as api:
+                tracker = JobTracker(api, "token", interval=0.01, grace=0.05)
+                missing = tracker.track("typo.json")
+                queued = tracker.track("p_0001.json")
+                queue.queue("p_0001.json")
+                tracker.poll()
+                self.assertFalse(missing.done())
+                with self.assertRaises(ABS2Exception):
+                    tracker.run(0.5)
+                with self.assertRaises(ABS2Exception) as context:
+                    missing.result(0)
+                self.assertEqual(context.exception.status_code, 404)
+                self.assertFalse(queued.done())
+
+    def testBackgroundThreadSurvivesErrors(self):
+        with FakeABS2Server() as server:
+            queue = FakeQueue(server)
+            calls = []
+
+            def broken(handler):
+                calls.append(handler)
+                return 200, [{"bytes": 1}] if len(calls) == 1 else []
+
+            server.route("GET", "/v1/jobs", broken)
+            with ABS2API(server.hostname, scheme="http") as api:
+                with JobTracker(api, "token", interval=0.01) as tracker:
+                    future = tracker.track("p_0001.json")
+                    with self.assertLogs("abs2.tracker", "ERROR"):
+                        while len(calls) < 2:
+                            time.sleep(0.01)
+                    queue.update("p_0001.json", -5, terminated=True)
+                    self.assertEqual(future.result(5).energy, -5)
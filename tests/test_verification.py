@@ -0,0 +1,133 @@
+import threading
+from unittest import TestCase
+
+from abs2 import ABS2API, ABS2Exception, models
+from abs2.fake_server import FakeABS2Server
+
+from .test_streaming import TEST_FILE
+
+
+class VerifyingServer:
+    """
+    Verifies every uploaded problem after a number of polls, problems named bad*.json fail verification.
+    """
+
+    def __init__(self, polls: int = 2, processing: int = 1):
+        self.polls = polls
+        self.processing = processing
+        self.problems = {}
+        self.jobs = []
+        self.lock = threading.Lock()
+
+    def upload(self, handler):
+        matrix = handler.read_json()
+        with self.lock:
+            self.problems[matrix["file"]] = 0
+        return 202, {"message": "accepted", "file": matrix["file"], "uri_problem": ""}
+
+    def information(self, handler):
+        name = handler.path.rsplit("/", 1)[1]
+        with self.lock:
+            self.problems[name] += 1
+            polls = self.problems[name]
+        information = {"file": name, "bytes": 1000, "time": "", "uri_problem": ""}
+        if polls > self.polls:
+            information["verify"] = not name.startswith("bad")
+            information["message"] = "verified"
+        return 200, information
+
+    def post_job(self, handler):
+        problem = handler.read_json()["problem"]
+        with self.lock:
+            if self.processing:
+                self.processing -= 1
+                return 102, {"message": "processing"}
+            self.jobs.append(problem)
+            job = f"{problem[:-5]}_{len(self.jobs):04d}.json"
+        return 202, {
+            "message": "accepted",
+            "job": job,
+            "uri_problem": "",
+            "uri_job": "",
+            "uri_solution": "",
+        }
+
+    def routes(self, *names):
+        routes = {
+            ("POST", "/v1/problems"): self.upload,
+            ("POST", "/v1/jobs"): self.post_job,
+        }
+        for name in names:
+            routes[("GET", f"/v1/problems/{name}")] = self.information
+        return routes
+
+
+class VerificationTests(TestCase):
+    def testWaitUntilVerified(self):
+        verifier = VerifyingServer(polls=3)
+        with FakeABS2Server(routes=verifier.routes("testQUBO2.json")) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                api.post_qubo_matrix("token", TEST_FILE)
+                information = api.wait_until_verified(
+                    "token", "testQUBO2.json", poll_interval=0.001
+                )
+                self.assertTrue(information.verify)
+                self.assertEqual(verifier.problems["testQUBO2.json"], 4)
+                self.assertEqual(api.verification_stats.samples, 1)
+                self.assertIsNotNone(api.verification_stats.estimate(1000))
+
+    def testTimeout(self):
+        verifier = VerifyingServer(polls=1000)
+        with FakeABS2Server(routes=verifier.routes("testQUBO2.json")) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                api.post_qubo_matrix("token", TEST_FILE)
+                with self.assertRaises(ABS2Exception):
+                    api.wait_until_verified(
+                        "token", "testQUBO2.json", poll_interval=0.01, timeout=0.1
+                    )
+
+    def testSubmitWhenVerified(self):
+        verifier = VerifyingServer()
+        bad = models.QUBOMatrix("bad.json", 32, 0, [[0, 0, 1]])
+        with FakeABS2Server(
+            routes=verifier.routes("testQUBO2.json", "bad.json")
+        ) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                jobs = api.submit_when_verified(
+                    "token", [TEST_FILE, bad, TEST_FILE], 10, poll_interval=0.001
+                )
+        self.assertIsNone(jobs[1])
+        self.assertNotEqual(jobs[0].job, jobs[2].job)
+        self.assertEqual(verifier.jobs, ["testQUBO2.json", "testQUBO2.json"])
+
+    def testSubmitWhenVerifiedTimesOutPostingJobs(self):
+        verifier = VerifyingServer(polls=0, processing=1000)
+        with FakeABS2Server(routes=verifier.routes("testQUBO2.json")) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                with self.assertRaises(ABS2Exception) as context:
+                    api.submit_when_verified(
+                        "token", [TEST_FILE], 10, poll_interval=0.001, timeout=0.3
+                    )
+        self.assertEqual(context.exception.status_code, 102)
+        self.assertEqual(context.exception.jobs, [None])
+
+    def testSubmitWhenVerifiedKeepsPostedJobsOnFailure(self):
+        verifier = VerifyingServer(polls=0, processing=0)
+        bad = models.QUBOMatrix("other.json", 32, 0, [[0, 0, 1]])
+
+        def post_job(handler):
+            if handler.read_json()["problem"] == "other.json":
+                return 500, {"message": "failed"}
+            return verifier.post_job(handler)
+
+        routes = verifier.routes("testQUBO2.json", "other.json")
+        routes[("POST", "/v1/jobs")] = post_job
+        with FakeABS2Server(routes=routes) as server:
+            with ABS2API(server.hostname, scheme="http") as api:
+                with self.assertRaises(ABS2Exception) as context:
+                    api.submit_when_verified(
+                        "token", [TEST_FILE, bad], 10, poll_interval=0.001
+                    )
+        first, second = context.exception.jobs
+        self.assertEqual(first.job, "testQUBO2_0001.json")
+        self.assertIsNone(second)